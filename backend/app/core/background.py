@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+PeriodicJob = Callable[[AsyncSession], Awaitable[object]]
+
+# Зарегистрированные периодические задачи: (название, интервал в секундах, функция, запуск при старте)
+_periodic_jobs: List[Tuple[str, float, PeriodicJob, bool]] = []
+
+
+def register_periodic_job(name: str, interval_seconds: float, job: PeriodicJob, run_at_start: bool = True) -> None:
+    """
+    Регистрирует периодическую фоновую задачу.
+    Каждый запуск получает собственную сессию базы данных.
+    :param name: Название задачи (для логов).
+    :param interval_seconds: Интервал между запусками.
+    :param job: Асинхронная функция, принимающая сессию базы данных.
+    :param run_at_start: Выполнить задачу сразу при старте воркера (иначе — через интервал).
+        Дорогие задачи не запускаются при каждом перезапуске воркеров.
+    """
+    _periodic_jobs.append((name, interval_seconds, job, run_at_start))
+
+
+async def _run_periodically(name: str, interval_seconds: float, job: PeriodicJob, run_at_start: bool) -> None:
+    if not run_at_start:
+        await asyncio.sleep(interval_seconds)
+    while True:
+        try:
+            async with SessionLocal() as db:
+                await job(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Periodic job %s failed", name)
+        await asyncio.sleep(interval_seconds)
+
+
+def start_periodic_jobs() -> List[asyncio.Task]:
+    """
+    Запускает все зарегистрированные периодические задачи.
+    :return: Список запущенных asyncio-задач.
+    """
+    return [
+        asyncio.create_task(_run_periodically(name, interval, job, run_at_start), name=name)
+        for name, interval, job, run_at_start in _periodic_jobs
+    ]
+
+
+async def stop_periodic_jobs(tasks: List[asyncio.Task]) -> None:
+    """
+    Останавливает периодические задачи и дожидается их завершения.
+    :param tasks: Задачи, возвращенные start_periodic_jobs.
+    """
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
@@ -0,0 +1,144 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+from app.core.config import settings
+
+
+class LRUCache:
+    """
+    Ограниченный по размеру LRU-кэш с опциональным сроком жизни записей.
+
+    Каждая запись хранит момент истечения (unix-время). Просроченные записи
+    удаляются при обращении, а при переполнении вытесняется самая старая.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Возвращает значение по ключу, если оно есть и не просрочено.
+        :param key: Ключ записи.
+        :param default: Значение по умолчанию.
+        :return: Значение из кэша или default.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None) -> None:
+        """
+        Сохраняет значение в кэше.
+        :param key: Ключ записи.
+        :param value: Значение.
+        :param expires_at: Unix-время истечения записи (None — бессрочно).
+        """
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """
+        Удаляет запись из кэша, если она есть.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Полностью очищает кэш.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Время жизни отметки об изменении ролей: дольше срока жизни любого access-токена
+ROLE_CHANGE_TTL_SECONDS = 60 * 60
+
+# user_id -> unix-время последнего изменения ролей пользователя в рабочих пространствах
+roles_changed_at = LRUCache(maxsize=100000)
+
+# Момент, до которого карта ролей не учитывается ни для одного пользователя
+# (после пропуска сообщений шины инвалидации нельзя знать, чьи роли менялись)
+_all_roles_changed_at = 0.0
+
+
+def mark_roles_changed(user_id: int) -> None:
+    """
+    Отмечает, что роли пользователя изменились.
+    Карта ролей из токенов, выданных раньше этого момента, перестает учитываться.
+    :param user_id: ID пользователя.
+    """
+    now = time.time()
+    roles_changed_at.set(user_id, now, expires_at=now + ROLE_CHANGE_TTL_SECONDS)
+
+
+def roles_changed_since(user_id: int, issued_at: Optional[float]) -> bool:
+    """
+    Проверяет, менялись ли роли пользователя после выдачи токена.
+    :param user_id: ID пользователя.
+    :param issued_at: Время выдачи токена (`iat`).
+    :return: True, если роли менялись (или время выдачи неизвестно).
+    """
+    if issued_at is None:
+        return True
+    if issued_at <= _all_roles_changed_at:
+        return True
+    changed_at = roles_changed_at.get(user_id)
+    return changed_at is not None and changed_at >= issued_at
+
+
+def mark_all_roles_changed() -> None:
+    """
+    Отмечает, что роли любого пользователя могли измениться.
+    Карта ролей из всех токенов, выданных раньше этого момента, перестает учитываться.
+    """
+    global _all_roles_changed_at
+    _all_roles_changed_at = time.time()
+
+
+# Отозванные цепочки рефреш-токенов: family_id -> True до истечения последнего токена цепочки
+revoked_refresh_families = LRUCache(maxsize=100000)
+
+# Уже использованные (ротированные) рефреш-токены: jti -> family_id
+used_refresh_tokens = LRUCache(maxsize=100000)
+
+
+# Кэши ниже согласуются между процессами через шину инвалидации (app/core/invalidation.py);
+# срок жизни записей ограничивает устаревание, если сообщение все же потеряно.
+
+# Данные пользователей для проверки токена: user_id -> UserResponse
+principal_cache = LRUCache(maxsize=settings.lookup_cache_size)
+
+# Рабочее пространство неудаленного проекта: project_id -> workspace_id
+project_workspace_cache = LRUCache(maxsize=settings.lookup_cache_size)
+
+# Проект задачи: task_id -> project_id (проект задачи не меняется)
+task_project_cache = LRUCache(maxsize=settings.lookup_cache_size)
+
+
+def lookup_expires_at() -> float:
+    """
+    Момент истечения записи кэша поиска (сейчас + lookup_cache_ttl_seconds).
+    """
+    return time.time() + settings.lookup_cache_ttl_seconds
@@ -0,0 +1,218 @@
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # Необязательная зависимость: без нее кодировка недоступна
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Необязательная зависимость: без нее кодировка недоступна
+    zstandard = None
+
+# Типы содержимого, которые имеет смысл сжимать
+COMPRESSIBLE_TYPES = ("application/json", "application/msgpack", "text/")
+
+
+class Compressor(ABC):
+    """
+    Потоковый компрессор: compress() копит данные, flush() отдает все, что можно
+    распаковать на стороне клиента уже сейчас, finish() завершает поток.
+    """
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    @abstractmethod
+    def flush(self) -> bytes:
+        ...
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        ...
+
+
+class GzipCompressor(Compressor):
+    def __init__(self):
+        self._compressor = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor(Compressor):
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=settings.compression_brotli_quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor(Compressor):
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=settings.compression_zstd_level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encodings() -> Dict[str, type]:
+    """
+    Кодировки, доступные в этом окружении, в порядке предпочтения сервера
+    (из настройки compression_encodings; без установленной библиотеки кодировка пропускается).
+    """
+    compressors = {"gzip": GzipCompressor}
+    if brotli is not None:
+        compressors["br"] = BrotliCompressor
+    if zstandard is not None:
+        compressors["zstd"] = ZstdCompressor
+    names = [name.strip() for name in settings.compression_encodings.split(",")]
+    return {name: compressors[name] for name in names if name in compressors}
+
+
+def parse_quality_list(header: str) -> List[Tuple[str, float]]:
+    """
+    Разбирает заголовок вида "gzip;q=0.8, br" (Accept-Encoding, Accept).
+    :return: Список (значение в нижнем регистре, вес q).
+    """
+    result = []
+    for item in header.split(","):
+        value, *params = item.split(";")
+        value = value.strip().lower()
+        if not value:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, raw = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        result.append((value, quality))
+    return result
+
+
+def choose_encoding(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """
+    Выбирает кодировку сжатия по заголовку Accept-Encoding.
+    При равных весах побеждает кодировка, стоящая раньше в списке сервера.
+    :param accept_encoding: Значение заголовка Accept-Encoding.
+    :param encodings: Доступные кодировки в порядке предпочтения сервера.
+    :return: Кодировка или None, если клиент не принимает ни одну из них.
+    """
+    weights = dict(parse_quality_list(accept_encoding))
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы кодировкой, выбранной по Accept-Encoding (zstd, br, gzip).
+
+    Ответы меньше minimum_size отдаются без сжатия. Потоковые ответы сжимаются
+    по частям: после каждой части поток сбрасывается, чтобы клиент получал данные
+    сразу, а не после завершения ответа.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), list(self.encodings))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, self.encodings[encoding], self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: str, compressor_class: type, minimum_size: int):
+        self._send = send
+        self._encoding = encoding
+        self._compressor_class = compressor_class
+        self._minimum_size = minimum_size
+        self._start: Optional[Message] = None
+        self._compressor: Optional[Compressor] = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Заголовки отправляются вместе с первой частью тела, когда ясно, сжимать ли ответ
+            self._start = message
+            return
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._start is not None:
+            start, self._start = self._start, None
+            headers = MutableHeaders(raw=start["headers"])
+            content_type = headers.get("content-type", "")
+            if "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+                self._passthrough = True
+            elif not more_body and len(body) < self._minimum_size:
+                # Мелкий ответ: заголовки сжатия стоили бы больше, чем сэкономили
+                headers.add_vary_header("Accept-Encoding")
+                self._passthrough = True
+            else:
+                headers.add_vary_header("Accept-Encoding")
+                headers["Content-Encoding"] = self._encoding
+                self._compressor = self._compressor_class()
+                if more_body:
+                    # Итоговый размер неизвестен: ответ уходит частями
+                    del headers["Content-Length"]
+                else:
+                    body = self._compressor.compress(body) + self._compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await self._send(start)
+                    await self._send({"type": "http.response.body", "body": body, "more_body": False})
+                    return
+            await self._send(start)
+            if self._passthrough:
+                await self._send(message)
+                return
+
+        if more_body:
+            body = self._compressor.compress(body) + self._compressor.flush()
+            if body:
+                await self._send({"type": "http.response.body", "body": body, "more_body": True})
+        else:
+            body = self._compressor.compress(body) + self._compressor.finish()
+            await self._send({"type": "http.response.body", "body": body, "more_body": False})
@@ -1,12 +1,79 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings
-import secrets
+from typing import Optional
 
 class Settings(BaseSettings):
     database_url: str
     postgres_user: str
     postgres_password: str
     postgres_db: str
-    jwt_secret_key: str = secrets.token_urlsafe(32)  # Генерация уникального ключа
+    # Общий для всех воркеров и перезапусков ключ подписи токенов (обязателен, например secrets.token_urlsafe(32)).
+    # Случайный ключ в каждом процессе делал бы токены одного воркера недействительными для остальных
+    jwt_secret_key: str = Field(..., min_length=32)
+    jwt_cache_size: int = 10000  # Размер LRU-кэша проверенных токенов
+    token_embed_workspace_roles: bool = True  # Встраивать карту ролей в access-токен
+    token_roles_max_workspaces: int = 50  # Максимум рабочих пространств в карте ролей токена
+    rate_limit_enabled: bool = True  # Включить ограничение частоты и конкурентности запросов
+    rate_limit_backend: str = "memory"  # Хранилище лимитов: memory (в процессе) или postgres (общее)
+    trusted_proxies: str = "127.0.0.1"  # Адреса/подсети прокси через запятую, чьему X-Real-IP можно доверять
+    login_max_concurrency: int = 4  # Одновременных хэширований пароля на воркер (login/register)
+    password_hash_scheme: str = "bcrypt"  # Схема новых хэшей паролей: bcrypt или argon2 (нужен argon2-cffi)
+    password_hash_target_ms: float = 250.0  # Бюджет времени одного хэширования для калибровки стоимости
+    password_hash_bcrypt_rounds: Optional[int] = None  # Фиксированная стоимость bcrypt (None — калибровка при старте)
+    password_hash_argon2_time_cost: Optional[int] = None  # Фиксированное число проходов argon2 (None — калибровка)
+    password_hash_argon2_memory_kib: int = 65536  # Память argon2 на одно хэширование
+    password_hash_argon2_parallelism: int = 1  # Потоков argon2 на одно хэширование
+    list_max_concurrency: int = 16  # Одновременных запросов списков на маршрут и воркер
+    web_concurrency: int = 1  # Число воркеров сервера (выставляется gunicorn.conf.py)
+    database_echo: bool = False  # Логировать SQL-запросы
+    database_replica_urls: str = ""  # URL реплик для чтения через запятую (пусто — все запросы на primary)
+    replica_max_lag_seconds: float = 5.0  # Реплика с большим отставанием не используется
+    replica_lag_poll_seconds: float = 1.0  # Интервал замера отставания реплик
+    db_max_connections: int = 100  # max_connections в Postgres
+    db_reserved_connections: int = 10  # Соединения, оставляемые для миграций, psql и фоновых задач
+    sync_overlap_seconds: int = 30  # Перекрытие окна синхронизации для транзакций, закоммиченных позже курсора
+    sync_tombstone_retention_days: int = 30  # Срок хранения записей об удалениях (старше — полная синхронизация)
+    purge_batch_size: int = 1000  # Строк за одну транзакцию фоновой очистки удаленных объектов
+    purge_interval_seconds: int = 15 * 60  # Интервал страховочной фоновой очистки (основная — задание очереди при удалении)
+    agenda_max_days: int = 366  # Максимальная длина периода в запросе повестки
+    recurring_reminder_lookback_hours: int = 24  # Глубина поиска наступивших напоминаний повторяющихся задач
+    write_behind_enabled: bool = False  # Отложенная пакетная запись комментариев и отметок выполнения
+    write_behind_durability: str = "journal"  # Подтверждение записи: journal (fsync на диск) или memory
+    write_behind_journal_dir: str = "data/write_behind"  # Каталог журналов отложенной записи
+    write_behind_flush_interval_ms: int = 5  # Максимальная задержка применения операций
+    write_behind_batch_size: int = 500  # Операций в одной транзакции
+    write_behind_max_attempts: int = 5  # Попыток применить пачку при ошибке в данных, затем операции применяются по одной
+    transfer_dir: str = "data/transfers"  # Каталог файлов выгрузки и загрузки рабочих пространств
+    transfer_batch_size: int = 5000  # Строк в одной записи файла выгрузки
+    transfer_max_upload_mb: int = 2048  # Максимальный размер загружаемого файла
+    transfer_max_active_jobs: int = 2  # Незавершенных заданий выгрузки/загрузки на пользователя
+    transfer_retention_hours: int = 24  # Срок хранения заданий и их файлов
+    transfer_stale_minutes: int = 30  # Задание без прогресса дольше этого срока считается прерванным
+    job_worker_enabled: bool = True  # Выполнять задания очереди в этом процессе
+    job_worker_concurrency: int = 4  # Одновременно выполняемых заданий на процесс
+    job_poll_seconds: float = 5.0  # Интервал опроса очереди (новые задания будят воркер через NOTIFY)
+    job_visibility_timeout_seconds: int = 60  # Блокировка задания; продлевается, пока задание выполняется
+    job_max_attempts: int = 5  # Попыток по умолчанию, после чего задание помечается failed
+    job_retry_base_seconds: float = 2.0  # Базовая задержка повтора (удваивается с каждой попыткой)
+    job_failed_retention_days: int = 7  # Срок хранения окончательно упавших заданий
+    lookup_cache_size: int = 100000  # Записей в каждом кэше пользователей и принадлежности проектов/задач
+    lookup_cache_ttl_seconds: int = 300  # Срок жизни записи (страховка на случай потерянной инвалидации)
+    batch_max_operations: int = 50  # Операций в одном пакетном запросе (POST /batch)
+    batch_read_concurrency: int = 4  # Сессий для параллельного выполнения чтений пакета
+    compression_min_size: int = 1024  # Ответы меньше этого размера (байт) не сжимаются
+    compression_encodings: str = "zstd,br,gzip"  # Кодировки сжатия в порядке предпочтения сервера
+    compression_gzip_level: int = 6  # Уровень gzip (1-9)
+    compression_brotli_quality: int = 4  # Качество brotli (0-11); выше 5 заметно дороже по CPU
+    compression_zstd_level: int = 3  # Уровень zstd (1-22)
+    archive_after_days: int = 30  # Выполненные раньше этого срока задачи переносятся в архив
+    archive_batch_size: int = 500  # Задач в одной транзакции переноса в архив
+    archive_interval_seconds: int = 10 * 60  # Интервал фонового переноса в архив
+    partition_months_ahead: int = 3  # На сколько месяцев вперед заранее создаются секции comments и reminders
+    partition_backfill_months: int = 24  # Секций в прошлое при переводе таблицы (строки старше — в секцию по умолчанию)
+    partition_maintenance_interval_seconds: int = 6 * 60 * 60  # Интервал обслуживания секций
+    partition_lock_timeout_ms: int = 5000  # Ожидание блокировки таблицы при создании и удалении секций
+    partition_detach_only: bool = False  # Отсоединять устаревшие секции вместо удаления
+    reminder_retention_months: int = 6  # Секции отправленных напоминаний старше этого срока удаляются
 
     class Config:
         env_file = ".env"
@@ -1,8 +1,40 @@
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.core.config import settings
 
-engine: AsyncEngine = create_async_engine(settings.database_url, echo=True)
+
+def get_pool_limits() -> tuple[int, int]:
+    """
+    Рассчитывает размер пула соединений одного воркера так, чтобы все воркеры
+    вместе не превышали max_connections в Postgres.
+    :return: (pool_size, max_overflow).
+    """
+    budget = max(1, settings.db_max_connections - settings.db_reserved_connections)
+    per_worker = max(2, budget // max(1, settings.web_concurrency))
+    max_overflow = per_worker // 4
+    return per_worker - max_overflow, max_overflow
+
+
+pool_size, max_overflow = get_pool_limits()
+
+
+def create_database_engine(url: str) -> AsyncEngine:
+    """
+    Создает движок с общими настройками пула (для primary и реплик).
+    :param url: URL базы данных.
+    :return: Асинхронный движок SQLAlchemy.
+    """
+    return create_async_engine(
+        url,
+        echo=settings.database_echo,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=True,
+    )
+
+
+engine: AsyncEngine = create_database_engine(settings.database_url)
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -13,6 +45,11 @@ SessionLocal = sessionmaker(
 class Base(DeclarativeBase):
     pass
 
-async def get_db():
+async def get_db(request: Request):
+    # Операции пакетного запроса (POST /batch) используют сессию пакета
+    batch = getattr(request.state, "batch", None)
+    if batch is not None:
+        yield batch.db
+        return
     async with SessionLocal() as session:
         yield session
\ No newline at end of file
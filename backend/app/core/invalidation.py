@@ -0,0 +1,94 @@
+import logging
+from typing import Callable, Dict, Iterable, List, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import (
+    LRUCache,
+    principal_cache,
+    project_workspace_cache,
+    task_project_cache,
+    mark_roles_changed,
+    mark_all_roles_changed,
+)
+from app.core.listener import pg_listener
+
+logger = logging.getLogger(__name__)
+
+# Канал NOTIFY сообщений об инвалидации кэшей
+INVALIDATION_CHANNEL = "cache_invalidation"
+
+# Виды сообщений. Сообщение — строка "вид:ключ,ключ,..." (ключи — целые ID)
+INVALIDATE_PRINCIPAL = "user"  # Данные пользователя (principal_cache)
+INVALIDATE_ROLES = "roles"  # Роли пользователя в рабочих пространствах
+INVALIDATE_PROJECT = "project"  # Рабочее пространство проекта (project_workspace_cache)
+INVALIDATE_TASK = "task"  # Проект задачи (task_project_cache)
+
+# Ключей в одном сообщении: payload NOTIFY ограничен 8000 байт
+MAX_KEYS_PER_MESSAGE = 500
+
+
+def _evictor(cache: LRUCache) -> Callable[[List[int]], None]:
+    def evict(keys: List[int]) -> None:
+        for key in keys:
+            cache.pop(key)
+    return evict
+
+
+def _mark_roles(user_ids: List[int]) -> None:
+    for user_id in user_ids:
+        mark_roles_changed(user_id)
+
+
+# Вид -> (инвалидация ключей, полный сброс при пропуске сообщений)
+_handlers: Dict[str, Tuple[Callable[[List[int]], None], Callable[[], None]]] = {
+    INVALIDATE_PRINCIPAL: (_evictor(principal_cache), principal_cache.clear),
+    INVALIDATE_ROLES: (_mark_roles, mark_all_roles_changed),
+    INVALIDATE_PROJECT: (_evictor(project_workspace_cache), project_workspace_cache.clear),
+    INVALIDATE_TASK: (_evictor(task_project_cache), task_project_cache.clear),
+}
+
+
+async def publish_invalidation(db: AsyncSession, kind: str, keys: Iterable[int]) -> None:
+    """
+    Инвалидирует ключи в кэшах текущего процесса и рассылает сообщение остальным
+    процессам в текущей транзакции (без коммита). Сообщение доставляется после
+    коммита, в том числе и этому процессу: запись, которую параллельный запрос
+    успел заполнить до коммита старыми данными, будет удалена повторно.
+    :param db: Сессия базы данных.
+    :param kind: Вид сообщения (INVALIDATE_*).
+    :param keys: Инвалидируемые ключи.
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return
+    _handlers[kind][0](keys)
+    for start in range(0, len(keys), MAX_KEYS_PER_MESSAGE):
+        chunk = keys[start:start + MAX_KEYS_PER_MESSAGE]
+        payload = f"{kind}:{','.join(str(key) for key in chunk)}"
+        await db.execute(select(func.pg_notify(INVALIDATION_CHANNEL, payload)))
+
+
+def _on_message(payload: str) -> None:
+    kind, _, keys = payload.partition(":")
+    handler = _handlers.get(kind)
+    if handler is None:
+        logger.warning("Unknown invalidation message: %s", payload[:100])
+        return
+    handler[0]([int(key) for key in keys.split(",") if key])
+
+
+def flush_shared_caches() -> None:
+    """
+    Полностью сбрасывает кэши, согласованные через шину.
+    Вызывается после каждого подключения к шине: сообщения, отправленные
+    пока соединения не было, потеряны.
+    """
+    for _, flush in _handlers.values():
+        flush()
+
+
+def start_invalidation_bus() -> None:
+    """
+    Подписывает процесс на сообщения об инвалидации. Вызывается до pg_listener.start().
+    """
+    pg_listener.subscribe(INVALIDATION_CHANNEL, _on_message, on_reconnect=flush_shared_caches)
@@ -0,0 +1,242 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional
+from sqlalchemy import select, update, delete, insert, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.listener import pg_listener
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# Канал NOTIFY о новых заданиях
+JOBS_CHANNEL = "jobs"
+
+# Максимальная задержка повтора
+MAX_RETRY_DELAY_SECONDS = 60 * 60
+
+# Сколько ждать завершения выполняемых заданий при остановке, прежде чем отменить их
+SHUTDOWN_GRACE_SECONDS = 10
+
+# Обработчик задания: получает собственную сессию и параметры задания, коммитит сам.
+# Задание может выполниться повторно (после ошибки или падения воркера), поэтому
+# обработчики должны быть идемпотентными.
+JobHandler = Callable[[AsyncSession, dict], Awaitable[None]]
+
+# Зарегистрированные обработчики: название задания -> (функция, максимум попыток)
+_job_handlers: Dict[str, tuple[JobHandler, int]] = {}
+
+
+def register_job_handler(name: str, handler: JobHandler, max_attempts: Optional[int] = None) -> None:
+    """
+    Регистрирует обработчик заданий очереди.
+    :param name: Название задания.
+    :param handler: Асинхронная функция (сессия, параметры задания).
+    :param max_attempts: Максимум попыток (по умолчанию job_max_attempts).
+    """
+    _job_handlers[name] = (handler, max_attempts or settings.job_max_attempts)
+
+
+async def enqueue_job(db: AsyncSession, name: str, payload: Optional[dict] = None, delay_seconds: float = 0) -> None:
+    """
+    Ставит задание в очередь в текущей транзакции (без коммита).
+    Задание и уведомление воркерам становятся видны только после коммита,
+    поэтому откат транзакции отменяет и задание.
+    :param db: Сессия базы данных.
+    :param name: Название задания.
+    :param payload: Параметры задания (сериализуемые в JSON).
+    :param delay_seconds: Отложить выполнение на указанное число секунд.
+    """
+    registered = _job_handlers.get(name)
+    await db.execute(
+        insert(Job).values(
+            name=name,
+            payload=payload or {},
+            status="pending",
+            attempts=0,
+            max_attempts=registered[1] if registered else settings.job_max_attempts,
+            run_at=func.now() + timedelta(seconds=delay_seconds),
+        )
+    )
+    await db.execute(select(func.pg_notify(JOBS_CHANNEL, name)))
+
+
+class JobWorker:
+    """
+    Пул выполнения заданий очереди внутри процесса приложения.
+
+    Задания захватываются через FOR UPDATE SKIP LOCKED, поэтому воркеры разных
+    процессов не получают одно задание дважды. Захват выставляет locked_until
+    (visibility timeout), который продлевается, пока задание выполняется; если
+    воркер упал, задание снова становится доступным после истечения блокировки.
+    Новые задания будят пул через LISTEN/NOTIFY; редкий опрос нужен только для
+    отложенных повторов и истекших блокировок.
+    """
+
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self._running: Dict[asyncio.Task, int] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def wake(self, *_) -> None:
+        self._wakeup.set()
+
+    async def _claim(self, limit: int) -> list:
+        candidates = (
+            select(Job.id)
+            .where(
+                Job.status == "pending",
+                Job.run_at <= func.now(),
+                or_(Job.locked_until.is_(None), Job.locked_until < func.now()),
+                Job.name.in_(list(_job_handlers)),
+            )
+            .order_by(Job.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        async with SessionLocal() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id.in_(candidates.scalar_subquery()))
+                .values(
+                    locked_until=func.now() + timedelta(seconds=settings.job_visibility_timeout_seconds),
+                    attempts=Job.attempts + 1,
+                    updated_at=func.now(),
+                )
+                .returning(Job.id, Job.name, Job.payload, Job.attempts, Job.max_attempts)
+                .execution_options(synchronize_session=False)
+            )
+            jobs = result.all()
+            await db.commit()
+        return jobs
+
+    async def _heartbeat(self, job_id: int) -> None:
+        # Продление блокировки, пока задание выполняется
+        while True:
+            await asyncio.sleep(settings.job_visibility_timeout_seconds / 3)
+            async with SessionLocal() as db:
+                await db.execute(
+                    update(Job)
+                    .where(Job.id == job_id)
+                    .values(locked_until=func.now() + timedelta(seconds=settings.job_visibility_timeout_seconds))
+                )
+                await db.commit()
+
+    async def _finish(self, job, error: Optional[BaseException]) -> None:
+        async with SessionLocal() as db:
+            if error is None:
+                await db.execute(delete(Job).where(Job.id == job.id))
+            elif job.attempts >= job.max_attempts:
+                await db.execute(
+                    update(Job)
+                    .where(Job.id == job.id)
+                    .values(status="failed", locked_until=None, last_error=repr(error)[:2000], updated_at=func.now())
+                )
+            else:
+                delay = min(settings.job_retry_base_seconds * 2 ** (job.attempts - 1), MAX_RETRY_DELAY_SECONDS)
+                await db.execute(
+                    update(Job)
+                    .where(Job.id == job.id)
+                    .values(
+                        run_at=func.now() + timedelta(seconds=delay),
+                        locked_until=None,
+                        last_error=repr(error)[:2000],
+                        updated_at=func.now(),
+                    )
+                )
+            await db.commit()
+
+    async def _execute(self, job) -> None:
+        handler, _ = _job_handlers[job.name]
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        error = None
+        try:
+            async with SessionLocal() as db:
+                await handler(db, job.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as handler_error:
+            logger.exception("Job %s #%s failed (attempt %s/%s)", job.name, job.id, job.attempts, job.max_attempts)
+            error = handler_error
+        finally:
+            heartbeat.cancel()
+        try:
+            await self._finish(job, error)
+        except Exception:
+            # Задание выполнится повторно после истечения блокировки
+            logger.exception("Failed to record result of job %s #%s", job.name, job.id)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._running.pop(task, None)
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            # Событие сбрасывается до захвата: уведомление во время захвата не потеряется
+            self._wakeup.clear()
+            free = settings.job_worker_concurrency - len(self._running)
+            if free > 0:
+                try:
+                    jobs = await self._claim(free)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Failed to claim jobs")
+                    jobs = []
+                for job in jobs:
+                    task = asyncio.create_task(self._execute(job), name=f"job.{job.name}.{job.id}")
+                    self._running[task] = job.id
+                    task.add_done_callback(self._on_done)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.job_poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """
+        Подписывается на уведомления о новых заданиях и запускает пул.
+        Вызывается до pg_listener.start().
+        """
+        pg_listener.subscribe(JOBS_CHANNEL, self.wake, on_reconnect=self.wake)
+        self._loop_task = asyncio.create_task(self._run(), name="jobs.worker")
+
+    async def stop(self) -> None:
+        """
+        Прекращает захват заданий, дожидается выполняемых и отменяет не успевшие.
+        Блокировки отмененных заданий снимаются, чтобы их сразу взял другой воркер.
+        """
+        self._stopping = True
+        self._wakeup.set()
+        if self._loop_task is not None:
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+        if not self._running:
+            return
+        await asyncio.wait(list(self._running), timeout=SHUTDOWN_GRACE_SECONDS)
+        interrupted = dict(self._running)
+        for task in interrupted:
+            task.cancel()
+        await asyncio.gather(*interrupted, return_exceptions=True)
+        if interrupted:
+            async with SessionLocal() as db:
+                await db.execute(
+                    update(Job)
+                    .where(Job.id.in_(list(interrupted.values())))
+                    .values(locked_until=None, attempts=Job.attempts - 1, updated_at=func.now())
+                )
+                await db.commit()
+
+
+job_worker = JobWorker()
+
+
+async def prune_jobs(db: AsyncSession) -> None:
+    """
+    Удаляет окончательно упавшие задания старше job_failed_retention_days.
+    :param db: Сессия базы данных.
+    """
+    threshold = datetime.now(timezone.utc) - timedelta(days=settings.job_failed_retention_days)
+    await db.execute(delete(Job).where(Job.status == "failed", Job.updated_at < threshold))
+    await db.commit()
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+import asyncpg
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Интервал проверки соединения: обрыв сети без закрытия сокета иначе не обнаружить
+KEEPALIVE_SECONDS = 30
+
+NotificationHandler = Callable[[str], None]
+ReconnectHandler = Callable[[], None]
+
+
+class PgListener:
+    """
+    Отдельное соединение с Postgres для LISTEN (вне пула: соединение занято постоянно).
+
+    Обработчики уведомлений вызываются синхронно в цикле событий и должны быть
+    быстрыми (например, будить ожидающую задачу). Уведомления, отправленные
+    пока соединения не было, теряются, поэтому после каждого (пере)подключения
+    вызываются обработчики on_reconnect — подписчик должен перечитать состояние.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[NotificationHandler]] = {}
+        self._reconnect_handlers: List[ReconnectHandler] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(
+        self, channel: str, handler: NotificationHandler, on_reconnect: Optional[ReconnectHandler] = None
+    ) -> None:
+        """
+        Подписывает обработчик на канал. Вызывается до start().
+        :param channel: Канал NOTIFY.
+        :param handler: Функция, получающая payload уведомления.
+        :param on_reconnect: Функция, вызываемая после каждого подключения.
+        """
+        self._handlers.setdefault(channel, []).append(handler)
+        if on_reconnect is not None:
+            self._reconnect_handlers.append(on_reconnect)
+
+    def _dispatch(self, connection, pid: int, channel: str, payload: str) -> None:
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Notification handler for %s failed", channel)
+
+    async def _listen(self, connection: asyncpg.Connection) -> None:
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        for channel in self._handlers:
+            await connection.add_listener(channel, self._dispatch)
+        for handler in self._reconnect_handlers:
+            handler()
+        while not lost.is_set():
+            try:
+                await asyncio.wait_for(lost.wait(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                await asyncio.wait_for(connection.execute("SELECT 1"), timeout=KEEPALIVE_SECONDS)
+
+    async def _run(self) -> None:
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        delay = 1.0
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                delay = 1.0
+                await self._listen(connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("LISTEN connection lost, reconnecting in %.0fs", delay)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def start(self) -> None:
+        """
+        Подключается и начинает прием уведомлений, если есть подписчики.
+        """
+        if self._handlers and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="pg_listener")
+
+    async def stop(self) -> None:
+        """
+        Закрывает соединение для LISTEN.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+pg_listener = PgListener()
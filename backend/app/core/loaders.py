@@ -0,0 +1,91 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchFunction = Callable[[List[K]], Awaitable[Dict[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Загрузчик объектов по ключу в пределах одного запроса.
+
+    Ключи, запрошенные в одной итерации цикла событий, собираются в одну пачку
+    и загружаются одним запросом (WHERE id = ANY(...)); повторные запросы того же
+    ключа получают сохраненный результат без обращения к базе данных.
+    Загрузчики одной сессии выполняют запросы по очереди через общую блокировку:
+    сессия не поддерживает параллельные запросы.
+    """
+
+    def __init__(self, batch_function: BatchFunction, lock: Optional[asyncio.Lock] = None):
+        self._batch_function = batch_function
+        self._lock = lock or asyncio.Lock()
+        self._futures: Dict[K, asyncio.Future] = {}
+        self._pending: List[K] = []
+        self._dispatches: Set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> Optional[V]:
+        """
+        Загружает объект по ключу.
+        :param key: Ключ (ID объекта).
+        :return: Объект или None, если он не найден.
+        """
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            self._pending.append(key)
+            if len(self._pending) == 1:
+                # Пачка отправляется после того, как остальные задачи этой итерации добавят свои ключи
+                loop.call_soon(self._schedule_dispatch)
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        """
+        Загружает объекты по списку ключей одной пачкой.
+        :param keys: Ключи.
+        :return: Объекты в порядке ключей (None для ненайденных).
+        """
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """
+        Сохраняет уже известный объект, чтобы не загружать его повторно.
+        """
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def clear(self, key: K) -> None:
+        """
+        Забывает объект (например, после его изменения в этом запросе).
+        """
+        future = self._futures.get(key)
+        if future is not None and future.done():
+            del self._futures[key]
+
+    def _schedule_dispatch(self) -> None:
+        task = asyncio.create_task(self._dispatch())
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self) -> None:
+        keys, self._pending = self._pending, []
+        try:
+            async with self._lock:
+                values = await self._batch_function(keys)
+        except BaseException as error:
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(error)
+            if isinstance(error, asyncio.CancelledError):
+                raise
+            return
+        for key in keys:
+            future = self._futures[key]
+            if not future.done():
+                future.set_result(values.get(key))
@@ -0,0 +1,112 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.partitions import prepare_partitioned_tables
+
+# Ключ advisory-блокировки: воркеры применяют схему по очереди
+SCHEMA_LOCK_ID = 7_300_001
+
+# Идемпотентные изменения схемы, которые не выполняет Base.metadata.create_all
+# (индексы и колонки для уже существующих таблиц, расширения). Только дописывать в конец.
+SCHEMA_PATCHES: list[str] = [
+    # Полнотекстовый и триграммный поиск
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_name_fts ON tasks USING gin (to_tsvector('simple', name))",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_name_trgm ON tasks USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_projects_name_fts ON projects USING gin (to_tsvector('simple', name))",
+    "CREATE INDEX IF NOT EXISTS ix_projects_name_trgm ON projects USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_comments_content_fts ON comments USING gin (to_tsvector('simple', content))",
+    "CREATE INDEX IF NOT EXISTS ix_comments_content_trgm ON comments USING gin (content gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_workspace_users_user_id ON workspace_users (user_id, workspace_id)",
+    "CREATE INDEX IF NOT EXISTS ix_projects_workspace_id ON projects (workspace_id)",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_project_id ON tasks (project_id)",
+    "CREATE INDEX IF NOT EXISTS ix_comments_task_id ON comments (task_id)",
+    # Фильтры списков задач
+    "CREATE INDEX IF NOT EXISTS ix_tasks_project_completed_due ON tasks (project_id, is_completed, due_date)",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_assigned_due ON tasks (assigned_to, due_date)",
+    # Подсчет просроченных задач для статистики
+    "CREATE INDEX IF NOT EXISTS ix_tasks_open_due ON tasks (project_id, due_date) WHERE NOT is_completed",
+    # Инкрементальная синхронизация по updated_at
+    "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now()",
+    "CREATE INDEX IF NOT EXISTS ix_projects_updated_at ON projects (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_updated_at ON tasks (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_comments_updated_at ON comments (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_reminders_updated_at ON reminders (updated_at)",
+    # Мягкое удаление и фоновая очистка
+    "ALTER TABLE workspaces ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMPTZ",
+    "ALTER TABLE projects ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMPTZ",
+    "CREATE INDEX IF NOT EXISTS ix_workspaces_deleted ON workspaces (deleted_at) WHERE deleted_at IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS ix_projects_deleted ON projects (deleted_at) WHERE deleted_at IS NOT NULL",
+    # Повторяющиеся задачи: материализованные вхождения серий
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS series_id INTEGER REFERENCES task_series (id) ON DELETE CASCADE",
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS occurrence_date DATE",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_tasks_series_occurrence ON tasks (series_id, occurrence_date) "
+    "WHERE series_id IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS ix_task_series_updated_at ON task_series (updated_at)",
+    # Счетчик комментариев задачи; заполняется один раз при добавлении колонок
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.columns WHERE table_name = 'tasks' AND column_name = 'comment_count'
+        ) THEN
+            ALTER TABLE tasks ADD COLUMN comment_count INTEGER NOT NULL DEFAULT 0;
+            ALTER TABLE tasks ADD COLUMN last_comment_at TIMESTAMPTZ;
+            UPDATE tasks SET comment_count = c.total, last_comment_at = c.last_at
+            FROM (SELECT task_id, count(*) AS total, max(created_at) AS last_at FROM comments GROUP BY task_id) c
+            WHERE c.task_id = tasks.id;
+        END IF;
+    END $$
+    """,
+    # Постраничное чтение комментариев задачи
+    "CREATE INDEX IF NOT EXISTS ix_comments_task_created ON comments (task_id, created_at, id)",
+    # Вход и регистрация по email без учета регистра. Если в базе уже есть адреса,
+    # различающиеся только регистром, уникальный индекс создать нельзя: создается
+    # обычный, а дубликаты нужно разрешить вручную (тогда индекс пересоздастся уникальным)
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'ux_users_email_lower') THEN
+            IF EXISTS (SELECT 1 FROM users GROUP BY lower(email) HAVING count(*) > 1) THEN
+                RAISE WARNING 'users.email has case-insensitive duplicates, ux_users_email_lower is not created';
+                CREATE INDEX IF NOT EXISTS ix_users_email_lower ON users (lower(email));
+            ELSE
+                CREATE UNIQUE INDEX ux_users_email_lower ON users (lower(email));
+                DROP INDEX IF EXISTS ix_users_email_lower;
+            END IF;
+        END IF;
+    END $$
+    """,
+    # Время выполнения задачи; для уже выполненных задач заполняется временем последнего изменения
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.columns WHERE table_name = 'tasks' AND column_name = 'completed_at'
+        ) THEN
+            ALTER TABLE tasks ADD COLUMN completed_at TIMESTAMPTZ;
+            UPDATE tasks SET completed_at = updated_at WHERE is_completed;
+        END IF;
+    END $$
+    """,
+    # Выборка задач для переноса в архив
+    "CREATE INDEX IF NOT EXISTS ix_tasks_archivable ON tasks (completed_at) "
+    "WHERE is_completed AND series_id IS NULL",
+    # Неотправленные напоминания задач; в старых секциях индекс почти пуст
+    "CREATE INDEX IF NOT EXISTS ix_reminders_unsent ON reminders (task_id, reminder_time) WHERE NOT is_sent",
+    # Время отметки выполнения: отложенная запись применяет только более поздние отметки
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS completion_changed_at TIMESTAMPTZ",
+    "ALTER TABLE tasks_archive ADD COLUMN IF NOT EXISTS completion_changed_at TIMESTAMPTZ",
+]
+
+
+async def apply_schema(conn: AsyncConnection, metadata) -> None:
+    """
+    Создает таблицы и применяет изменения схемы в одной транзакции.
+    :param conn: Соединение с открытой транзакцией.
+    :param metadata: Метаданные моделей (Base.metadata).
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": SCHEMA_LOCK_ID})
+    await conn.run_sync(metadata.create_all)
+    for statement in SCHEMA_PATCHES:
+        await conn.execute(text(statement))
+    await prepare_partitioned_tables(conn)
@@ -0,0 +1,62 @@
+from typing import Any, Callable, Coroutine
+import msgpack
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from app.core.compression import parse_quality_list
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Типы, которыми клиенты обозначают msgpack в заголовке Accept
+MSGPACK_ACCEPT_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+
+class MsgpackResponse(Response):
+    """
+    Ответ в формате msgpack. Содержимое — те же данные, что и у JSON-ответа
+    (после jsonable_encoder), поэтому схема ответа и формат дат совпадают.
+    """
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+def accepts_msgpack(accept: str) -> bool:
+    """
+    Проверяет, предпочитает ли клиент msgpack JSON по заголовку Accept.
+    :param accept: Значение заголовка Accept.
+    :return: True, если вес msgpack положителен и не меньше веса JSON.
+    """
+    if "msgpack" not in accept:
+        return False
+    weights = dict(parse_quality_list(accept))
+    msgpack_quality = max(weights.get(media_type, 0.0) for media_type in MSGPACK_ACCEPT_TYPES)
+    json_quality = weights.get("application/json", weights.get("application/*", weights.get("*/*", 0.0)))
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    Маршрут, отдающий ответ в JSON или msgpack в зависимости от заголовка Accept.
+    Подключается к роутеру через APIRouter(route_class=NegotiatedRoute).
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        json_handler = super().get_route_handler()
+        # Тот же обработчик (валидация, зависимости, response_model), но с ответом msgpack
+        response_class = self.response_class
+        self.response_class = MsgpackResponse
+        try:
+            msgpack_handler = super().get_route_handler()
+        finally:
+            self.response_class = response_class
+
+        async def route_handler(request: Request) -> Response:
+            if accepts_msgpack(request.headers.get("accept", "")):
+                response = await msgpack_handler(request)
+            else:
+                response = await json_handler(request)
+            response.headers.add_vary_header("Accept")
+            return response
+
+        return route_handler
@@ -0,0 +1,50 @@
+import struct
+from datetime import date, time
+from typing import Any, BinaryIO, Iterator
+import msgpack
+
+# Файл — последовательность записей msgpack, у каждой 4-байтовый префикс длины (big-endian).
+# Запись читается целиком, поэтому память ограничена размером одной записи, а не файла.
+LENGTH = struct.Struct(">I")
+
+# Защита от поврежденных файлов: запись с пачкой строк не бывает больше
+MAX_RECORD_SIZE = 256 * 1024 * 1024
+
+
+def _encode(value: Any) -> Any:
+    # datetime с часовым поясом msgpack пишет сам (тип Timestamp); date и time — строками ISO
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def pack_record(record: Any) -> bytes:
+    """
+    Сериализует запись вместе с префиксом длины.
+    :param record: Запись (словари, списки, скаляры, datetime с часовым поясом).
+    :return: Байты для записи в файл.
+    """
+    body = msgpack.packb(record, default=_encode, datetime=True, use_bin_type=True)
+    return LENGTH.pack(len(body)) + body
+
+
+def read_records(file: BinaryIO) -> Iterator[Any]:
+    """
+    Читает записи из файла по одной.
+    :param file: Файл, открытый в двоичном режиме.
+    :return: Итератор записей (datetime возвращаются в UTC).
+    :raises ValueError: Если файл обрезан или поврежден.
+    """
+    while True:
+        prefix = file.read(LENGTH.size)
+        if not prefix:
+            return
+        if len(prefix) < LENGTH.size:
+            raise ValueError("Truncated record")
+        (size,) = LENGTH.unpack(prefix)
+        if size > MAX_RECORD_SIZE:
+            raise ValueError("Record too large")
+        body = file.read(size)
+        if len(body) < size:
+            raise ValueError("Truncated record")
+        yield msgpack.unpackb(body, timestamp=3, raw=False)
@@ -0,0 +1,264 @@
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Dict, List
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory-блокировки обслуживания секций: его выполняет один воркер
+PARTITION_LOCK_ID = 7_300_002
+
+# Таблицы, секционированные по месяцам: таблица -> ключ секционирования
+PARTITIONED_TABLES: Dict[str, str] = {
+    "comments": "created_at",
+    "reminders": "reminder_time",
+}
+
+# Условие строк, которые нельзя удалять по сроку хранения: секция с такими строками остается.
+# Таблиц без записи здесь срок хранения не касается
+RETENTION_KEEP: Dict[str, str] = {
+    "reminders": "NOT is_sent",
+}
+
+
+def month_start(value: datetime) -> datetime:
+    """
+    Начало месяца (UTC), в который попадает момент времени.
+    """
+    value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    """
+    Сдвигает начало месяца на count месяцев (count может быть отрицательным).
+    """
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def _bounds(month: datetime) -> str:
+    return f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+
+
+async def list_partitions(conn: AsyncConnection, table: str) -> Dict[datetime, str]:
+    """
+    Месячные секции таблицы (секция по умолчанию и отсоединенные таблицы не входят).
+    :param conn: Соединение с базой данных.
+    :param table: Секционированная таблица.
+    :return: Словарь {начало месяца: имя секции}.
+    """
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:table AS regclass)"
+        ),
+        {"table": table},
+    )
+    pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})_(\d{{2}})$")
+    partitions = {}
+    for (name,) in result:
+        match = pattern.match(name)
+        if match:
+            partitions[datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)] = name
+    return partitions
+
+
+async def create_month_partition(conn: AsyncConnection, table: str, key: str, month: datetime) -> bool:
+    """
+    Создает секцию таблицы за месяц, если ее еще нет.
+
+    Строки этого месяца, уже попавшие в секцию по умолчанию, переносятся в новую
+    секцию: иначе Postgres не даст создать секцию с пересекающимся диапазоном.
+    :param conn: Соединение с открытой транзакцией.
+    :param table: Секционированная таблица.
+    :param key: Ключ секционирования.
+    :param month: Начало месяца (UTC).
+    :return: True, если секция создана.
+    """
+    name = partition_name(table, month)
+    exists = await conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+    if exists.scalar_one():
+        return False
+    bounds = {"start": month, "end": add_months(month, 1)}
+    in_default = await conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {key} >= :start AND {key} < :end)"),
+        bounds,
+    )
+    if not in_default.scalar_one():
+        await conn.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {_bounds(month)}"))
+        return True
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+    await conn.execute(
+        text(
+            f"""
+            WITH moved AS (DELETE FROM {table}_default WHERE {key} >= :start AND {key} < :end RETURNING *)
+            INSERT INTO {name} SELECT * FROM moved
+            """
+        ),
+        bounds,
+    )
+    await conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {_bounds(month)}"))
+    return True
+
+
+async def ensure_partitions(conn: AsyncConnection, table: str, key: str, first: datetime, last: datetime) -> int:
+    """
+    Создает недостающие месячные секции с first по last включительно.
+    :return: Количество созданных секций.
+    """
+    created = 0
+    month = month_start(first)
+    while month <= last:
+        created += await create_month_partition(conn, table, key, month)
+        month = add_months(month, 1)
+    return created
+
+
+async def convert_to_partitioned(conn: AsyncConnection, table: str, key: str) -> None:
+    """
+    Переводит обычную таблицу в секционированную по месяцам.
+
+    В Postgres нельзя секционировать существующую таблицу на месте, поэтому таблица
+    пересоздается: данные копируются в новую секционированную таблицу с тем же именем,
+    последовательностью ID, внешними ключами и индексами. Первичный ключ становится
+    (id, ключ секционирования). Строки старше partition_backfill_months попадают
+    в секцию по умолчанию. Выполняется один раз при первом запуске после обновления.
+    :param conn: Соединение с открытой транзакцией.
+    :param table: Таблица.
+    :param key: Ключ секционирования.
+    """
+    params = {"table": table}
+    indexes = await conn.execute(
+        text(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = CAST(:table AS regclass) AND NOT indisprimary"
+        ),
+        params,
+    )
+    index_defs = list(indexes.scalars().all())
+    foreign_keys = await conn.execute(
+        text(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'"
+        ),
+        params,
+    )
+    foreign_key_defs = foreign_keys.all()
+    sequence = (await conn.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), params)).scalar_one()
+    oldest = (await conn.execute(text(f"SELECT min({key}) FROM {table}"))).scalar_one()
+
+    old_table = f"{table}_unpartitioned"
+    await conn.execute(text(f"ALTER TABLE {table} RENAME TO {old_table}"))
+    await conn.execute(
+        text(
+            f"CREATE TABLE {table} (LIKE {old_table} INCLUDING DEFAULTS INCLUDING COMMENTS) "
+            f"PARTITION BY RANGE ({key})"
+        )
+    )
+    if sequence:
+        # Иначе последовательность удалится вместе со старой таблицей
+        await conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+    await conn.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+
+    current = month_start(datetime.now(timezone.utc))
+    first = add_months(current, -settings.partition_backfill_months)
+    if oldest is not None:
+        first = max(first, month_start(oldest))
+    await ensure_partitions(conn, table, key, first, add_months(current, settings.partition_months_ahead))
+
+    await conn.execute(text(f"INSERT INTO {table} SELECT * FROM {old_table}"))
+    await conn.execute(text(f"DROP TABLE {old_table}"))
+    # Ограничения и индексы создаются после копирования: так быстрее, чем поддерживать их при вставке
+    await conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {key})"))
+    for name, definition in foreign_key_defs:
+        await conn.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}"))
+    for definition in index_defs:
+        await conn.execute(text(definition))
+
+
+async def prepare_partitioned_tables(conn: AsyncConnection) -> None:
+    """
+    Приводит секционированные таблицы к нужному виду при применении схемы:
+    переводит обычные таблицы в секционированные, создает секцию по умолчанию
+    и секции на partition_months_ahead месяцев вперед.
+    :param conn: Соединение с открытой транзакцией (под блокировкой схемы).
+    """
+    current = month_start(datetime.now(timezone.utc))
+    for table, key in PARTITIONED_TABLES.items():
+        # relkind имеет тип "char", который asyncpg возвращает байтами: сравнивается как текст
+        relkind = await conn.execute(
+            text("SELECT CAST(relkind AS text) FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+        )
+        if relkind.scalar_one_or_none() == "r":
+            logger.warning("Converting %s to a partitioned table, this copies all rows once", table)
+            await convert_to_partitioned(conn, table, key)
+            continue
+        await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+        await ensure_partitions(conn, table, key, current, add_months(current, settings.partition_months_ahead))
+
+
+async def drop_expired_partitions(
+    conn: AsyncConnection, table: str, key: str, before: datetime, keep: str, detach_only: bool = False
+) -> List[str]:
+    """
+    Удаляет месячные секции, целиком лежащие раньше before и не содержащие строк,
+    подходящих под условие keep. Секция удаляется целиком (DROP TABLE), без
+    построчного DELETE и последующей работы VACUUM. Старые строки из секции по
+    умолчанию удаляются обычным DELETE.
+    :param conn: Соединение с открытой транзакцией.
+    :param table: Секционированная таблица.
+    :param key: Ключ секционирования.
+    :param before: Граница срока хранения (начало месяца).
+    :param keep: SQL-условие строк, которые нельзя удалять.
+    :param detach_only: Только отсоединить секции (остаются отдельными таблицами).
+    :return: Имена удаленных или отсоединенных секций.
+    """
+    removed = []
+    for month, name in sorted((await list_partitions(conn, table)).items()):
+        if add_months(month, 1) > before:
+            break
+        has_kept_rows = await conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE {keep})"))
+        if has_kept_rows.scalar_one():
+            continue
+        await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if not detach_only:
+            await conn.execute(text(f"DROP TABLE {name}"))
+        removed.append(name)
+    await conn.execute(
+        text(f"DELETE FROM {table}_default WHERE {key} < :before AND NOT ({keep})"), {"before": before}
+    )
+    return removed
+
+
+async def maintain_partitions(db: AsyncSession) -> None:
+    """
+    Периодическое обслуживание секций: создает секции заранее (на partition_months_ahead
+    месяцев вперед) и удаляет секции отправленных напоминаний старше reminder_retention_months.
+    Выполняется одним воркером; остальные пропускают запуск.
+    :param db: Сессия базы данных.
+    """
+    conn = await db.connection()
+    locked = await conn.execute(text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": PARTITION_LOCK_ID})
+    if not locked.scalar_one():
+        return
+    # DDL секций ждет блокировку таблицы; долгие запросы не должны останавливать вставки за ней
+    await conn.execute(text(f"SET LOCAL lock_timeout = '{settings.partition_lock_timeout_ms}ms'"))
+    current = month_start(datetime.now(timezone.utc))
+    for table, key in PARTITIONED_TABLES.items():
+        await ensure_partitions(conn, table, key, current, add_months(current, settings.partition_months_ahead))
+    before = add_months(current, -settings.reminder_retention_months)
+    for table, keep in RETENTION_KEEP.items():
+        removed = await drop_expired_partitions(
+            conn, table, PARTITIONED_TABLES[table], before, keep, settings.partition_detach_only
+        )
+        if removed:
+            logger.info("Removed expired partitions of %s: %s", table, ", ".join(removed))
+    await db.commit()
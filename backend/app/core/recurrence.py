@@ -0,0 +1,177 @@
+import calendar
+from datetime import date, timedelta
+from typing import Iterator, List, Optional
+
+# Поддерживаемое подмножество RRULE (RFC 5545)
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+# Ограничение на перебор периодов для правил, которые почти не дают вхождений
+# (например, 29 февраля или 31-е число при INTERVAL=2)
+MAX_EMPTY_PERIODS = 1000
+
+
+class RecurrenceRule:
+    """
+    Правило повторения задачи в формате RRULE:
+    FREQ=DAILY|WEEKLY|MONTHLY|YEARLY;INTERVAL=n;BYDAY=MO,WE;BYMONTHDAY=1,-1;COUNT=n;UNTIL=YYYYMMDD.
+
+    Вхождения вычисляются на лету для запрошенного диапазона дат: без COUNT
+    перебор начинается сразу с периода, содержащего начало диапазона.
+    """
+
+    def __init__(
+        self,
+        freq: str,
+        interval: int = 1,
+        by_day: Optional[List[int]] = None,
+        by_month_day: Optional[List[int]] = None,
+        count: Optional[int] = None,
+        until: Optional[date] = None,
+    ):
+        self.freq = freq
+        self.interval = interval
+        self.by_day = by_day
+        self.by_month_day = by_month_day
+        self.count = count
+        self.until = until
+
+    @classmethod
+    def parse(cls, rule: str) -> "RecurrenceRule":
+        """
+        Разбирает строку RRULE.
+        :param rule: Строка правила (префикс "RRULE:" допускается).
+        :return: Правило повторения.
+        :raises ValueError: Если правило некорректно или не поддерживается.
+        """
+        parts = {}
+        for item in rule.strip().removeprefix("RRULE:").split(";"):
+            if not item:
+                continue
+            key, sep, value = item.partition("=")
+            if not sep or not value:
+                raise ValueError(f"Invalid rule part: {item}")
+            parts[key.upper()] = value.upper()
+
+        freq = parts.pop("FREQ", None)
+        if freq not in FREQUENCIES:
+            raise ValueError("FREQ must be one of " + ", ".join(FREQUENCIES))
+        interval = int(parts.pop("INTERVAL", "1"))
+        if not 1 <= interval <= 1000:
+            raise ValueError("INTERVAL must be between 1 and 1000")
+
+        by_day = None
+        if "BYDAY" in parts:
+            if freq != "WEEKLY":
+                raise ValueError("BYDAY is supported only with FREQ=WEEKLY")
+            by_day = sorted({WEEKDAYS.index(day) for day in parts.pop("BYDAY").split(",") if day in WEEKDAYS})
+            if not by_day:
+                raise ValueError("BYDAY must list weekdays (MO..SU)")
+
+        by_month_day = None
+        if "BYMONTHDAY" in parts:
+            if freq != "MONTHLY":
+                raise ValueError("BYMONTHDAY is supported only with FREQ=MONTHLY")
+            by_month_day = sorted({int(day) for day in parts.pop("BYMONTHDAY").split(",")})
+            if any(day == 0 or not -31 <= day <= 31 for day in by_month_day):
+                raise ValueError("BYMONTHDAY must be between -31 and 31, except 0")
+
+        count = int(parts.pop("COUNT")) if "COUNT" in parts else None
+        if count is not None and not 1 <= count <= 10000:
+            raise ValueError("COUNT must be between 1 and 10000")
+        until = None
+        if "UNTIL" in parts:
+            value = parts.pop("UNTIL")[:8]
+            until = date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+        if count is not None and until is not None:
+            raise ValueError("COUNT and UNTIL cannot be combined")
+        if parts:
+            raise ValueError("Unsupported rule parts: " + ", ".join(sorted(parts)))
+
+        return cls(freq, interval, by_day, by_month_day, count, until)
+
+    def _period_dates(self, start: date, period: int) -> List[date]:
+        # Даты вхождений в period-м периоде правила (без учета start, COUNT и UNTIL)
+        if self.freq == "DAILY":
+            return [start + timedelta(days=period * self.interval)]
+        if self.freq == "WEEKLY":
+            week_start = start - timedelta(days=start.weekday()) + timedelta(weeks=period * self.interval)
+            return [week_start + timedelta(days=day) for day in (self.by_day or [start.weekday()])]
+        if self.freq == "MONTHLY":
+            month_index = start.month - 1 + period * self.interval
+            year, month = start.year + month_index // 12, month_index % 12 + 1
+            days_in_month = calendar.monthrange(year, month)[1]
+            dates = []
+            for day in self.by_month_day or [start.day]:
+                day = day if day > 0 else days_in_month + day + 1
+                # Несуществующие даты (31 апреля) пропускаются, как в RFC 5545
+                if 1 <= day <= days_in_month:
+                    dates.append(date(year, month, day))
+            return sorted(dates)
+        year = start.year + period * self.interval
+        if start.month == 2 and start.day == 29 and not calendar.isleap(year):
+            return []
+        return [date(year, start.month, start.day)]
+
+    def _first_period(self, start: date, range_from: date) -> int:
+        # Номер первого периода, который может пересечься с range_from
+        if range_from <= start:
+            return 0
+        if self.freq == "DAILY":
+            return -(-(range_from - start).days // self.interval)
+        if self.freq == "WEEKLY":
+            weeks = ((range_from - start).days + start.weekday()) // 7
+            return weeks // self.interval
+        if self.freq == "MONTHLY":
+            months = (range_from.year - start.year) * 12 + range_from.month - start.month
+            return months // self.interval
+        return (range_from.year - start.year) // self.interval
+
+    def occurrences(self, start: date, range_from: date, range_to: date) -> Iterator[date]:
+        """
+        Перечисляет даты вхождений в диапазоне [range_from, range_to].
+        :param start: Дата начала серии (DTSTART).
+        :param range_from: Начало диапазона (включительно).
+        :param range_to: Конец диапазона (включительно).
+        :return: Итератор дат по возрастанию.
+        """
+        end = min(range_to, self.until) if self.until else range_to
+        # С COUNT номер вхождения важен, поэтому перебор идет с начала серии
+        period = 0 if self.count is not None else self._first_period(start, range_from)
+        produced = 0
+        empty_periods = 0
+        while True:
+            dates = self._period_dates(start, period)
+            if dates and dates[0] > end:
+                return
+            empty_periods = 0 if dates else empty_periods + 1
+            if empty_periods > MAX_EMPTY_PERIODS:
+                return
+            for current in dates:
+                if current < start:
+                    continue
+                if current > end:
+                    return
+                produced += 1
+                if current >= range_from:
+                    yield current
+                if self.count is not None and produced >= self.count:
+                    return
+            period += 1
+
+    def includes(self, start: date, day: date) -> bool:
+        """
+        Проверяет, является ли дата вхождением серии.
+        """
+        return next(self.occurrences(start, day, day), None) is not None
+
+    def last_occurrence(self, start: date) -> Optional[date]:
+        """
+        Дата последнего вхождения или None, если серия бесконечна.
+        """
+        if self.count is None and self.until is None:
+            return None
+        last = None
+        for last in self.occurrences(start, start, self.until or date.max):
+            pass
+        return last
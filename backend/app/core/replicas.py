@@ -0,0 +1,158 @@
+import logging
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import SessionLocal, create_database_engine
+
+logger = logging.getLogger(__name__)
+
+# Сколько замеров позиции WAL на primary хранится для сопоставления с репликами
+LSN_SAMPLES = 600
+
+# Методы, которые не меняют данные
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Cookie с моментом последней записи: read-your-writes между воркерами для браузерных клиентов
+LAST_WRITE_COOKIE = "last_write_at"
+
+
+class Replica:
+    """
+    Реплика для чтения и ее последнее известное состояние.
+    """
+
+    def __init__(self, url: str):
+        self.engine = create_database_engine(url)
+        self.session_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine, class_=AsyncSession
+        )
+        self.healthy = False
+        # Unix-время, до которого все транзакции primary уже видны на реплике
+        self.replayed_until: Optional[float] = None
+
+    @property
+    def lag(self) -> Optional[float]:
+        if not self.healthy or self.replayed_until is None:
+            return None
+        return max(0.0, time.time() - self.replayed_until)
+
+
+class ReplicaRouter:
+    """
+    Выбирает, где выполнять чтение: на реплике или на primary.
+
+    Отставание реплик измеряется по WAL: периодически запоминается позиция
+    WAL на primary (pg_current_wal_lsn) вместе с моментом замера, а у реплики
+    читается позиция воспроизведения (pg_last_wal_replay_lsn). Если реплика
+    воспроизвела позицию, снятую в момент T, то все транзакции, закоммиченные
+    до T, на ней уже видны.
+
+    Read-your-writes: после записи пользователь читает только с реплик,
+    догнавших момент этой записи, — или с primary, если таких нет.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(url) for url in urls]
+        self._samples: Deque[Tuple[float, int]] = deque(maxlen=LSN_SAMPLES)
+        self._next = 0
+        # user_id -> unix-время последней записи пользователя (через этот воркер)
+        self._last_writes = LRUCache(maxsize=100000)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def mark_write(self, user_id: int, written_at: Optional[float] = None) -> None:
+        """
+        Запоминает момент записи пользователя.
+        Отметка старше replica_max_lag_seconds не нужна: такую запись видят все используемые реплики.
+        :param user_id: ID пользователя.
+        :param written_at: Unix-время записи (по умолчанию — текущее).
+        """
+        written_at = written_at or time.time()
+        self._last_writes.set(user_id, written_at, expires_at=written_at + settings.replica_max_lag_seconds)
+
+    def last_write(self, user_id: Optional[int]) -> Optional[float]:
+        return self._last_writes.get(user_id) if user_id is not None else None
+
+    def choose(self, user_id: Optional[int] = None, written_at: Optional[float] = None) -> Optional[Replica]:
+        """
+        Выбирает реплику для чтения по кругу среди подходящих.
+        :param user_id: ID пользователя, читающего данные.
+        :param written_at: Известный момент последней записи пользователя (например, из cookie).
+        :return: Реплика или None, если читать нужно с primary.
+        """
+        last_write = max(filter(None, (self.last_write(user_id), written_at)), default=None)
+        candidates = [
+            replica for replica in self.replicas
+            if replica.lag is not None
+            and replica.lag <= settings.replica_max_lag_seconds
+            and (last_write is None or last_write < replica.replayed_until)
+        ]
+        if not candidates:
+            return None
+        self._next = (self._next + 1) % len(candidates)
+        return candidates[self._next]
+
+    def session(self, user_id: Optional[int] = None, written_at: Optional[float] = None) -> AsyncSession:
+        """
+        Создает сессию для чтения: на подходящей реплике или на primary.
+        Для использования в CRUD-функциях и фоновых задачах вне запросов.
+        :param user_id: ID пользователя, читающего данные.
+        :param written_at: Известный момент последней записи пользователя.
+        :return: Новая сессия (закрывается вызывающим кодом).
+        """
+        replica = self.choose(user_id, written_at)
+        return replica.session_factory() if replica else SessionLocal()
+
+    async def poll(self, db: AsyncSession) -> None:
+        """
+        Замеряет позицию WAL на primary и состояние реплик.
+        :param db: Сессия primary.
+        """
+        if not self.replicas:
+            return
+        sampled_at = time.time()
+        primary_lsn = (await db.execute(text("SELECT pg_current_wal_lsn() - '0/0'"))).scalar_one()
+        self._samples.append((sampled_at, int(primary_lsn)))
+
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as connection:
+                    replay_lsn = (
+                        await connection.execute(text("SELECT pg_last_wal_replay_lsn() - '0/0'"))
+                    ).scalar_one()
+            except Exception:
+                if replica.healthy:
+                    logger.exception("Replica %s is unavailable", replica.engine.url.host)
+                replica.healthy = False
+                continue
+            if replay_lsn is None:
+                # Сервер не находится в режиме восстановления, то есть не является репликой
+                logger.warning("Server %s is not a replica", replica.engine.url.host)
+                replica.healthy = False
+                continue
+            replica.healthy = True
+            caught_up = [moment for moment, lsn in self._samples if lsn <= replay_lsn]
+            if caught_up:
+                replica.replayed_until = max(caught_up)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replica_router = ReplicaRouter([url.strip() for url in settings.database_replica_urls.split(",") if url.strip()])
+
+
+async def poll_replica_lag(db: AsyncSession) -> None:
+    """
+    Периодическая задача: обновляет отставание реплик.
+    :param db: Сессия primary.
+    """
+    await replica_router.poll(db)
@@ -1,25 +1,213 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
 from passlib.context import CryptContext
+from passlib.exc import MissingBackendError
+from passlib.hash import argon2, bcrypt
+from app.core.config import settings
 
-# Настройка контекста для хэширования
+logger = logging.getLogger(__name__)
+
+# Границы стоимости bcrypt: ниже 10 небезопасно, выше 16 — секунды на хэш
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+
+# Границы числа проходов argon2 при фиксированном объеме памяти
+ARGON2_MIN_TIME_COST = 1
+ARGON2_MAX_TIME_COST = 10
+
+# Замеров на каждую стоимость при калибровке (берется минимальный: он меньше всего зависит от соседей по CPU)
+CALIBRATION_SAMPLES = 3
+
+# Замеров в окне метрик на каждую операцию
+TIMINGS_WINDOW = 1000
+
+# Контекст хэширования; до калибровки — параметры passlib по умолчанию
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Выбранная политика (отдается в метриках)
+hash_policy: Dict[str, object] = {"scheme": "bcrypt", "calibrated": False}
+
+
+class HashTimings:
+    """
+    Скользящее окно длительностей хэширования и проверки паролей.
+    """
+
+    def __init__(self, window: int = TIMINGS_WINDOW):
+        self._samples: Dict[str, deque] = {"hash": deque(maxlen=window), "verify": deque(maxlen=window)}
+        self._counts: Dict[str, int] = {"hash": 0, "verify": 0}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            self._samples[operation].append(seconds)
+            self._counts[operation] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Перцентили длительности по каждой операции.
+        :return: {операция: {count, window, p50_ms, p95_ms, p99_ms, max_ms}}.
+        """
+        with self._lock:
+            samples = {operation: sorted(values) for operation, values in self._samples.items()}
+            counts = dict(self._counts)
+        result = {}
+        for operation, values in samples.items():
+            stats = {"count": counts[operation], "window": len(values)}
+            if values:
+                for name, quantile in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+                    stats[name] = round(values[min(len(values) - 1, int(len(values) * quantile))] * 1000, 2)
+                stats["max_ms"] = round(values[-1] * 1000, 2)
+            result[operation] = stats
+        return result
+
+
+hash_timings = HashTimings()
+
+
+def _argon2_available() -> bool:
+    try:
+        argon2.get_backend()
+        return True
+    except MissingBackendError:
+        return False
+
+
+def _measure(handler, **params) -> float:
+    # Минимальное время хэширования тестового пароля с заданными параметрами
+    configured = handler.using(**params)
+    best = float("inf")
+    for _ in range(CALIBRATION_SAMPLES):
+        start = time.perf_counter()
+        configured.hash("calibration-password")
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _calibrate_bcrypt(target: float) -> Tuple[int, float]:
+    # Каждый раунд bcrypt удваивает время: достаточно одного замера на минимальной стоимости
+    base = _measure(bcrypt, rounds=BCRYPT_MIN_ROUNDS)
+    rounds = BCRYPT_MIN_ROUNDS
+    while rounds < BCRYPT_MAX_ROUNDS and base * 2 ** (rounds + 1 - BCRYPT_MIN_ROUNDS) <= target:
+        rounds += 1
+    return rounds, base * 2 ** (rounds - BCRYPT_MIN_ROUNDS)
+
 
-def hash_password(password: str) -> str:
+def _calibrate_argon2(target: float, memory_kib: int) -> Tuple[int, float]:
+    # Время argon2 растет линейно с числом проходов при фиксированной памяти
+    memory = {"memory_cost": memory_kib, "parallelism": settings.password_hash_argon2_parallelism}
+    base = _measure(argon2, time_cost=ARGON2_MIN_TIME_COST, **memory)
+    time_cost = max(ARGON2_MIN_TIME_COST, min(ARGON2_MAX_TIME_COST, int(target / base)))
+    return time_cost, base * time_cost
+
+
+def configure_password_hashing() -> Dict[str, object]:
+    """
+    Замеряет скорость хэширования на текущем хосте и выбирает стоимость,
+    укладывающуюся в бюджет password_hash_target_ms. Вызывается при старте воркера
+    (в потоке: калибровка занимает порядка секунды).
+
+    Хэши с меньшей стоимостью или другой схемой остаются проверяемыми и помечаются
+    устаревшими: они пересчитываются при следующем успешном входе. Стоимость
+    только повышается — более дорогие хэши не пересчитываются.
+
+    :return: Выбранная политика.
     """
-    Хэширует пароль с использованием bcrypt.
-    
+    global pwd_context, hash_policy
+    target = settings.password_hash_target_ms / 1000
+    scheme = settings.password_hash_scheme
+    if scheme == "argon2" and not _argon2_available():
+        logger.warning("argon2 backend is not installed, falling back to bcrypt")
+        scheme = "bcrypt"
+
+    bcrypt_rounds = settings.password_hash_bcrypt_rounds
+    bcrypt_seconds = None
+    if bcrypt_rounds is None:
+        bcrypt_rounds, bcrypt_seconds = _calibrate_bcrypt(target)
+    options = {"bcrypt__rounds": bcrypt_rounds, "bcrypt__min_rounds": bcrypt_rounds}
+    policy: Dict[str, object] = {
+        "scheme": scheme,
+        "calibrated": True,
+        "target_ms": settings.password_hash_target_ms,
+        "bcrypt_rounds": bcrypt_rounds,
+    }
+    if bcrypt_seconds is not None:
+        policy["bcrypt_estimated_ms"] = round(bcrypt_seconds * 1000, 1)
+
+    schemes = ["bcrypt"]
+    if _argon2_available():
+        memory_kib = settings.password_hash_argon2_memory_kib
+        time_cost = settings.password_hash_argon2_time_cost
+        if time_cost is None and scheme == "argon2":
+            time_cost, argon2_seconds = _calibrate_argon2(target, memory_kib)
+            policy["argon2_estimated_ms"] = round(argon2_seconds * 1000, 1)
+        time_cost = time_cost or ARGON2_MIN_TIME_COST
+        options.update({
+            "argon2__memory_cost": memory_kib,
+            "argon2__time_cost": time_cost,
+            "argon2__parallelism": settings.password_hash_argon2_parallelism,
+            "argon2__min_rounds": time_cost,
+        })
+        policy.update({"argon2_time_cost": time_cost, "argon2_memory_kib": memory_kib})
+        # Первая схема — для новых хэшей, остальные при deprecated="auto" устаревшие
+        schemes = ["argon2", "bcrypt"] if scheme == "argon2" else ["bcrypt", "argon2"]
+
+    pwd_context = CryptContext(schemes=schemes, deprecated="auto", **options)
+    hash_policy = policy
+    logger.info("Password hashing policy: %s", policy)
+    return policy
+
+
+def _hash_sync(password: str) -> str:
+    start = time.perf_counter()
+    hashed = pwd_context.hash(password)
+    hash_timings.record("hash", time.perf_counter() - start)
+    return hashed
+
+
+def _verify_sync(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    start = time.perf_counter()
+    valid, new_hash = pwd_context.verify_and_update(password, hashed_password)
+    hash_timings.record("verify", time.perf_counter() - start)
+    return valid, new_hash
+
+
+async def hash_password(password: str) -> str:
+    """
+    Хэширует пароль по текущей политике.
+    Хэширование выполняется в пуле потоков и не блокирует цикл событий.
+
     :param password: Пароль в виде строки.
     :return: Захэшированный пароль.
     """
-    return pwd_context.hash(password)
+    return await asyncio.to_thread(_hash_sync, password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
     """
-    Проверяет, соответствует ли пароль его хэшу.
-    
+    Проверяет, соответствует ли пароль его хэшу, и пересчитывает устаревший хэш.
+    Проверка выполняется в пуле потоков и не блокирует цикл событий.
+
     :param plain_password: Обычный пароль.
     :param hashed_password: Захэшированный пароль.
-    :return: True, если пароль соответствует хэшу, иначе False.
+    :return: (True, если пароль соответствует хэшу; новый хэш, если сохраненный
+        устарел по текущей политике, иначе None).
+    """
+    return await asyncio.to_thread(_verify_sync, plain_password, hashed_password)
+
+
+def password_hash_metrics() -> Dict[str, object]:
+    """
+    Политика хэширования, распределение длительностей и оценка пропускной
+    способности входа на воркер (login_max_concurrency / медиана проверки).
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    timings = hash_timings.snapshot()
+    metrics: Dict[str, object] = {"policy": hash_policy, "timings": timings}
+    p50 = timings["verify"].get("p50_ms")
+    if p50:
+        metrics["estimated_logins_per_second_per_worker"] = round(settings.login_max_concurrency * 1000 / p50, 1)
+    return metrics
@@ -0,0 +1,10 @@
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """
+    Воркер gunicorn с явным выбором uvloop и httptools
+    (остальные параметры берутся из gunicorn.conf.py).
+    """
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
@@ -0,0 +1,297 @@
+import asyncio
+import fcntl
+import glob
+import json
+import logging
+import os
+from typing import Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Обработчик пачки операций одного типа: применяет их в переданной сессии без коммита
+BatchHandler = Callable[[AsyncSession, List[dict]], Awaitable[None]]
+
+DURABILITY_MEMORY = "memory"
+DURABILITY_JOURNAL = "journal"
+
+# Ошибки соединения с базой: операции не отбрасываются, применение повторяется до успеха
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, OSError, asyncio.TimeoutError)
+
+# Операции, которые не удалось применить (не совпадает с шаблоном журналов и не воспроизводится)
+DEAD_LETTER_FILE = "dead-letter.log"
+
+
+class WriteBehindQueue:
+    """
+    Очередь отложенной записи: операции подтверждаются после постановки в очередь
+    и применяются к базе пачками в одной транзакции — каждые flush_interval_ms
+    миллисекунд или при накоплении batch_size операций.
+
+    Порядок операций сохраняется в пределах процесса: пачки применяются последовательно
+    одним фоновым потоком, а внутри пачки обработчик получает операции своего типа
+    в порядке постановки. Очереди воркеров gunicorn независимы, поэтому операции,
+    изменяющие одну сущность из разных воркеров, несут время постановки, и обработчик
+    применяет их условно (см. apply_completion_batch): побеждает последняя, а не
+    последняя примененная.
+
+    Операция с ошибкой в данных не блокирует очередь: после write_behind_max_attempts
+    попыток пачка применяется по одной операции, нарушающие ограничения отбрасываются,
+    остальные ошибочные записываются в dead-letter.log каталога журналов.
+
+    Надежность подтверждения (durability):
+    - memory — операция только в памяти воркера и теряется при его падении;
+    - journal — операция дописывается в журнал на диске с fsync (групповым для
+      одновременно поставленных операций). Непримененные журналы воспроизводятся
+      при старте, поэтому обработчики должны быть идемпотентными.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, BatchHandler] = {}
+        self._buffer: List[dict] = []
+        self._waiting: List[Tuple[dict, asyncio.Future]] = []
+        self._journal_lock = asyncio.Lock()
+        self._journal = None
+        # Сегменты, операции которых еще не применены: файлы остаются открытыми,
+        # чтобы блокировка не давала другим воркерам воспроизвести их повторно
+        self._closed_segments: List[BinaryIO] = []
+        self._segment_number = 0
+        self._has_items = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def enabled(self) -> bool:
+        return settings.write_behind_enabled
+
+    def register(self, op_type: str, handler: BatchHandler) -> None:
+        """
+        Регистрирует обработчик операций указанного типа.
+        :param op_type: Тип операции.
+        :param handler: Функция, применяющая пачку операций в сессии (без коммита).
+        """
+        self._handlers[op_type] = handler
+
+    async def enqueue(self, op_type: str, payload: dict) -> None:
+        """
+        Ставит операцию в очередь и возвращает управление после ее надежной записи
+        (в соответствии с write_behind_durability).
+        :param op_type: Тип операции (должен быть зарегистрирован).
+        :param payload: Данные операции (сериализуемые в JSON).
+        """
+        if op_type not in self._handlers:
+            raise ValueError(f"Unknown write-behind operation: {op_type}")
+        operation = {"type": op_type, **payload}
+        if settings.write_behind_durability != DURABILITY_JOURNAL:
+            self._append(operation)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.append((operation, future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_journal())
+        await future
+
+    def _append(self, operation: dict) -> None:
+        self._buffer.append(operation)
+        self._has_items.set()
+        if len(self._buffer) >= settings.write_behind_batch_size:
+            self._batch_full.set()
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(settings.write_behind_journal_dir, f"write-behind-{os.getpid()}-{number}.log")
+
+    def _open_segment(self) -> None:
+        self._segment_number += 1
+        path = self._segment_path(self._segment_number)
+        self._journal = open(path, "ab")
+        # Блокировка показывает другим воркерам, что журнал принадлежит живому процессу
+        fcntl.flock(self._journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    async def _write_journal(self) -> None:
+        # Групповая запись: все операции, поставленные за время предыдущего fsync, пишутся одним fsync
+        while self._waiting:
+            waiting, self._waiting = self._waiting, []
+            try:
+                async with self._journal_lock:
+                    if self._journal is None:
+                        self._open_segment()
+                    data = b"".join(json.dumps(op, default=str).encode() + b"\n" for op, _ in waiting)
+                    self._journal.write(data)
+                    self._journal.flush()
+                    await asyncio.to_thread(os.fsync, self._journal.fileno())
+                    for operation, _ in waiting:
+                        self._append(operation)
+            except Exception as error:
+                for _, future in waiting:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for _, future in waiting:
+                if not future.done():
+                    future.set_result(None)
+
+    async def _take_batch(self) -> Tuple[List[dict], List[BinaryIO]]:
+        # Забирает буфер и текущий сегмент журнала: новые операции пишутся в следующий.
+        # Сегмент не закрывается (и не разблокируется), пока его операции не применены
+        async with self._journal_lock:
+            batch, self._buffer = self._buffer, []
+            self._has_items.clear()
+            self._batch_full.clear()
+            if self._journal is not None:
+                self._closed_segments.append(self._journal)
+                self._journal = None
+            segments, self._closed_segments = self._closed_segments, []
+        return batch, segments
+
+    async def _apply(self, operations: List[dict]) -> None:
+        by_type: Dict[str, List[dict]] = {}
+        for operation in operations:
+            by_type.setdefault(operation["type"], []).append(operation)
+        async with SessionLocal() as db:
+            for op_type, items in by_type.items():
+                await self._handlers[op_type](db, items)
+            await db.commit()
+
+    def _dead_letter(self, operation: dict, error: Exception) -> None:
+        os.makedirs(settings.write_behind_journal_dir, exist_ok=True)
+        path = os.path.join(settings.write_behind_journal_dir, DEAD_LETTER_FILE)
+        with open(path, "ab") as file:
+            file.write(json.dumps({"operation": operation, "error": repr(error)}, default=str).encode() + b"\n")
+        logger.error("Write-behind operation moved to %s: %s (%r)", path, operation, error)
+
+    async def _apply_each(self, operations: List[dict]) -> List[dict]:
+        # Одна неприменимая операция (например, задача уже удалена) не должна
+        # блокировать остальные: применяем по одной и откладываем ошибочные.
+        # Возвращает непримененный остаток, если пропало соединение с базой
+        for index, operation in enumerate(operations):
+            try:
+                await self._apply([operation])
+            except asyncio.CancelledError:
+                raise
+            except IntegrityError:
+                logger.warning("Write-behind operation dropped: %s", operation)
+            except TRANSIENT_ERRORS:
+                return operations[index:]
+            except Exception as error:
+                self._dead_letter(operation, error)
+        return []
+
+    async def _apply_with_retry(self, operations: List[dict]) -> None:
+        for start in range(0, len(operations), settings.write_behind_batch_size):
+            chunk = operations[start:start + settings.write_behind_batch_size]
+            delay, failures = 0.1, 0
+            while chunk:
+                try:
+                    await self._apply(chunk)
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except TRANSIENT_ERRORS:
+                    logger.exception("Write-behind flush failed, retrying in %.1fs", delay)
+                except Exception as error:
+                    failures += 1
+                    if isinstance(error, IntegrityError) or failures >= settings.write_behind_max_attempts:
+                        chunk = await self._apply_each(chunk)
+                        if not chunk:
+                            break
+                    else:
+                        logger.exception("Write-behind flush failed, retrying in %.1fs", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 5.0)
+
+    async def flush(self) -> None:
+        """
+        Применяет все накопленные операции и удаляет их журналы.
+        """
+        batch, segments = await self._take_batch()
+        try:
+            if batch:
+                await self._apply_with_retry(batch)
+            # Файл удаляется под блокировкой: другой воркер не успеет его воспроизвести
+            for segment in segments:
+                os.remove(segment.name)
+        finally:
+            for segment in segments:
+                segment.close()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            await self._has_items.wait()
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), timeout=settings.write_behind_flush_interval_ms / 1000)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Журналы пачки не удалены и будут воспроизведены при следующем старте
+                logger.exception("Write-behind flush failed")
+
+    async def _recover(self) -> int:
+        # Воспроизводит журналы завершившихся процессов (их файлы не заблокированы)
+        recovered = 0
+        pattern = os.path.join(settings.write_behind_journal_dir, "write-behind-*.log")
+        for path in sorted(glob.glob(pattern), key=os.path.getmtime):
+            try:
+                journal = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            with journal:
+                try:
+                    fcntl.flock(journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                # Пока ждали блокировку, владелец мог применить журнал и удалить файл
+                try:
+                    if os.stat(path).st_ino != os.fstat(journal.fileno()).st_ino:
+                        continue
+                except FileNotFoundError:
+                    continue
+                operations = []
+                for line in journal:
+                    try:
+                        operations.append(json.loads(line))
+                    except ValueError:
+                        # Недописанная последняя строка: операция не была подтверждена
+                        break
+                operations = [op for op in operations if op.get("type") in self._handlers]
+                await self._apply_with_retry(operations)
+                recovered += len(operations)
+                os.remove(path)
+        return recovered
+
+    async def start(self) -> None:
+        """
+        Воспроизводит непримененные журналы и запускает фоновую запись.
+        """
+        if settings.write_behind_durability == DURABILITY_JOURNAL:
+            os.makedirs(settings.write_behind_journal_dir, exist_ok=True)
+            recovered = await self._recover()
+            if recovered:
+                logger.info("Write-behind recovered %d operations", recovered)
+        self._flusher = asyncio.create_task(self._run(), name="write_behind.flush")
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновую запись и применяет оставшиеся операции.
+        """
+        if self._writer is not None:
+            await asyncio.gather(self._writer, return_exceptions=True)
+        # Фоновая запись завершается после текущей пачки, а не посреди нее
+        self._stopping = True
+        self._has_items.set()
+        self._batch_full.set()
+        if self._flusher is not None:
+            await asyncio.gather(self._flusher, return_exceptions=True)
+        await self.flush()
+
+
+write_behind = WriteBehindQueue()
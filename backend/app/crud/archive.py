@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text
+from sqlalchemy.engine import Row
+from app.core.config import settings
+from app.core.invalidation import publish_invalidation, INVALIDATE_TASK
+from app.models.archive import ArchivedTask
+from app.models.comments import Comment
+from app.models.project import Project
+from app.models.reminder import Reminder
+from app.models.task import Task
+
+
+def _columns(model, prefix: str = "", touch: bool = False) -> str:
+    # touch: updated_at заменяется текущим временем, чтобы строки снова получила синхронизация
+    return ", ".join(
+        "now()" if touch and column.name == "updated_at" else f"{prefix}{column.name}"
+        for column in model.__table__.columns
+    )
+
+
+# Задачи копируются в архив до удаления: иначе ON DELETE CASCADE удалит их комментарии и напоминания
+_COPY_TASKS_SQL = text(
+    f"INSERT INTO tasks_archive ({_columns(Task)}) SELECT {_columns(Task)} FROM tasks WHERE id = ANY(:ids)"
+)
+_MOVE_SQL = [
+    text(
+        f"""
+        WITH moved AS (DELETE FROM {model.__tablename__} WHERE task_id = ANY(:ids) RETURNING {_columns(model)})
+        INSERT INTO {model.__tablename__}_archive ({_columns(model)}) SELECT {_columns(model)} FROM moved
+        """
+    )
+    for model in (Comment, Reminder)
+]
+# Клиенты синхронизации удаляют перенесенные задачи (вместе с комментариями и напоминаниями)
+_TOMBSTONES_SQL = text(
+    """
+    INSERT INTO deleted_records (entity_type, entity_id, workspace_id, deleted_at)
+    SELECT 'task', t.id, p.workspace_id, now() FROM tasks t JOIN projects p ON p.id = t.project_id
+    WHERE t.id = ANY(:ids)
+    """
+)
+_DELETE_TASKS_SQL = text("DELETE FROM tasks WHERE id = ANY(:ids)")
+
+# Возврат задачи из архива: сначала задача (на нее ссылаются комментарии и напоминания)
+_RESTORE_TASK_SQL = text(
+    f"""
+    WITH moved AS (
+        DELETE FROM tasks_archive a USING projects p
+        WHERE a.id = :id AND p.id = a.project_id AND p.deleted_at IS NULL
+        RETURNING {_columns(Task, "a.")}, p.workspace_id
+    ), restored AS (
+        INSERT INTO tasks ({_columns(Task)}) SELECT {_columns(Task, touch=True)} FROM moved
+    )
+    SELECT workspace_id FROM moved
+    """
+)
+_RESTORE_SQL = [
+    text(
+        f"""
+        WITH moved AS (DELETE FROM {model.__tablename__}_archive WHERE task_id = :id RETURNING {_columns(model)})
+        INSERT INTO {model.__tablename__} ({_columns(model)}) SELECT {_columns(model, touch=True)} FROM moved
+        """
+    )
+    for model in (Comment, Reminder)
+]
+
+
+async def archive_completed_tasks(db: AsyncSession) -> int:
+    """
+    Переносит задачи, выполненные раньше archive_after_days дней назад, вместе с их
+    комментариями и напоминаниями в архивные таблицы (tasks_archive, comments_archive,
+    reminders_archive). Основные таблицы и их индексы остаются небольшими.
+
+    Задачи переносятся пачками по archive_batch_size, каждая пачка — в своей транзакции.
+    SKIP LOCKED не дает ждать задачи, которые сейчас изменяются, и позволяет воркерам
+    переносить разные пачки параллельно. Вхождения повторяющихся задач не переносятся:
+    по ним определяется, какие вхождения серии уже материализованы.
+
+    Статистика (task_stats) не меняется: перенесенные задачи остаются в ней выполненными.
+    Для синхронизации перенос выглядит как удаление задачи (запись в deleted_records);
+    при изменении задача возвращается в основные таблицы (restore_archived_task).
+
+    :param db: Сессия базы данных.
+    :return: Количество перенесенных задач.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.archive_after_days)
+    total = 0
+    while True:
+        result = await db.execute(
+            select(Task.id)
+            .where(Task.is_completed.is_(True), Task.series_id.is_(None), Task.completed_at < cutoff)
+            .order_by(Task.completed_at)
+            .limit(settings.archive_batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        task_ids = list(result.scalars().all())
+        if task_ids:
+            params = {"ids": task_ids}
+            await db.execute(_COPY_TASKS_SQL, params)
+            for statement in _MOVE_SQL:
+                await db.execute(statement, params)
+            await db.execute(_TOMBSTONES_SQL, params)
+            await db.execute(_DELETE_TASKS_SQL, params)
+            # Принадлежность задачи проекту больше не ищется в основной таблице
+            await publish_invalidation(db, INVALIDATE_TASK, task_ids)
+        await db.commit()
+        total += len(task_ids)
+        if len(task_ids) < settings.archive_batch_size:
+            return total
+        # Отдаем управление циклу событий между пачками
+        await asyncio.sleep(0)
+
+
+async def get_archived_task(db: AsyncSession, task_id: int) -> Optional[Row]:
+    """
+    Извлекает архивную задачу неудаленного проекта.
+    :param db: Сессия базы данных.
+    :param task_id: ID задачи.
+    :return: Строка (ArchivedTask, workspace_id) или None, если задачи нет в архиве.
+    """
+    result = await db.execute(
+        select(ArchivedTask, Project.workspace_id)
+        .join(Project, Project.id == ArchivedTask.project_id)
+        .where(ArchivedTask.id == task_id, Project.deleted_at.is_(None))
+    )
+    return result.one_or_none()
+
+
+async def get_archived_task_workspace_id(db: AsyncSession, task_id: int) -> Optional[int]:
+    """
+    Извлекает ID рабочего пространства архивной задачи.
+    :param db: Сессия базы данных.
+    :param task_id: ID задачи.
+    :return: ID рабочего пространства или None, если задачи нет в архиве.
+    """
+    result = await db.execute(
+        select(Project.workspace_id)
+        .join(ArchivedTask, ArchivedTask.project_id == Project.id)
+        .where(ArchivedTask.id == task_id, Project.deleted_at.is_(None))
+    )
+    return result.scalar_one_or_none()
+
+
+async def restore_archived_task(db: AsyncSession, task_id: int) -> Optional[int]:
+    """
+    Возвращает архивную задачу неудаленного проекта вместе с комментариями и напоминаниями
+    в основные таблицы (без коммита). Вызывается перед изменением задачи: архивные задачи
+    только читаются. updated_at строк обновляется, чтобы клиенты синхронизации снова их получили.
+    Если задача по-прежнему выполнена давно, фоновый перенос вернет ее в архив.
+    :param db: Сессия базы данных.
+    :param task_id: ID задачи.
+    :return: ID рабочего пространства задачи или None, если задачи нет в архиве.
+    """
+    workspace_id = (await db.execute(_RESTORE_TASK_SQL, {"id": task_id})).scalar_one_or_none()
+    if workspace_id is None:
+        return None
+    for statement in _RESTORE_SQL:
+        await db.execute(statement, {"id": task_id})
+    return workspace_id
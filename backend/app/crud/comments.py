@@ -0,0 +1,204 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, tuple_, text, bindparam
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from app.models.comments import Comment
+from app.models.archive import ArchivedComment
+from app.models.task import Task
+from app.schemas.comments import CommentCreate, CommentResponse
+from app.core.write_behind import write_behind
+
+# Заранее выделенные ID комментариев для отложенной записи
+COMMENT_ID_BLOCK = 100
+_comment_ids: List[int] = []
+
+
+def encode_comment_cursor(comment: CommentResponse) -> str:
+    """
+    Кодирует позицию комментария (created_at, id) в курсор страницы.
+    """
+    return f"{int(comment.created_at.timestamp() * 1_000_000)}_{comment.id}"
+
+
+def decode_comment_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Декодирует курсор страницы комментариев.
+    :raises ValueError: Если курсор некорректен.
+    """
+    micros, _, comment_id = cursor.partition("_")
+    try:
+        created_at = datetime.fromtimestamp(int(micros) / 1_000_000, tz=timezone.utc)
+    except (OverflowError, OSError):
+        # Время вне допустимого диапазона дат
+        raise ValueError("Invalid cursor")
+    comment_id = int(comment_id)
+    # ID — колонка integer: значение вне диапазона база отклонила бы ошибкой
+    if not 0 <= comment_id <= 2**31 - 1:
+        raise ValueError("Invalid cursor")
+    return created_at, comment_id
+
+
+async def create_comment(db: AsyncSession, comment_data: CommentCreate, user_id: int) -> CommentResponse:
+    """
+    Создает комментарий и обновляет счетчик комментариев задачи в той же транзакции.
+    updated_at задачи не меняется: комментарий не изменяет саму задачу.
+    :param db: Сессия базы данных.
+    :param comment_data: Данные комментария.
+    :param user_id: ID автора.
+    :return: Созданный комментарий в формате Pydantic модели.
+    """
+    new_comment = Comment(
+        task_id=comment_data.task_id,
+        user_id=user_id,
+        content=comment_data.content,
+    )
+    db.add(new_comment)
+    await db.flush()
+
+    await db.execute(
+        update(Task)
+        .where(Task.id == comment_data.task_id)
+        .values(
+            comment_count=Task.comment_count + 1,
+            last_comment_at=func.greatest(Task.last_comment_at, new_comment.created_at),
+            updated_at=Task.updated_at,
+        )
+    )
+    await db.commit()
+    await db.refresh(new_comment)
+    return CommentResponse.model_validate(new_comment)
+
+
+async def _allocate_comment_id(db: AsyncSession) -> int:
+    # ID берутся блоком из последовательности: один запрос на COMMENT_ID_BLOCK комментариев
+    if not _comment_ids:
+        result = await db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('comments', 'id')) FROM generate_series(1, :count)"),
+            {"count": COMMENT_ID_BLOCK},
+        )
+        _comment_ids.extend(result.scalars().all())
+    return _comment_ids.pop(0)
+
+
+async def queue_comment(db: AsyncSession, comment_data: CommentCreate, user_id: int) -> CommentResponse:
+    """
+    Ставит комментарий в очередь отложенной записи.
+    ID выделяется сразу, поэтому ответ совпадает с тем, что будет записано.
+    :param db: Сессия базы данных (только для выделения ID).
+    :param comment_data: Данные комментария.
+    :param user_id: ID автора.
+    :return: Комментарий в формате Pydantic модели.
+    """
+    comment_id = await _allocate_comment_id(db)
+    now = datetime.now(timezone.utc)
+    await write_behind.enqueue("comment", {
+        "id": comment_id,
+        "task_id": comment_data.task_id,
+        "user_id": user_id,
+        "content": comment_data.content,
+        "created_at": now.isoformat(),
+    })
+    return CommentResponse(
+        id=comment_id,
+        task_id=comment_data.task_id,
+        user_id=user_id,
+        content=comment_data.content,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+async def apply_comment_batch(db: AsyncSession, operations: List[dict]) -> None:
+    """
+    Записывает пачку комментариев из очереди одним INSERT и обновляет счетчики задач.
+    Идемпотентна: уже записанные ID пропускаются и не увеличивают счетчики.
+    :param db: Сессия базы данных.
+    :param operations: Операции "comment" в порядке постановки.
+    """
+    # Задачу могли удалить или перенести в архив после постановки комментария в очередь:
+    # такие комментарии пропускаются. FOR KEY SHARE не дает удалить задачи до коммита пачки
+    result = await db.execute(
+        select(Task.id)
+        .where(Task.id.in_({operation["task_id"] for operation in operations}))
+        .with_for_update(read=True, key_share=True)
+    )
+    existing = set(result.scalars().all())
+
+    rows = []
+    for operation in operations:
+        if operation["task_id"] not in existing:
+            continue
+        created_at = datetime.fromisoformat(operation["created_at"])
+        rows.append({
+            "id": operation["id"],
+            "task_id": operation["task_id"],
+            "user_id": operation["user_id"],
+            "content": operation["content"],
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+    if not rows:
+        return
+    result = await db.execute(
+        insert(Comment)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[Comment.id, Comment.created_at])
+        .returning(Comment.task_id, Comment.created_at)
+    )
+
+    counters: Dict[int, Tuple[int, datetime]] = {}
+    for task_id, created_at in result:
+        count, last_at = counters.get(task_id, (0, created_at))
+        counters[task_id] = (count + 1, max(last_at, created_at))
+    if not counters:
+        return
+
+    tasks = Task.__table__
+    connection = await db.connection()
+    await connection.execute(
+        update(tasks)
+        .where(tasks.c.id == bindparam("task_id_"))
+        .values(
+            comment_count=tasks.c.comment_count + bindparam("count_"),
+            last_comment_at=func.greatest(tasks.c.last_comment_at, bindparam("last_at_")),
+            updated_at=tasks.c.updated_at,
+        ),
+        [
+            {"task_id_": task_id, "count_": count, "last_at_": last_at}
+            for task_id, (count, last_at) in counters.items()
+        ],
+    )
+
+
+async def get_task_comments_page(
+    db: AsyncSession, task_id: int, limit: int, cursor: Optional[str] = None, archived: bool = False
+) -> Tuple[List[CommentResponse], Optional[str]]:
+    """
+    Извлекает страницу комментариев задачи в порядке создания.
+    Keyset-пагинация по индексу (task_id, created_at, id): стоимость страницы
+    не зависит от ее номера и от общего числа комментариев.
+    :param db: Сессия базы данных.
+    :param task_id: ID задачи.
+    :param limit: Размер страницы.
+    :param cursor: Курсор из предыдущей страницы.
+    :param archived: Задача перенесена в архив (комментарии читаются из comments_archive).
+    :return: (комментарии, курсор следующей страницы или None).
+    :raises ValueError: Если курсор некорректен.
+    """
+    model = ArchivedComment if archived else Comment
+    query = select(model).where(model.task_id == task_id)
+    if cursor:
+        created_at, comment_id = decode_comment_cursor(cursor)
+        # Отдельное условие по created_at позволяет отбросить секции старше курсора
+        query = query.where(
+            model.created_at >= created_at, tuple_(model.created_at, model.id) > tuple_(created_at, comment_id)
+        )
+    result = await db.execute(query.order_by(model.created_at, model.id).limit(limit + 1))
+    comments = [CommentResponse.model_validate(comment) for comment in result.scalars().all()]
+
+    next_cursor = None
+    if len(comments) > limit:
+        comments = comments[:limit]
+        next_cursor = encode_comment_cursor(comments[-1])
+    return comments, next_cursor
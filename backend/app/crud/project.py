@@ -1,12 +1,20 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update, func, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import Integer
 from sqlalchemy.orm import selectinload
-from typing import Optional, List
+from typing import Optional, List, Dict
 from app.models.project import Project
 from app.models.user import User
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectWithTasks
 from app.models.task import Task
 from app.schemas.task import TaskResponse
+from app.crud.sync import record_deletion
+from app.crud.purge import PURGE_JOB
+from app.core.jobs import enqueue_job
+from app.core.cache import project_workspace_cache, lookup_expires_at
+from app.core.invalidation import publish_invalidation, INVALIDATE_PROJECT
 from fastapi import HTTPException
 
 async def create_project(db: AsyncSession, project_data: ProjectCreate) -> ProjectResponse:
@@ -37,7 +45,7 @@ async def update_project(
     :param project_data: Новые данные для обновления проекта.
     :return: Обновленный проект в формате Pydantic модели или None, если не найдено.
     """
-    result = await db.execute(select(Project).where(Project.id == project_id))
+    result = await db.execute(select(Project).where(Project.id == project_id, Project.deleted_at.is_(None)))
     project = result.scalar_one_or_none()
     if not project:
         return None
@@ -52,17 +60,25 @@ async def update_project(
 
 async def delete_project(db: AsyncSession, project_id: int) -> bool:
     """
-    Удаляет проект.
+    Помечает проект удаленным. Задачи, комментарии и напоминания проекта
+    удаляются фоновой очисткой (задание очереди soft_deleted.purge).
     :param db: Сессия базы данных.
     :param project_id: ID проекта.
     :return: True, если удаление успешно, иначе False.
     """
-    result = await db.execute(select(Project).where(Project.id == project_id))
-    project = result.scalar_one_or_none()
-    if not project:
+    result = await db.execute(
+        update(Project)
+        .where(Project.id == project_id, Project.deleted_at.is_(None))
+        .values(deleted_at=func.now())
+        .returning(Project.workspace_id)
+    )
+    workspace_id = result.scalar_one_or_none()
+    if workspace_id is None:
         return False
 
-    await db.delete(project)
+    record_deletion(db, "project", project_id, workspace_id)
+    await publish_invalidation(db, INVALIDATE_PROJECT, [project_id])
+    await enqueue_job(db, PURGE_JOB)
     await db.commit()
     return True
 
@@ -76,13 +92,31 @@ async def get_project_by_id(
     :param project_id: ID проекта.
     :return: Проект в формате Pydantic модели или None, если не найдено.
     """
-    result = await db.execute(select(Project).where(Project.id == project_id))
+    result = await db.execute(select(Project).where(Project.id == project_id, Project.deleted_at.is_(None)))
     project = result.scalar_one_or_none()
     if project:
         return ProjectResponse.model_validate(project)
     return None
 
 
+async def get_projects_by_ids(db: AsyncSession, project_ids: List[int]) -> Dict[int, ProjectResponse]:
+    """
+    Извлекает неудаленные проекты по списку ID одним запросом (для загрузчика запроса).
+    Загружаются только колонки проекта, без задач и связей.
+    :param db: Сессия базы данных.
+    :param project_ids: ID проектов.
+    :return: Словарь {project_id: проект}; ненайденные проекты отсутствуют.
+    """
+    result = await db.execute(
+        select(*Project.__table__.c)
+        .where(
+            Project.id == any_(bindparam("project_ids", project_ids, type_=ARRAY(Integer))),
+            Project.deleted_at.is_(None),
+        )
+    )
+    return {row.id: ProjectResponse.model_validate(row._mapping) for row in result}
+
+
 async def get_project_with_tasks(
     db: AsyncSession, project_id: int
 ) -> Optional[ProjectWithTasks]:
@@ -127,17 +161,25 @@ async def get_tasks_for_project(db: AsyncSession, project_id: int) -> List[TaskR
 async def get_workspace_id_by_project_id(db: AsyncSession, project_id: int) -> int:
     """
     Извлекает ID рабочего пространства для указанного проекта.
+    Результат кэшируется; удаление проекта инвалидирует запись во всех процессах.
     :param db: Сессия базы данных.
     :param project_id: ID проекта.
     :return: ID рабочего пространства.
     :raises HTTPException: Если проект не найден.
     """
-    result = await db.execute(select(Project.workspace_id).where(Project.id == project_id))
+    workspace_id = project_workspace_cache.get(project_id)
+    if workspace_id is not None:
+        return workspace_id
+
+    result = await db.execute(
+        select(Project.workspace_id).where(Project.id == project_id, Project.deleted_at.is_(None))
+    )
     workspace_id = result.scalar_one_or_none()
 
     if workspace_id is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    project_workspace_cache.set(project_id, workspace_id, expires_at=lookup_expires_at())
     return workspace_id
 
 async def get_all_projects(db: AsyncSession, user: User, workspace_id: int):
@@ -148,7 +190,12 @@ async def get_all_projects(db: AsyncSession, user: User, workspace_id: int):
     :return: Список проектов в формате Pydantic моделей.
     """
     
-    result = await db.execute(select(Project).where(Project.created_by == user.id).where(Project.workspace_id == workspace_id))
+    result = await db.execute(
+        select(Project)
+        .where(Project.created_by == user.id)
+        .where(Project.workspace_id == workspace_id)
+        .where(Project.deleted_at.is_(None))
+    )
     projects = result.scalars().all()
     return [ProjectResponse.model_validate(project) for project in projects]
     
\ No newline at end of file
@@ -0,0 +1,95 @@
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update, func, exists
+from app.core.config import settings
+from app.models.workspace import Workspace
+from app.models.project import Project
+from app.models.task import Task
+from app.models.comments import Comment
+from app.models.reminder import Reminder
+from app.models.archive import ArchivedTask, ArchivedComment, ArchivedReminder
+
+# Задание очереди, которое ставится при удалении пространства или проекта
+PURGE_JOB = "soft_deleted.purge"
+
+
+async def _delete_in_batches(db: AsyncSession, model, ids_query) -> int:
+    """
+    Удаляет строки пачками по purge_batch_size, каждая пачка — в своей транзакции.
+    SKIP LOCKED позволяет воркерам очищать разные пачки параллельно.
+    """
+    total = 0
+    while True:
+        batch = ids_query.limit(settings.purge_batch_size).with_for_update(skip_locked=True, of=model)
+        result = await db.execute(delete(model).where(model.id.in_(batch)))
+        await db.commit()
+        total += result.rowcount
+        if result.rowcount < settings.purge_batch_size:
+            return total
+        # Отдаем управление циклу событий между пачками
+        await asyncio.sleep(0)
+
+
+async def purge_deleted(db: AsyncSession) -> int:
+    """
+    Фоновая очистка помеченных удаленными рабочих пространств и проектов.
+
+    Дочерние строки удаляются снизу вверх ограниченными пачками: комментарии,
+    напоминания, задачи (сначала архивные, затем основные), затем сами проекты
+    и пространства. Оставшиеся связи
+    (статистика, участники) удаляет ON DELETE CASCADE в базе данных.
+
+    :param db: Сессия базы данных.
+    :return: Количество удаленных строк.
+    """
+    # Проекты удаленных пространств помечаются удаленными и очищаются тем же путем
+    await db.execute(
+        update(Project)
+        .where(
+            Project.deleted_at.is_(None),
+            Project.workspace_id.in_(select(Workspace.id).where(Workspace.deleted_at.is_not(None))),
+        )
+        .values(deleted_at=func.now())
+    )
+    await db.commit()
+
+    deleted_projects = select(Project.id).where(Project.deleted_at.is_not(None))
+    deleted_tasks = select(Task.id).where(Task.project_id.in_(deleted_projects))
+    deleted_archived_tasks = select(ArchivedTask.id).where(ArchivedTask.project_id.in_(deleted_projects))
+
+    total = await _delete_in_batches(
+        db, ArchivedComment, select(ArchivedComment.id).where(ArchivedComment.task_id.in_(deleted_archived_tasks))
+    )
+    total += await _delete_in_batches(
+        db, ArchivedReminder, select(ArchivedReminder.id).where(ArchivedReminder.task_id.in_(deleted_archived_tasks))
+    )
+    total += await _delete_in_batches(db, ArchivedTask, deleted_archived_tasks)
+    total += await _delete_in_batches(db, Comment, select(Comment.id).where(Comment.task_id.in_(deleted_tasks)))
+    total += await _delete_in_batches(db, Reminder, select(Reminder.id).where(Reminder.task_id.in_(deleted_tasks)))
+    total += await _delete_in_batches(db, Task, deleted_tasks)
+    total += await _delete_in_batches(
+        db,
+        Project,
+        select(Project.id).where(
+            Project.deleted_at.is_not(None),
+            ~exists().where(Task.project_id == Project.id),
+            ~exists().where(ArchivedTask.project_id == Project.id),
+        ),
+    )
+    total += await _delete_in_batches(
+        db,
+        Workspace,
+        select(Workspace.id).where(
+            Workspace.deleted_at.is_not(None), ~exists().where(Project.workspace_id == Workspace.id)
+        ),
+    )
+    return total
+
+
+async def purge_deleted_job(db: AsyncSession, payload: dict) -> None:
+    """
+    Обработчик задания очереди soft_deleted.purge: очистка сразу после удаления.
+    :param db: Сессия базы данных.
+    :param payload: Не используется.
+    """
+    await purge_deleted(db)
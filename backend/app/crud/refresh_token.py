@@ -0,0 +1,109 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, func
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from app.models.refresh_token import RefreshToken
+from app.core.cache import revoked_refresh_families, used_refresh_tokens
+
+
+async def store_refresh_token(
+    db: AsyncSession, user_id: int, jti: str, family_id: str, expires_at: datetime
+) -> None:
+    """
+    Сохраняет выданный рефреш-токен.
+    :param db: Сессия базы данных.
+    :param user_id: ID пользователя.
+    :param jti: Идентификатор токена.
+    :param family_id: Идентификатор цепочки ротации.
+    :param expires_at: Срок действия токена.
+    """
+    db.add(RefreshToken(jti=jti, user_id=user_id, family_id=family_id, expires_at=expires_at))
+    await db.commit()
+
+
+async def rotate_refresh_token(
+    db: AsyncSession, jti: str, new_jti: str, expires_at: datetime
+) -> Optional[Tuple[int, str]]:
+    """
+    Ротирует рефреш-токен: помечает старый токен использованным и сохраняет новый.
+
+    Проверка и пометка выполняются одним условным UPDATE, поэтому токен
+    нельзя использовать дважды даже при параллельных запросах из разных воркеров.
+    Повторное предъявление уже использованного токена отзывает всю цепочку.
+
+    :param db: Сессия базы данных.
+    :param jti: Идентификатор предъявленного токена.
+    :param new_jti: Идентификатор нового токена.
+    :param expires_at: Срок действия нового токена.
+    :return: (user_id, family_id) или None, если токен недействителен.
+    """
+    result = await db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.jti == jti,
+            RefreshToken.replaced_by.is_(None),
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > func.now(),
+        )
+        .values(replaced_by=new_jti)
+        .returning(RefreshToken.user_id, RefreshToken.family_id, RefreshToken.expires_at)
+    )
+    row = result.first()
+    if row is None:
+        await db.rollback()
+        family_id = await db.scalar(select(RefreshToken.family_id).where(RefreshToken.jti == jti))
+        if family_id is not None:
+            await revoke_refresh_family(db, family_id)
+        return None
+
+    db.add(RefreshToken(jti=new_jti, user_id=row.user_id, family_id=row.family_id, expires_at=expires_at))
+    await db.commit()
+    used_refresh_tokens.set(jti, row.family_id, expires_at=row.expires_at.timestamp())
+    return row.user_id, row.family_id
+
+
+async def revoke_refresh_family(db: AsyncSession, family_id: str) -> None:
+    """
+    Отзывает все токены цепочки ротации.
+    :param db: Сессия базы данных.
+    :param family_id: Идентификатор цепочки ротации.
+    """
+    result = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=func.now())
+        .returning(RefreshToken.expires_at)
+    )
+    expires = [row.expires_at for row in result]
+    await db.commit()
+    if expires:
+        revoked_refresh_families.set(family_id, True, expires_at=max(expires).timestamp())
+
+
+async def load_revoked_refresh_families(db: AsyncSession) -> int:
+    """
+    Заполняет кэш отозванных цепочек из базы данных (при старте воркера).
+    :param db: Сессия базы данных.
+    :return: Количество загруженных цепочек.
+    """
+    result = await db.execute(
+        select(RefreshToken.family_id, func.max(RefreshToken.expires_at).label("expires_at"))
+        .where(RefreshToken.revoked_at.is_not(None), RefreshToken.expires_at > func.now())
+        .group_by(RefreshToken.family_id)
+    )
+    count = 0
+    for row in result:
+        revoked_refresh_families.set(row.family_id, True, expires_at=row.expires_at.timestamp())
+        count += 1
+    return count
+
+
+async def prune_refresh_tokens(db: AsyncSession) -> int:
+    """
+    Удаляет истекшие рефреш-токены.
+    :param db: Сессия базы данных.
+    :return: Количество удаленных записей.
+    """
+    result = await db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= datetime.now(timezone.utc)))
+    await db.commit()
+    return result.rowcount
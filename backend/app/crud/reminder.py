@@ -1,8 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update, func
 from typing import Optional, List
 from app.models.reminder import Reminder
+from app.models.task import Task
 from app.schemas.reminder import ReminderCreate, ReminderUpdate, ReminderResponse
+from app.crud.sync import record_deletion
 
 
 async def create_reminder(db: AsyncSession, reminder_data: ReminderCreate) -> ReminderResponse:
@@ -60,6 +63,7 @@ async def delete_reminder(db: AsyncSession, reminder_id: int) -> bool:
     if not reminder:
         return False
 
+    record_deletion(db, "reminder", reminder.id, reminder.task.project.workspace_id)
     await db.delete(reminder)
     await db.commit()
     return True
@@ -93,3 +97,25 @@ async def get_reminders_for_task(
     result = await db.execute(select(Reminder).where(Reminder.task_id == task_id))
     reminders = result.scalars().all()
     return [ReminderResponse.model_validate(reminder) for reminder in reminders]
+
+
+async def mark_reminders_sent(db: AsyncSession, user_id: int, reminder_ids: List[int]) -> int:
+    """
+    Отмечает напоминания отправленными (только по задачам пользователя).
+    :param db: Сессия базы данных.
+    :param user_id: ID исполнителя задач.
+    :param reminder_ids: ID напоминаний.
+    :return: Количество отмеченных напоминаний.
+    """
+    if not reminder_ids:
+        return 0
+    result = await db.execute(
+        update(Reminder)
+        .where(
+            Reminder.id.in_(reminder_ids),
+            Reminder.is_sent.is_(False),
+            Reminder.task_id.in_(select(Task.id).where(Task.assigned_to == user_id)),
+        )
+        .values(is_sent=True, updated_at=func.now())
+    )
+    return result.rowcount
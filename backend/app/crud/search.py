@@ -0,0 +1,117 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, literal, literal_column, or_, union_all, Float, Integer
+from typing import List, Optional, Tuple
+from app.models.task import Task
+from app.models.project import Project
+from app.models.comments import Comment
+from app.models.workspace_user import WorkspaceUser
+from app.schemas.search import SearchResult
+
+# Конфигурация должна совпадать с выражением GIN-индексов в app/core/migrations.py
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+SEARCH_TYPES = ("task", "project", "comment")
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _match(column, query: str):
+    """
+    Строит условие совпадения и оценку релевантности для текстовой колонки.
+    Все три условия обслуживаются GIN-индексами (tsvector и pg_trgm).
+    """
+    vector = func.to_tsvector(SEARCH_CONFIG, column)
+    ts_query = func.plainto_tsquery(SEARCH_CONFIG, query)
+    condition = or_(
+        vector.op("@@")(ts_query),
+        column.op("%")(query),
+        column.ilike(f"%{_escape_like(query)}%", escape="\\"),
+    )
+    rank = (func.ts_rank(vector, ts_query) + func.similarity(column, query)).cast(Float)
+    return condition, rank
+
+
+async def search(
+    db: AsyncSession,
+    user_id: int,
+    query: str,
+    types: Optional[List[str]] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> Tuple[List[SearchResult], bool]:
+    """
+    Ищет задачи, проекты и комментарии в рабочих пространствах пользователя.
+    :param db: Сессия базы данных.
+    :param user_id: ID пользователя.
+    :param query: Поисковый запрос.
+    :param types: Типы объектов для поиска (по умолчанию все).
+    :param limit: Размер страницы.
+    :param offset: Смещение.
+    :return: (результаты, есть ли следующая страница).
+    """
+    types = types or list(SEARCH_TYPES)
+    member_workspaces = select(WorkspaceUser.workspace_id).where(WorkspaceUser.user_id == user_id)
+    parts = []
+
+    if "task" in types:
+        condition, rank = _match(Task.name, query)
+        parts.append(
+            select(
+                literal("task").label("type"),
+                Task.id.label("id"),
+                Task.name.label("title"),
+                Project.workspace_id.label("workspace_id"),
+                Task.project_id.label("project_id"),
+                Task.id.label("task_id"),
+                rank.label("rank"),
+            )
+            .join(Project, Task.project_id == Project.id)
+            .where(Project.workspace_id.in_(member_workspaces), Project.deleted_at.is_(None), condition)
+        )
+
+    if "project" in types:
+        condition, rank = _match(Project.name, query)
+        parts.append(
+            select(
+                literal("project").label("type"),
+                Project.id.label("id"),
+                Project.name.label("title"),
+                Project.workspace_id.label("workspace_id"),
+                Project.id.label("project_id"),
+                literal(None, Integer).label("task_id"),
+                rank.label("rank"),
+            )
+            .where(Project.workspace_id.in_(member_workspaces), Project.deleted_at.is_(None), condition)
+        )
+
+    if "comment" in types:
+        condition, rank = _match(Comment.content, query)
+        parts.append(
+            select(
+                literal("comment").label("type"),
+                Comment.id.label("id"),
+                func.left(Comment.content, 200).label("title"),
+                Project.workspace_id.label("workspace_id"),
+                Task.project_id.label("project_id"),
+                Comment.task_id.label("task_id"),
+                rank.label("rank"),
+            )
+            .join(Task, Comment.task_id == Task.id)
+            .join(Project, Task.project_id == Project.id)
+            .where(Project.workspace_id.in_(member_workspaces), Project.deleted_at.is_(None), condition)
+        )
+
+    if not parts:
+        return [], False
+
+    combined = union_all(*parts).subquery()
+    result = await db.execute(
+        select(combined)
+        .order_by(combined.c.rank.desc(), combined.c.type, combined.c.id)
+        .limit(limit + 1)
+        .offset(offset)
+    )
+    rows = result.mappings().all()
+    return [SearchResult.model_validate(dict(row)) for row in rows[:limit]], len(rows) > limit
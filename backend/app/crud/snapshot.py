@@ -0,0 +1,128 @@
+import hashlib
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from typing import Dict, List, Optional
+from app.models.workspace import Workspace
+from app.models.workspace_user import WorkspaceUser
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.snapshot import SnapshotParams
+from app.schemas.task import TASK_LIST_FIELDS
+
+
+async def get_workspace_version(db: AsyncSession, workspace_id: int) -> Optional[str]:
+    """
+    Вычисляет версию содержимого рабочего пространства для ETag.
+
+    Один агрегирующий запрос по индексам: количество и время последнего изменения
+    проектов, задач и участников. Количество учитывает удаления, время — изменения.
+
+    :param db: Сессия базы данных.
+    :param workspace_id: ID рабочего пространства.
+    :return: Строка версии или None, если пространство не найдено.
+    """
+    workspace_projects = select(Project.id).where(Project.workspace_id == workspace_id, Project.deleted_at.is_(None))
+    projects = (
+        select(func.count(), func.max(Project.updated_at))
+        .where(Project.workspace_id == workspace_id, Project.deleted_at.is_(None))
+        .subquery()
+    )
+    tasks = (
+        select(func.count(), func.max(Task.updated_at), func.sum(Task.comment_count))
+        .where(Task.project_id.in_(workspace_projects))
+        .subquery()
+    )
+    members = (
+        select(func.count(), func.max(WorkspaceUser.updated_at), func.max(User.updated_at))
+        .join(User, User.id == WorkspaceUser.user_id)
+        .where(WorkspaceUser.workspace_id == workspace_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(Workspace.updated_at, projects, tasks, members)
+        .where(Workspace.id == workspace_id, Workspace.deleted_at.is_(None))
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return hashlib.sha256(repr(tuple(row)).encode()).hexdigest()[:32]
+
+
+def _task_columns(params: SnapshotParams) -> List[str]:
+    field_names = (
+        [name.strip() for name in params.task_fields.split(",")] if params.task_fields else list(TASK_LIST_FIELDS)
+    )
+    return list(dict.fromkeys(field_names))
+
+
+async def _get_snapshot_tasks(db: AsyncSession, workspace_id: int, params: SnapshotParams) -> Dict[int, List[dict]]:
+    field_names = _task_columns(params)
+    # project_id нужен для группировки, даже если его нет в запрошенных полях
+    columns = [Task.project_id.label("_project_id"), *(getattr(Task, name) for name in field_names)]
+    query = (
+        select(*columns)
+        .join(Project, Project.id == Task.project_id)
+        .where(Project.workspace_id == workspace_id, Project.deleted_at.is_(None))
+    )
+
+    if params.tasks_per_project is not None:
+        position = func.row_number().over(partition_by=Task.project_id, order_by=Task.id).label("_position")
+        ranked = query.add_columns(position).subquery()
+        query = (
+            select(*(ranked.c[name] for name in ["_project_id", *field_names]))
+            .where(ranked.c._position <= params.tasks_per_project)
+            .order_by(ranked.c._project_id, ranked.c._position)
+        )
+    else:
+        query = query.order_by(Task.project_id, Task.id)
+
+    result = await db.execute(query)
+    tasks: Dict[int, List[dict]] = {}
+    for row in result.mappings():
+        task = dict(row)
+        tasks.setdefault(task.pop("_project_id"), []).append(task)
+    return tasks
+
+
+async def get_workspace_snapshot(db: AsyncSession, workspace_id: int, params: SnapshotParams) -> Optional[dict]:
+    """
+    Собирает снимок рабочего пространства фиксированным числом запросов
+    (пространство, проекты, задачи всех проектов, участники) — без цикла по проектам.
+    :param db: Сессия базы данных.
+    :param workspace_id: ID рабочего пространства.
+    :param params: Глубина и выборка полей.
+    :return: Снимок в виде словаря или None, если пространство не найдено.
+    """
+    result = await db.execute(
+        select(Workspace.id, Workspace.name, Workspace.created_by, Workspace.created_at, Workspace.updated_at)
+        .where(Workspace.id == workspace_id, Workspace.deleted_at.is_(None))
+    )
+    workspace = result.mappings().first()
+    if workspace is None:
+        return None
+    snapshot = dict(workspace)
+
+    if params.depth >= 1:
+        result = await db.execute(
+            select(Project.id, Project.name, Project.created_by, Project.created_at, Project.updated_at)
+            .where(Project.workspace_id == workspace_id, Project.deleted_at.is_(None))
+            .order_by(Project.id)
+        )
+        projects = [dict(row) for row in result.mappings()]
+        if params.depth >= 2:
+            tasks = await _get_snapshot_tasks(db, workspace_id, params)
+            for project in projects:
+                project["tasks"] = tasks.get(project["id"], [])
+        snapshot["projects"] = projects
+
+    if params.include_members:
+        result = await db.execute(
+            select(WorkspaceUser.user_id, User.name, User.email, WorkspaceUser.access_level)
+            .join(User, User.id == WorkspaceUser.user_id)
+            .where(WorkspaceUser.workspace_id == workspace_id)
+            .order_by(WorkspaceUser.user_id)
+        )
+        snapshot["members"] = [dict(row) for row in result.mappings()]
+
+    return snapshot
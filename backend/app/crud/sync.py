@@ -0,0 +1,178 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, func, or_, literal
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from app.core.config import settings
+from app.models.deleted_record import DeletedRecord
+from app.models.workspace_user import WorkspaceUser
+from app.models.project import Project
+from app.models.task import Task
+from app.models.comments import Comment
+from app.models.reminder import Reminder
+from app.models.task_series import TaskSeries
+
+
+def encode_cursor(moment: datetime) -> str:
+    """
+    Кодирует момент времени в курсор синхронизации (микросекунды от эпохи).
+    """
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def decode_cursor(cursor: str) -> datetime:
+    """
+    Декодирует курсор синхронизации.
+    :raises ValueError: Если курсор некорректен.
+    """
+    return datetime.fromtimestamp(int(cursor) / 1_000_000, tz=timezone.utc)
+
+
+def record_deletion(
+    db: AsyncSession, entity_type: str, entity_id: int, workspace_id: int, user_id: Optional[int] = None
+) -> None:
+    """
+    Добавляет запись об удалении в текущую транзакцию (без коммита).
+    :param db: Сессия базы данных.
+    :param entity_type: Тип объекта (workspace, project, task_series, task, comment, reminder).
+    :param entity_id: ID объекта.
+    :param workspace_id: ID рабочего пространства объекта.
+    :param user_id: ID пользователя, если запись адресована только ему.
+    """
+    db.add(DeletedRecord(entity_type=entity_type, entity_id=entity_id, workspace_id=workspace_id, user_id=user_id))
+
+
+async def record_workspace_deletion(db: AsyncSession, workspace_id: int) -> None:
+    """
+    Записывает удаление рабочего пространства для каждого участника (без коммита).
+    После удаления участники теряют членство, поэтому записи адресуются им напрямую.
+    :param db: Сессия базы данных.
+    :param workspace_id: ID рабочего пространства.
+    """
+    await db.execute(
+        insert(DeletedRecord).from_select(
+            ["entity_type", "entity_id", "workspace_id", "user_id", "deleted_at"],
+            select(
+                literal("workspace"),
+                literal(workspace_id),
+                literal(workspace_id),
+                WorkspaceUser.user_id,
+                func.now(),
+            ).where(WorkspaceUser.workspace_id == workspace_id),
+        )
+    )
+
+
+async def get_changes(db: AsyncSession, user_id: int, since: Optional[datetime]) -> dict:
+    """
+    Извлекает изменения во всех рабочих пространствах пользователя с момента since.
+
+    updated_at присваивается до коммита, поэтому строка из долгой транзакции может
+    стать видимой уже после выдачи курсора с более поздним временем. Запрос берет
+    строки с перекрытием sync_overlap_seconds: клиент применяет их идемпотентно по id.
+    Для пространств, в которые пользователь добавлен после курсора, возвращаются все строки.
+
+    :param db: Сессия базы данных.
+    :param user_id: ID пользователя.
+    :param since: Момент предыдущей синхронизации или None для полной выгрузки.
+    :return: Словарь с курсором, изменениями и удалениями.
+    """
+    now = (await db.execute(select(func.now()))).scalar_one()
+    since_overlap = since - timedelta(seconds=settings.sync_overlap_seconds) if since is not None else None
+    user_workspaces = select(WorkspaceUser.workspace_id).where(WorkspaceUser.user_id == user_id)
+
+    def changed(column, workspace_column):
+        # Содержимое удаленных проектов не отдается: клиент удаляет его по записи об удалении проекта
+        visible = workspace_column.in_(user_workspaces) & Project.deleted_at.is_(None)
+        if since_overlap is None:
+            return visible
+        joined_workspaces = user_workspaces.where(WorkspaceUser.created_at > since_overlap)
+        return visible & ((column > since_overlap) | workspace_column.in_(joined_workspaces))
+
+    result = await db.execute(
+        select(Project.id, Project.name, Project.workspace_id, Project.created_by, Project.created_at, Project.updated_at)
+        .where(changed(Project.updated_at, Project.workspace_id))
+        .order_by(Project.id)
+    )
+    projects = [dict(row) for row in result.mappings()]
+
+    result = await db.execute(
+        select(
+            TaskSeries.id, TaskSeries.name, TaskSeries.project_id, TaskSeries.created_by, TaskSeries.assigned_to,
+            TaskSeries.priority, TaskSeries.rrule, TaskSeries.start_date, TaskSeries.end_date,
+            TaskSeries.reminder_time, TaskSeries.created_at, TaskSeries.updated_at,
+        )
+        .join(Project, Project.id == TaskSeries.project_id)
+        .where(changed(TaskSeries.updated_at, Project.workspace_id))
+        .order_by(TaskSeries.id)
+    )
+    task_series = [dict(row) for row in result.mappings()]
+
+    result = await db.execute(
+        select(
+            Task.id, Task.name, Task.project_id, Task.created_by, Task.assigned_to, Task.due_date,
+            Task.is_completed, Task.priority, Task.series_id, Task.occurrence_date, Task.created_at, Task.updated_at,
+        )
+        .join(Project, Project.id == Task.project_id)
+        .where(changed(Task.updated_at, Project.workspace_id))
+        .order_by(Task.id)
+    )
+    tasks = [dict(row) for row in result.mappings()]
+
+    result = await db.execute(
+        select(Comment.id, Comment.task_id, Comment.user_id, Comment.content, Comment.created_at, Comment.updated_at)
+        .join(Task, Task.id == Comment.task_id)
+        .join(Project, Project.id == Task.project_id)
+        .where(changed(Comment.updated_at, Project.workspace_id))
+        .order_by(Comment.id)
+    )
+    comments = [dict(row) for row in result.mappings()]
+
+    result = await db.execute(
+        select(Reminder.id, Reminder.task_id, Reminder.reminder_time, Reminder.is_sent, Reminder.updated_at)
+        .join(Task, Task.id == Reminder.task_id)
+        .join(Project, Project.id == Task.project_id)
+        .where(changed(Reminder.updated_at, Project.workspace_id))
+        .order_by(Reminder.id)
+    )
+    reminders = [dict(row) for row in result.mappings()]
+
+    deleted = []
+    if since is not None:
+        result = await db.execute(
+            select(DeletedRecord.entity_type, DeletedRecord.entity_id, DeletedRecord.deleted_at)
+            .where(
+                or_(
+                    DeletedRecord.user_id.is_(None) & DeletedRecord.workspace_id.in_(user_workspaces),
+                    DeletedRecord.user_id == user_id,
+                ),
+                DeletedRecord.deleted_at > since_overlap,
+            )
+            .order_by(DeletedRecord.id)
+        )
+        deleted = [{"type": row.entity_type, "id": row.entity_id, "deleted_at": row.deleted_at} for row in result]
+
+    # Курсор не уменьшается, даже если часы сервера отстают от времени прошлого курсора
+    cursor = max(now, since) if since is not None else now
+    return {
+        "cursor": encode_cursor(cursor),
+        "full": since is None,
+        "projects": projects,
+        "task_series": task_series,
+        "tasks": tasks,
+        "comments": comments,
+        "reminders": reminders,
+        "deleted": deleted,
+    }
+
+
+async def prune_deleted_records(db: AsyncSession) -> int:
+    """
+    Удаляет записи об удалениях старше срока хранения.
+    Клиенты с более старым курсором получают требование полной синхронизации.
+    :param db: Сессия базы данных.
+    :return: Количество удаленных записей.
+    """
+    expired = datetime.now(timezone.utc) - timedelta(days=settings.sync_tombstone_retention_days)
+    result = await db.execute(delete(DeletedRecord).where(DeletedRecord.deleted_at < expired))
+    await db.commit()
+    return result.rowcount
@@ -2,13 +2,23 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload, joinedload
 from sqlalchemy.orm import aliased
-from typing import Optional, List
+from sqlalchemy import case, update, func, any_, bindparam, union_all
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import Integer
+from typing import Optional, List, Dict
 from app.models.task import Task
+from app.models.archive import ArchivedTask
 from app.models.project import Project
 from app.models.workspace import Workspace
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskWithReminders
-from datetime import date
+from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskWithReminders, TaskListParams, TASK_LIST_FIELDS
+from datetime import date, datetime
 from app.models.reminder import Reminder
+from app.crud.task_stats import track_task_change, task_state, lock_task_state
+from app.crud.sync import record_deletion
+from app.crud.task_series import get_user_occurrences, exclude_occurrence
+from app.core.cache import task_project_cache, project_workspace_cache, lookup_expires_at
+from app.core.invalidation import publish_invalidation, INVALIDATE_TASK
+from fastapi import HTTPException
 
 async def create_task(db: AsyncSession, task_data: TaskCreate) -> TaskResponse:
     """
@@ -39,6 +49,9 @@ async def create_task(db: AsyncSession, task_data: TaskCreate) -> TaskResponse:
         )
         db.add(reminder)
 
+    # Учитываем задачу в статистике в той же транзакции
+    await track_task_change(db, None, task_state(new_task))
+
     # Фиксируем изменения
     await db.commit()
 
@@ -62,41 +75,36 @@ async def create_task(db: AsyncSession, task_data: TaskCreate) -> TaskResponse:
     return task_response
 
 
-async def update_task(
-    db: AsyncSession, task_id: int, task_data: TaskUpdate
-) -> Optional[TaskResponse]:
+async def update_task(db: AsyncSession, task: Task, task_data: TaskUpdate) -> TaskResponse:
     """
     Обновляет данные задачи.
     :param db: Сессия базы данных.
-    :param task_id: ID задачи.
+    :param task: Задача, уже загруженная в этой сессии (например, загрузчиком запроса).
     :param task_data: Новые данные для обновления задачи.
-    :return: Обновленная задача в формате Pydantic модели или None, если не найдена.
+    :return: Обновленная задача в формате Pydantic модели.
     """
-    result = await db.execute(select(Task).where(Task.id == task_id))
-    task = result.scalar_one_or_none()
-    if not task:
-        return None
-
+    before = task_state(task)
     if task_data.name is not None:
         task.name = task_data.name
 
+    await track_task_change(db, before, task_state(task))
     await db.commit()
     await db.refresh(task)
     return TaskResponse.model_validate(task)
 
 
-async def delete_task(db: AsyncSession, task_id: int) -> bool:
+async def delete_task(db: AsyncSession, task: Task) -> bool:
     """
-    Удаляет задачу.
+    Удаляет задачу. Для вхождения серии дата исключается из серии.
     :param db: Сессия базы данных.
-    :param task_id: ID задачи.
-    :return: True, если удаление успешно, иначе False.
+    :param task: Задача, уже загруженная в этой сессии (например, загрузчиком запроса).
+    :return: True, если удаление успешно.
     """
-    result = await db.execute(select(Task).where(Task.id == task_id))
-    task = result.scalar_one_or_none()
-    if not task:
-        return False
-
+    await track_task_change(db, await lock_task_state(db, task), None)
+    if task.series_id is not None:
+        await exclude_occurrence(db, task.series_id, task.occurrence_date)
+    record_deletion(db, "task", task.id, task.project.workspace_id)
+    await publish_invalidation(db, INVALIDATE_TASK, [task.id])
     await db.delete(task)
     await db.commit()
     return True
@@ -109,13 +117,32 @@ async def get_task_by_id(db: AsyncSession, task_id: int) -> Optional[TaskRespons
     :param task_id: ID задачи.
     :return: Задача в формате Pydantic модели или None, если не найдена.
     """
-    result = await db.execute(select(Task).where(Task.id == task_id))
+    result = await db.execute(
+        select(Task)
+        .join(Project, Task.project_id == Project.id)
+        .where(Task.id == task_id, Project.deleted_at.is_(None))
+    )
     task = result.scalar_one_or_none()
     if task:
         return task
     return None
 
 
+async def get_tasks_by_ids(db: AsyncSession, task_ids: List[int]) -> Dict[int, Task]:
+    """
+    Извлекает задачи неудаленных проектов по списку ID одним запросом (для загрузчика запроса).
+    :param db: Сессия базы данных.
+    :param task_ids: ID задач.
+    :return: Словарь {task_id: задача}; ненайденные задачи отсутствуют.
+    """
+    result = await db.execute(
+        select(Task)
+        .join(Project, Task.project_id == Project.id)
+        .where(Task.id == any_(bindparam("task_ids", task_ids, type_=ARRAY(Integer))), Project.deleted_at.is_(None))
+    )
+    return {task.id: task for task in result.unique().scalars().all()}
+
+
 async def get_task_with_reminders(
     db: AsyncSession, task_id: int
 ) -> Optional[TaskWithReminders]:
@@ -139,54 +166,129 @@ async def get_task_with_reminders(
     return None
 
 
-async def get_tasks_for_project(
-    db: AsyncSession, project_id: int
-) -> List[TaskResponse]:
-    """
-    Извлекает все задачи для проекта.
-    :param db: Сессия базы данных.
-    :param project_id: ID проекта.
-    :return: Список задач в формате Pydantic моделей.
-    """
-    result = await db.execute(select(Task).where(Task.project_id == project_id))
-    tasks = result.scalars().all()
-    return [TaskResponse.model_validate(task) for task in tasks]
+def _task_sort_column(columns, name: str):
+    if name == "priority":
+        # Порядок приоритетов (строковое значение сортируется неверно)
+        return case({"low": 1, "normal": 2, "high": 3}, value=columns.priority, else_=0)
+    return getattr(columns, name)
 
 
-async def get_user_tasks_by_date(
-    db: AsyncSession, user_id: int, target_date: date
+def _task_list_filters(model, project_id: int, params: TaskListParams) -> list:
+    # Условия списка задач проекта для основной или архивной таблицы
+    conditions = [model.project_id == project_id]
+    if params.is_completed is not None:
+        conditions.append(model.is_completed == params.is_completed)
+    if params.priority:
+        conditions.append(model.priority.in_(params.priority))
+    if params.assigned_to is not None:
+        if params.assigned_to == 0:
+            conditions.append(model.assigned_to.is_(None))
+        else:
+            conditions.append(model.assigned_to == params.assigned_to)
+    if params.due_from is not None:
+        conditions.append(model.due_date >= params.due_from)
+    if params.due_to is not None:
+        conditions.append(model.due_date <= params.due_to)
+    return conditions
+
+
+async def get_tasks_for_project(
+    db: AsyncSession, project_id: int, params: Optional[TaskListParams] = None
 ) -> List[dict]:
     """
-    Извлекает все задачи пользователя на указанную дату с указанием проектов и рабочих пространств.
+    Извлекает задачи проекта с фильтрацией, сортировкой и выборкой полей.
+
+    Запрос выбирает только нужные колонки (без загрузки ORM-объектов и их связей),
+    а фильтры по проекту, статусу, исполнителю и сроку обслуживаются индексами.
+    С include_archived к задачам добавляются архивные (UNION ALL с tasks_archive).
+
     :param db: Сессия базы данных.
-    :param user_id: ID пользователя.
-    :param target_date: Дата, для которой извлекаются задачи.
+    :param project_id: ID проекта.
+    :param params: Параметры фильтрации, сортировки и выборки полей.
     :return: Список задач в виде словарей.
     """
-    # Запрос задач пользователя на указанную дату
-    tasks_query = (
+    params = params or TaskListParams()
+    field_names = (
+        [name.strip() for name in params.fields.split(",")] if params.fields else list(TASK_LIST_FIELDS)
+    )
+    sort_items = [item.strip() for item in params.sort.split(",")] if params.sort else []
+    field_names = list(dict.fromkeys(field_names))
+
+    if params.include_archived:
+        # Объединение выбирает и колонки сортировки, даже если их нет среди полей ответа
+        names = list(dict.fromkeys(field_names + [item.lstrip("-") for item in sort_items] + ["id"]))
+        tasks = union_all(
+            select(*(getattr(Task, name) for name in names)).where(*_task_list_filters(Task, project_id, params)),
+            select(*(getattr(ArchivedTask, name) for name in names)).where(
+                *_task_list_filters(ArchivedTask, project_id, params)
+            ),
+        ).subquery("project_tasks")
+        columns = tasks.c
+        query = select(*(tasks.c[name] for name in field_names))
+    else:
+        columns = Task
+        query = select(*(getattr(Task, name) for name in field_names)).where(
+            *_task_list_filters(Task, project_id, params)
+        )
+
+    order_by = []
+    for item in sort_items:
+        column = _task_sort_column(columns, item.lstrip("-"))
+        order_by.append(column.desc().nulls_last() if item.startswith("-") else column.asc().nulls_last())
+    order_by.append(columns.id)
+    query = query.order_by(*order_by).offset(params.offset)
+    if params.limit is not None:
+        query = query.limit(params.limit)
+
+    result = await db.execute(query)
+    return [dict(row) for row in result.mappings()]
+
+
+def _agenda_query(model, user_id: int, date_from: date, date_to: date):
+    # Задачи пользователя за период из основной или архивной таблицы
+    return (
         select(
-            Task.id,
-            Task.name,
-            Task.due_date,
-            Task.is_completed,
-            Task.created_at,
-            Task.updated_at,
+            model.id,
+            model.name,
+            model.due_date,
+            model.is_completed,
+            model.priority,
+            model.series_id,
+            model.occurrence_date,
+            model.created_at,
+            model.updated_at,
             Project.name.label("project_name"),
             Workspace.name.label("workspace_name"),
         )
-        .join(Project, Task.project_id == Project.id)
+        .join(Project, model.project_id == Project.id)
         .join(Workspace, Project.workspace_id == Workspace.id)
         .where(
-            Task.assigned_to == user_id,  # Условие: задачи, назначенные пользователю
-            Task.due_date == target_date,  # Условие: задачи на указанную дату
+            model.assigned_to == user_id,  # Условие: задачи, назначенные пользователю
+            model.due_date.between(date_from, date_to),  # Условие: задачи за период
+            Project.deleted_at.is_(None),  # Условие: проект не удален
         )
-        .order_by(Task.due_date, Task.id)  # Сортировка
     )
 
-    # Выполнение запроса
-    result = await db.execute(tasks_query)
+
+async def get_user_agenda(
+    db: AsyncSession, user_id: int, date_from: date, date_to: date, include_archived: bool = False
+) -> List[dict]:
+    """
+    Извлекает задачи пользователя за период с указанием проектов и рабочих пространств,
+    включая вычисленные на лету вхождения повторяющихся задач (id=None).
+    :param db: Сессия базы данных.
+    :param user_id: ID пользователя.
+    :param date_from: Начало периода (включительно).
+    :param date_to: Конец периода (включительно).
+    :param include_archived: Включать задачи, перенесенные в архив.
+    :return: Список задач в виде словарей, отсортированный по сроку.
+    """
+    # Запрос задач пользователя за период
+    result = await db.execute(_agenda_query(Task, user_id, date_from, date_to))
     rows = result.fetchall()
+    if include_archived:
+        result = await db.execute(_agenda_query(ArchivedTask, user_id, date_from, date_to))
+        rows.extend(result.fetchall())
 
     # Преобразование данных в список словарей
     tasks = [
@@ -197,10 +299,104 @@ async def get_user_tasks_by_date(
             "workspace": row.workspace_name,
             "due_date": row.due_date.isoformat(),
             "is_completed": row.is_completed,
+            "priority": row.priority,
+            "series_id": row.series_id,
+            "occurrence_date": row.occurrence_date.isoformat() if row.occurrence_date else None,
             "created_at": row.created_at.isoformat(),
             "updated_at": row.updated_at.isoformat(),
         }
         for row in rows
     ]
 
-    return tasks
\ No newline at end of file
+    # Вхождения серий, которые еще не материализованы
+    tasks.extend(await get_user_occurrences(db, user_id, date_from, date_to))
+    tasks.sort(key=lambda task: (task["due_date"], task["id"] is None, task["id"] or 0))
+    return tasks
+
+
+async def get_user_tasks_by_date(
+    db: AsyncSession, user_id: int, target_date: date, include_archived: bool = False
+) -> List[dict]:
+    """
+    Извлекает все задачи пользователя на указанную дату с указанием проектов и рабочих пространств.
+    :param db: Сессия базы данных.
+    :param user_id: ID пользователя.
+    :param target_date: Дата, для которой извлекаются задачи.
+    :param include_archived: Включать задачи, перенесенные в архив.
+    :return: Список задач в виде словарей.
+    """
+    return await get_user_agenda(db, user_id, target_date, target_date, include_archived)
+
+
+async def get_workspace_id_by_task_id(db: AsyncSession, task_id: int) -> int:
+    """
+    Извлекает ID рабочего пространства задачи одним запросом по колонкам,
+    без загрузки задачи и ее связей.
+    Принадлежность задачи проекту и проекта пространству кэшируется раздельно:
+    удаление проекта инвалидирует только его запись, а не записи всех его задач.
+    :param db: Сессия базы данных.
+    :param task_id: ID задачи.
+    :return: ID рабочего пространства.
+    :raises HTTPException: Если задача не найдена.
+    """
+    project_id = task_project_cache.get(task_id)
+    if project_id is not None:
+        workspace_id = project_workspace_cache.get(project_id)
+        if workspace_id is not None:
+            return workspace_id
+
+    result = await db.execute(
+        select(Task.project_id, Project.workspace_id)
+        .join(Project, Project.id == Task.project_id)
+        .where(Task.id == task_id, Project.deleted_at.is_(None))
+    )
+    row = result.one_or_none()
+
+    if row is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    expires_at = lookup_expires_at()
+    task_project_cache.set(task_id, row.project_id, expires_at=expires_at)
+    project_workspace_cache.set(row.project_id, row.workspace_id, expires_at=expires_at)
+    return row.workspace_id
+
+
+async def apply_completion_batch(db: AsyncSession, operations: List[dict]) -> None:
+    """
+    Применяет пачку отметок выполнения из очереди отложенной записи.
+    Каждая операция несет время постановки (changed_at), и отметка применяется, только
+    если она позже уже записанной в completion_changed_at. Поэтому побеждает последняя
+    отметка, в каком бы воркере и в каком бы порядке ни применялись пачки, а повторное
+    воспроизведение журнала ничего не меняет. Статистика меняется только для задач,
+    у которых изменился флаг выполнения.
+    :param db: Сессия базы данных.
+    :param operations: Операции "task_completion" в порядке постановки.
+    """
+    latest = {}
+    for operation in operations:
+        # Операции из журналов, записанных до появления changed_at, считаются самыми старыми
+        changed_at = datetime.fromisoformat(operation.get("changed_at", "1970-01-01T00:00:00+00:00"))
+        current = latest.get(operation["task_id"])
+        if current is None or changed_at >= current[1]:
+            latest[operation["task_id"]] = (operation["is_completed"], changed_at)
+
+    # Строки блокируются в порядке ID, чтобы параллельные пачки не взаимоблокировались
+    result = await db.execute(
+        select(Task.id, Task.project_id, Task.assigned_to, Task.is_completed, Task.completion_changed_at)
+        .where(Task.id.in_(latest))
+        .order_by(Task.id)
+        .with_for_update()
+    )
+    for row in result.all():
+        is_completed, changed_at = latest[row.id]
+        if row.completion_changed_at is not None and row.completion_changed_at >= changed_at:
+            continue
+        values = {"completion_changed_at": changed_at}
+        if row.is_completed != is_completed:
+            values.update(is_completed=is_completed, completed_at=func.now() if is_completed else None)
+        await db.execute(
+            update(Task).where(Task.id == row.id).values(**values).execution_options(synchronize_session=False)
+        )
+        await track_task_change(
+            db, (row.project_id, row.assigned_to, row.is_completed), (row.project_id, row.assigned_to, is_completed)
+        )
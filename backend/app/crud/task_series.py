@@ -0,0 +1,318 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, or_, union_all
+from sqlalchemy.dialects.postgresql import insert
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+from app.core.recurrence import RecurrenceRule
+from app.models.task_series import TaskSeries, SeriesReminderSent, SeriesException
+from app.models.task import Task
+from app.models.project import Project
+from app.models.workspace import Workspace
+from app.models.reminder import Reminder
+from app.schemas.task_series import TaskSeriesCreate, TaskSeriesResponse
+from app.schemas.reminder import SeriesOccurrenceRef
+from app.core.config import settings
+from app.crud.task_stats import track_task_change
+from app.crud.sync import record_deletion
+
+
+async def create_task_series(db: AsyncSession, series_data: TaskSeriesCreate) -> TaskSeriesResponse:
+    """
+    Создает серию повторяющихся задач. Вхождения не создаются заранее.
+    :param db: Сессия базы данных.
+    :param series_data: Данные для создания серии.
+    :return: Созданная серия в формате Pydantic модели.
+    """
+    rule = RecurrenceRule.parse(series_data.rrule)
+    new_series = TaskSeries(
+        name=series_data.name,
+        project_id=series_data.project_id,
+        created_by=series_data.created_by,
+        assigned_to=series_data.assigned_to or None,
+        priority=series_data.priority,
+        rrule=series_data.rrule,
+        start_date=series_data.start_date,
+        end_date=rule.last_occurrence(series_data.start_date),
+        reminder_time=series_data.reminder_time,
+    )
+    db.add(new_series)
+    await db.commit()
+    await db.refresh(new_series)
+    return TaskSeriesResponse.model_validate(new_series)
+
+
+async def get_task_series_by_id(db: AsyncSession, series_id: int) -> Optional[TaskSeries]:
+    """
+    Извлекает серию по ID (кроме серий удаленных проектов).
+    :param db: Сессия базы данных.
+    :param series_id: ID серии.
+    :return: Серия или None, если не найдена.
+    """
+    result = await db.execute(
+        select(TaskSeries)
+        .join(Project, Project.id == TaskSeries.project_id)
+        .where(TaskSeries.id == series_id, Project.deleted_at.is_(None))
+    )
+    return result.scalar_one_or_none()
+
+
+async def delete_task_series(db: AsyncSession, series: TaskSeries, workspace_id: int) -> None:
+    """
+    Удаляет серию вместе с материализованными вхождениями (ON DELETE CASCADE).
+    :param db: Сессия базы данных.
+    :param series: Серия.
+    :param workspace_id: ID рабочего пространства серии.
+    """
+    result = await db.execute(
+        select(Task.project_id, Task.assigned_to, Task.is_completed)
+        .where(Task.series_id == series.id)
+        .with_for_update()
+    )
+    for state in result.all():
+        await track_task_change(db, tuple(state), None)
+    record_deletion(db, "task_series", series.id, workspace_id)
+    await db.execute(delete(TaskSeries).where(TaskSeries.id == series.id))
+    await db.commit()
+
+
+async def materialize_occurrence(db: AsyncSession, series: TaskSeries, occurrence_date: date) -> Optional[Task]:
+    """
+    Создает задачу для вхождения серии, если ее еще нет (без коммита).
+    Вызывается только при изменении или выполнении вхождения. Напоминание
+    создается, только если его время еще не наступило: наступившее уже было
+    выдано как напоминание серии.
+    :param db: Сессия базы данных.
+    :param series: Серия.
+    :param occurrence_date: Дата вхождения.
+    :return: Задача вхождения или None, если дата не является вхождением серии или вхождение удалено.
+    """
+    if not RecurrenceRule.parse(series.rrule).includes(series.start_date, occurrence_date):
+        return None
+    excluded = await db.execute(
+        select(SeriesException.series_id).where(
+            SeriesException.series_id == series.id, SeriesException.occurrence_date == occurrence_date
+        )
+    )
+    if excluded.first() is not None:
+        return None
+
+    statement = (
+        insert(Task)
+        .values(
+            name=series.name,
+            project_id=series.project_id,
+            created_by=series.created_by,
+            assigned_to=series.assigned_to,
+            due_date=occurrence_date,
+            priority=series.priority,
+            is_completed=False,
+            series_id=series.id,
+            occurrence_date=occurrence_date,
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+        )
+        .on_conflict_do_nothing(
+            index_elements=[Task.series_id, Task.occurrence_date],
+            index_where=Task.series_id.is_not(None),
+        )
+        .returning(Task.id)
+    )
+    created_id = (await db.execute(statement)).scalar_one_or_none()
+    if created_id is not None:
+        await track_task_change(db, None, (series.project_id, series.assigned_to, False))
+        if series.reminder_time is not None:
+            reminder_time = datetime.combine(occurrence_date, series.reminder_time, tzinfo=timezone.utc)
+            if reminder_time > datetime.now(timezone.utc):
+                db.add(Reminder(task_id=created_id, reminder_time=reminder_time))
+        await db.flush()
+
+    result = await db.execute(
+        select(Task).where(Task.series_id == series.id, Task.occurrence_date == occurrence_date)
+    )
+    return result.scalar_one()
+
+
+async def exclude_occurrence(db: AsyncSession, series_id: int, occurrence_date: date) -> None:
+    """
+    Исключает дату из серии при удалении материализованного вхождения (без коммита):
+    иначе после удаления задачи вхождение снова вычислялось бы по правилу серии.
+    :param db: Сессия базы данных.
+    :param series_id: ID серии.
+    :param occurrence_date: Дата вхождения.
+    """
+    await db.execute(
+        insert(SeriesException)
+        .values(series_id=series_id, occurrence_date=occurrence_date)
+        .on_conflict_do_nothing()
+    )
+
+
+async def _get_user_series(db: AsyncSession, user_id: int, date_from: date, date_to: date, *conditions):
+    result = await db.execute(
+        select(
+            TaskSeries.id,
+            TaskSeries.name,
+            TaskSeries.project_id,
+            TaskSeries.priority,
+            TaskSeries.rrule,
+            TaskSeries.start_date,
+            TaskSeries.reminder_time,
+            Project.name.label("project_name"),
+            Workspace.name.label("workspace_name"),
+        )
+        .join(Project, TaskSeries.project_id == Project.id)
+        .join(Workspace, Project.workspace_id == Workspace.id)
+        .where(
+            TaskSeries.assigned_to == user_id,
+            TaskSeries.start_date <= date_to,
+            or_(TaskSeries.end_date.is_(None), TaskSeries.end_date >= date_from),
+            Project.deleted_at.is_(None),
+            *conditions,
+        )
+    )
+    series_rows = result.all()
+    if not series_rows:
+        return [], set()
+
+    # Материализованные вхождения заменяют вычисленные, удаленные не вычисляются
+    series_ids = [row.id for row in series_rows]
+    result = await db.execute(
+        union_all(
+            select(Task.series_id, Task.occurrence_date).where(
+                Task.series_id.in_(series_ids),
+                Task.occurrence_date.between(date_from, date_to),
+            ),
+            select(SeriesException.series_id, SeriesException.occurrence_date).where(
+                SeriesException.series_id.in_(series_ids),
+                SeriesException.occurrence_date.between(date_from, date_to),
+            ),
+        )
+    )
+    return series_rows, {tuple(row) for row in result}
+
+
+async def get_user_occurrences(db: AsyncSession, user_id: int, date_from: date, date_to: date) -> List[dict]:
+    """
+    Вычисляет нематериализованные вхождения серий пользователя в диапазоне дат.
+    :param db: Сессия базы данных.
+    :param user_id: ID исполнителя.
+    :param date_from: Начало диапазона (включительно).
+    :param date_to: Конец диапазона (включительно).
+    :return: Список вхождений в виде словарей (id=None).
+    """
+    series_rows, materialized = await _get_user_series(db, user_id, date_from, date_to)
+    occurrences = []
+    for row in series_rows:
+        rule = RecurrenceRule.parse(row.rrule)
+        for occurrence_date in rule.occurrences(row.start_date, date_from, date_to):
+            if (row.id, occurrence_date) in materialized:
+                continue
+            occurrences.append({
+                "id": None,
+                "name": row.name,
+                "project": row.project_name,
+                "workspace": row.workspace_name,
+                "due_date": occurrence_date.isoformat(),
+                "is_completed": False,
+                "priority": row.priority,
+                "series_id": row.id,
+                "occurrence_date": occurrence_date.isoformat(),
+                "created_at": None,
+                "updated_at": None,
+            })
+    return occurrences
+
+
+async def get_due_series_reminders(
+    db: AsyncSession, user_id: int, now: datetime, lookback: timedelta
+) -> List[dict]:
+    """
+    Вычисляет наступившие напоминания нематериализованных вхождений серий
+    (кроме отмеченных отправленными через mark_series_reminders_sent).
+    Для материализованных вхождений напоминание хранится в таблице reminders.
+    :param db: Сессия базы данных.
+    :param user_id: ID исполнителя.
+    :param now: Текущее время (UTC).
+    :param lookback: Насколько далеко в прошлое искать пропущенные напоминания.
+    :return: Список напоминаний в формате get_user_reminders (reminder_id=None).
+    """
+    date_from, date_to = (now - lookback).date(), now.date()
+    series_rows, materialized = await _get_user_series(
+        db, user_id, date_from, date_to, TaskSeries.reminder_time.is_not(None)
+    )
+    if not series_rows:
+        return []
+    result = await db.execute(
+        select(SeriesReminderSent.series_id, SeriesReminderSent.occurrence_date).where(
+            SeriesReminderSent.series_id.in_([row.id for row in series_rows]),
+            SeriesReminderSent.occurrence_date.between(date_from, date_to),
+        )
+    )
+    sent = {tuple(row) for row in result}
+
+    reminders = []
+    for row in series_rows:
+        rule = RecurrenceRule.parse(row.rrule)
+        for occurrence_date in rule.occurrences(row.start_date, date_from, date_to):
+            reminder_time = datetime.combine(occurrence_date, row.reminder_time, tzinfo=timezone.utc)
+            if (row.id, occurrence_date) in materialized or (row.id, occurrence_date) in sent:
+                continue
+            if not now - lookback <= reminder_time <= now:
+                continue
+            reminders.append({
+                "reminder_id": None,
+                "reminder_time": reminder_time,
+                "due_date": occurrence_date,
+                "task_id": None,
+                "task_name": row.name,
+                "project_id": row.project_id,
+                "series_id": row.id,
+                "occurrence_date": occurrence_date,
+                "need_notification": True,
+            })
+    return reminders
+
+
+async def mark_series_reminders_sent(
+    db: AsyncSession, user_id: int, occurrences: List[SeriesOccurrenceRef]
+) -> int:
+    """
+    Отмечает напоминания вхождений серий отправленными (только для серий пользователя).
+    :param db: Сессия базы данных.
+    :param user_id: ID исполнителя серий.
+    :param occurrences: Вхождения серий.
+    :return: Количество новых отметок.
+    """
+    if not occurrences:
+        return 0
+    result = await db.execute(
+        select(TaskSeries.id).where(
+            TaskSeries.id.in_({occurrence.series_id for occurrence in occurrences}),
+            TaskSeries.assigned_to == user_id,
+        )
+    )
+    own_series = set(result.scalars().all())
+    rows = [
+        {"series_id": occurrence.series_id, "occurrence_date": occurrence.occurrence_date}
+        for occurrence in occurrences
+        if occurrence.series_id in own_series
+    ]
+    if not rows:
+        return 0
+    result = await db.execute(insert(SeriesReminderSent).values(rows).on_conflict_do_nothing())
+    return result.rowcount
+
+
+async def prune_series_reminders_sent(db: AsyncSession) -> int:
+    """
+    Удаляет отметки об отправке старше глубины поиска напоминаний серий:
+    такие вхождения уже не попадают в GET /user/reminders.
+    :param db: Сессия базы данных.
+    :return: Количество удаленных отметок.
+    """
+    expired = (
+        datetime.now(timezone.utc) - timedelta(hours=settings.recurring_reminder_lookback_hours, days=1)
+    ).date()
+    result = await db.execute(delete(SeriesReminderSent).where(SeriesReminderSent.occurrence_date < expired))
+    await db.commit()
+    return result.rowcount
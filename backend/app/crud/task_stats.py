@@ -0,0 +1,189 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, text, literal_column, union_all
+from sqlalchemy.dialects.postgresql import insert
+from typing import Dict, List, Optional, Tuple
+from app.models.task import Task
+from app.models.archive import ArchivedTask
+from app.models.project import Project
+from app.models.task_stats import TaskStats
+from app.schemas.task_stats import AssigneeStats, ProjectStats, WorkspaceStats
+
+# Состояние задачи, влияющее на статистику: (project_id, assigned_to, is_completed)
+TaskState = Tuple[int, Optional[int], bool]
+
+# Ключ advisory-блокировки пересчета: его выполняет один воркер
+RECONCILE_LOCK_ID = 7_300_003
+
+
+def task_state(task) -> TaskState:
+    """
+    Возвращает состояние задачи для учета в статистике.
+    """
+    return task.project_id, task.assigned_to, bool(task.is_completed)
+
+
+async def lock_task_state(db: AsyncSession, task: Task) -> TaskState:
+    """
+    Блокирует строку задачи до конца транзакции (FOR UPDATE) и перечитывает ее состояние.
+    Без блокировки два параллельных изменения одной задачи прочитали бы одно и то же
+    исходное состояние и дважды применили бы одну дельту статистики.
+    Вызывается до изменения задачи: перечитанные колонки заменяют загруженные.
+    :param db: Сессия базы данных.
+    :param task: Задача, загруженная в этой сессии.
+    :return: Состояние задачи до изменения.
+    """
+    await db.refresh(task, attribute_names=["project_id", "assigned_to", "is_completed"], with_for_update=True)
+    return task_state(task)
+
+
+async def apply_task_stats_delta(
+    db: AsyncSession, project_id: int, assignee_id: Optional[int], open_delta: int, completed_delta: int
+) -> None:
+    """
+    Изменяет счетчики статистики в текущей транзакции (без коммита).
+    :param db: Сессия базы данных.
+    :param project_id: ID проекта.
+    :param assignee_id: ID исполнителя или None.
+    :param open_delta: Изменение числа открытых задач.
+    :param completed_delta: Изменение числа выполненных задач.
+    """
+    statement = insert(TaskStats).values(
+        project_id=project_id,
+        assignee_id=assignee_id or 0,
+        open_count=open_delta,
+        completed_count=completed_delta,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[TaskStats.project_id, TaskStats.assignee_id],
+        set_={
+            "open_count": TaskStats.open_count + statement.excluded.open_count,
+            "completed_count": TaskStats.completed_count + statement.excluded.completed_count,
+        },
+    )
+    await db.execute(statement)
+
+
+async def track_task_change(db: AsyncSession, before: Optional[TaskState], after: Optional[TaskState]) -> None:
+    """
+    Учитывает в статистике создание (before=None), изменение или удаление (after=None) задачи.
+    Вызывается до коммита, чтобы статистика менялась в той же транзакции, что и задача.
+    :param db: Сессия базы данных.
+    :param before: Состояние задачи до изменения.
+    :param after: Состояние задачи после изменения.
+    """
+    if before == after:
+        return
+    if before is not None:
+        project_id, assigned_to, is_completed = before
+        await apply_task_stats_delta(db, project_id, assigned_to, -int(not is_completed), -int(is_completed))
+    if after is not None:
+        project_id, assigned_to, is_completed = after
+        await apply_task_stats_delta(db, project_id, assigned_to, int(not is_completed), int(is_completed))
+
+
+def _assignee_stats(rows) -> List[AssigneeStats]:
+    totals: Dict[int, List[int]] = {}
+    for row in rows:
+        counts = totals.setdefault(row.assignee_id, [0, 0])
+        counts[0] += row.open_count
+        counts[1] += row.completed_count
+    return [
+        AssigneeStats(assignee_id=assignee_id or None, open=open_count, completed=completed_count)
+        for assignee_id, (open_count, completed_count) in sorted(totals.items())
+        if open_count or completed_count
+    ]
+
+
+async def _overdue_counts(db: AsyncSession, project_filter) -> Dict[int, int]:
+    # Просроченность зависит от текущей даты, поэтому считается по частичному индексу открытых задач
+    result = await db.execute(
+        select(Task.project_id, func.count())
+        .where(project_filter, Task.is_completed.is_(False), Task.due_date < func.current_date())
+        .group_by(Task.project_id)
+    )
+    return {project_id: count for project_id, count in result}
+
+
+def _project_stats(project_id: int, rows, overdue: int) -> ProjectStats:
+    return ProjectStats(
+        project_id=project_id,
+        open=sum(row.open_count for row in rows),
+        completed=sum(row.completed_count for row in rows),
+        overdue=overdue,
+        by_assignee=_assignee_stats(rows),
+    )
+
+
+async def get_project_stats(db: AsyncSession, project_id: int) -> ProjectStats:
+    """
+    Извлекает статистику задач проекта.
+    :param db: Сессия базы данных.
+    :param project_id: ID проекта.
+    :return: Статистика проекта.
+    """
+    result = await db.execute(select(TaskStats).where(TaskStats.project_id == project_id))
+    rows = result.scalars().all()
+    overdue = await _overdue_counts(db, Task.project_id == project_id)
+    return _project_stats(project_id, rows, overdue.get(project_id, 0))
+
+
+async def get_workspace_stats(db: AsyncSession, workspace_id: int) -> WorkspaceStats:
+    """
+    Извлекает статистику задач рабочего пространства с разбивкой по проектам.
+    :param db: Сессия базы данных.
+    :param workspace_id: ID рабочего пространства.
+    :return: Статистика рабочего пространства.
+    """
+    workspace_projects = select(Project.id).where(Project.workspace_id == workspace_id, Project.deleted_at.is_(None))
+    result = await db.execute(select(TaskStats).where(TaskStats.project_id.in_(workspace_projects)))
+    rows = result.scalars().all()
+    overdue = await _overdue_counts(db, Task.project_id.in_(workspace_projects))
+
+    by_project: Dict[int, list] = {}
+    for row in rows:
+        by_project.setdefault(row.project_id, []).append(row)
+    projects = [
+        _project_stats(project_id, project_rows, overdue.get(project_id, 0))
+        for project_id, project_rows in sorted(by_project.items())
+    ]
+    return WorkspaceStats(
+        workspace_id=workspace_id,
+        open=sum(p.open for p in projects),
+        completed=sum(p.completed for p in projects),
+        overdue=sum(p.overdue for p in projects),
+        by_assignee=_assignee_stats(rows),
+        projects=projects,
+    )
+
+
+async def reconcile_task_stats(db: AsyncSession) -> None:
+    """
+    Пересчитывает статистику по таблице задач, исправляя накопившиеся расхождения.
+    Задачи, перенесенные в архив, учитываются как выполненные.
+    Блокировка таблицы статистики на время пересчета не дает параллельным
+    изменениям задач потерять свои дельты. Пересчет выполняет один воркер
+    (остальные пропускают запуск) и только по расписанию, не при старте.
+    :param db: Сессия базы данных.
+    """
+    locked = await db.execute(text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": RECONCILE_LOCK_ID})
+    if not locked.scalar_one():
+        return
+    tasks = union_all(
+        select(Task.project_id, Task.assigned_to, Task.is_completed),
+        select(ArchivedTask.project_id, ArchivedTask.assigned_to, ArchivedTask.is_completed),
+    ).subquery("all_tasks")
+    assignee = func.coalesce(tasks.c.assigned_to, literal_column("0"))
+    await db.execute(text("LOCK TABLE task_stats IN EXCLUSIVE MODE"))
+    await db.execute(delete(TaskStats))
+    await db.execute(
+        insert(TaskStats).from_select(
+            ["project_id", "assignee_id", "open_count", "completed_count"],
+            select(
+                tasks.c.project_id,
+                assignee,
+                func.count().filter(tasks.c.is_completed.is_(False)),
+                func.count().filter(tasks.c.is_completed.is_(True)),
+            ).group_by(tasks.c.project_id, assignee),
+        )
+    )
+    await db.commit()
@@ -0,0 +1,502 @@
+import asyncio
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, insert, func, text, union_all
+from sqlalchemy.types import Date, Time
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.invalidation import publish_invalidation, INVALIDATE_ROLES
+from app.core.packfile import pack_record, read_records
+from app.models.transfer_job import TransferJob
+from app.models.user import User
+from app.models.workspace import Workspace
+from app.models.workspace_user import WorkspaceUser
+from app.models.project import Project
+from app.models.task_series import TaskSeries
+from app.models.task import Task
+from app.models.reminder import Reminder
+from app.models.comments import Comment
+from app.models.archive import ArchivedTask, ArchivedReminder, ArchivedComment
+
+EXPORT_FORMAT = "taskmanager.workspace"
+EXPORT_VERSION = 1
+
+# Выгружаемые таблицы в порядке зависимостей и их колонки (порядок колонок — порядок значений в строках).
+# members — пользователи пространства: при загрузке они сопоставляются по email с пользователями,
+# которые уже состоят в одном из рабочих пространств загружающего; пароли не выгружаются.
+TABLE_COLUMNS: Dict[str, List[str]] = {
+    "members": ["user_id", "email", "name", "access_level"],
+    "projects": ["id", "name", "created_by", "created_at", "updated_at"],
+    "task_series": [
+        "id", "project_id", "name", "created_by", "assigned_to", "priority", "rrule",
+        "start_date", "end_date", "reminder_time", "created_at", "updated_at",
+    ],
+    "tasks": [
+        "id", "project_id", "name", "created_by", "assigned_to", "due_date", "is_completed", "priority",
+        "series_id", "occurrence_date", "comment_count", "last_comment_at", "created_at", "updated_at",
+    ],
+    "reminders": ["id", "task_id", "reminder_time", "is_sent", "created_at", "updated_at"],
+    "comments": ["id", "task_id", "user_id", "content", "created_at", "updated_at"],
+}
+
+TABLE_MODELS = {
+    "projects": Project,
+    "task_series": TaskSeries,
+    "tasks": Task,
+    "reminders": Reminder,
+    "comments": Comment,
+}
+
+# Архивные таблицы выгружаются вместе с основными (при загрузке строки попадают в основные таблицы)
+ARCHIVE_MODELS = {
+    "tasks": ArchivedTask,
+    "reminders": ArchivedReminder,
+    "comments": ArchivedComment,
+}
+
+# Допустимые уровни доступа участников в загружаемом файле
+MEMBER_ACCESS_LEVELS = ("admin", "editor", "member", "viewer")
+
+# Таблицы, для строк которых при загрузке заранее выделяются новые ID (на них ссылаются другие таблицы)
+MAPPED_TABLES = ("projects", "task_series", "tasks")
+
+IMPORT_SQL: List[str] = [
+    # Участники сопоставляются по email только с пользователями, с которыми загружающий уже
+    # состоит в одном рабочем пространстве: иначе файл позволил бы добавить в пространство
+    # любого зарегистрированного пользователя и писать комментарии от его имени
+    """
+    CREATE TEMP TABLE import_user_map ON COMMIT DROP AS
+    SELECT DISTINCT ON (m.user_id) m.user_id AS old_id, u.id AS new_id, m.access_level
+    FROM import_members m JOIN users u ON u.email = m.email
+    WHERE u.id = CAST(:user_id AS integer) OR u.id IN (
+        SELECT colleague.user_id
+        FROM workspace_users own
+        JOIN workspaces w ON w.id = own.workspace_id AND w.deleted_at IS NULL
+        JOIN workspace_users colleague ON colleague.workspace_id = own.workspace_id
+        WHERE own.user_id = CAST(:user_id AS integer)
+    )
+    ORDER BY m.user_id, u.id
+    """,
+    """
+    INSERT INTO workspace_users (workspace_id, user_id, access_level, created_at, updated_at)
+    SELECT CAST(:workspace_id AS integer), CAST(:user_id AS integer), 'admin', now(), now()
+    UNION ALL
+    SELECT CAST(:workspace_id AS integer), new_id, access_level, now(), now()
+    FROM import_user_map WHERE new_id <> CAST(:user_id AS integer)
+    """,
+    *(
+        f"""
+        CREATE TEMP TABLE import_{table}_map ON COMMIT DROP AS
+        SELECT id AS old_id, CAST(nextval(pg_get_serial_sequence('{table}', 'id')) AS integer) AS new_id
+        FROM import_{table}
+        """
+        for table in MAPPED_TABLES
+    ),
+    # Автоочистка не собирает статистику временных таблиц
+    "ANALYZE " + ", ".join(
+        [f"import_{table}" for table in TABLE_COLUMNS] + ["import_user_map"] + [f"import_{t}_map" for t in MAPPED_TABLES]
+    ),
+    # Авторство пользователей, не найденных по email, переходит к загружающему; исполнитель сбрасывается
+    """
+    INSERT INTO projects (id, name, workspace_id, created_by, created_at, updated_at)
+    SELECT pm.new_id, p.name, CAST(:workspace_id AS integer), coalesce(cu.new_id, CAST(:user_id AS integer)),
+        p.created_at, p.updated_at
+    FROM import_projects p
+    JOIN import_projects_map pm ON pm.old_id = p.id
+    LEFT JOIN import_user_map cu ON cu.old_id = p.created_by
+    """,
+    """
+    INSERT INTO task_series (
+        id, project_id, name, created_by, assigned_to, priority, rrule,
+        start_date, end_date, reminder_time, created_at, updated_at
+    )
+    SELECT sm.new_id, pm.new_id, s.name, coalesce(cu.new_id, CAST(:user_id AS integer)), au.new_id, s.priority,
+        s.rrule, s.start_date, s.end_date, s.reminder_time, s.created_at, s.updated_at
+    FROM import_task_series s
+    JOIN import_task_series_map sm ON sm.old_id = s.id
+    JOIN import_projects_map pm ON pm.old_id = s.project_id
+    LEFT JOIN import_user_map cu ON cu.old_id = s.created_by
+    LEFT JOIN import_user_map au ON au.old_id = s.assigned_to
+    """,
+    """
+    INSERT INTO tasks (
+        id, project_id, name, created_by, assigned_to, due_date, is_completed, priority,
+        series_id, occurrence_date, comment_count, last_comment_at, completed_at, created_at, updated_at
+    )
+    SELECT tm.new_id, pm.new_id, t.name, coalesce(cu.new_id, CAST(:user_id AS integer)), au.new_id, t.due_date,
+        t.is_completed, t.priority, sm.new_id, CASE WHEN sm.new_id IS NOT NULL THEN t.occurrence_date END,
+        t.comment_count, t.last_comment_at, CASE WHEN t.is_completed THEN t.updated_at END,
+        t.created_at, t.updated_at
+    FROM import_tasks t
+    JOIN import_tasks_map tm ON tm.old_id = t.id
+    JOIN import_projects_map pm ON pm.old_id = t.project_id
+    LEFT JOIN import_task_series_map sm ON sm.old_id = t.series_id
+    LEFT JOIN import_user_map cu ON cu.old_id = t.created_by
+    LEFT JOIN import_user_map au ON au.old_id = t.assigned_to
+    """,
+    """
+    INSERT INTO reminders (task_id, reminder_time, is_sent, created_at, updated_at)
+    SELECT tm.new_id, r.reminder_time, r.is_sent, r.created_at, r.updated_at
+    FROM import_reminders r
+    JOIN import_tasks_map tm ON tm.old_id = r.task_id
+    """,
+    """
+    INSERT INTO comments (task_id, user_id, content, created_at, updated_at)
+    SELECT tm.new_id, coalesce(um.new_id, CAST(:user_id AS integer)), c.content, c.created_at, c.updated_at
+    FROM import_comments c
+    JOIN import_tasks_map tm ON tm.old_id = c.task_id
+    LEFT JOIN import_user_map um ON um.old_id = c.user_id
+    """,
+    # Проекты новые, поэтому статистика вставляется без слияния с существующей
+    """
+    INSERT INTO task_stats (project_id, assignee_id, open_count, completed_count)
+    SELECT t.project_id, coalesce(t.assigned_to, 0),
+        count(*) FILTER (WHERE NOT t.is_completed), count(*) FILTER (WHERE t.is_completed)
+    FROM tasks t JOIN import_projects_map pm ON pm.new_id = t.project_id
+    GROUP BY 1, 2
+    """,
+]
+
+
+def export_file_path(job_id: int) -> str:
+    return os.path.join(settings.transfer_dir, f"export-{job_id}.msgpack")
+
+
+def import_file_path(job_id: int) -> str:
+    return os.path.join(settings.transfer_dir, f"import-{job_id}.msgpack")
+
+
+async def create_transfer_job(
+    db: AsyncSession, kind: str, user_id: int, workspace_id: Optional[int] = None
+) -> TransferJob:
+    """
+    Создает задание выгрузки или загрузки в состоянии pending (без коммита).
+    :param db: Сессия базы данных.
+    :param kind: Тип задания (export, import).
+    :param user_id: ID пользователя, запустившего задание.
+    :param workspace_id: ID выгружаемого рабочего пространства.
+    :return: Созданное задание (file_path — путь к файлу задания).
+    """
+    job = TransferJob(kind=kind, status="pending", user_id=user_id, workspace_id=workspace_id)
+    db.add(job)
+    await db.flush()
+    job.file_path = export_file_path(job.id) if kind == "export" else import_file_path(job.id)
+    return job
+
+
+async def get_transfer_job(db: AsyncSession, job_id: int, user_id: int) -> Optional[TransferJob]:
+    """
+    Извлекает задание пользователя по ID.
+    :param db: Сессия базы данных.
+    :param job_id: ID задания.
+    :param user_id: ID пользователя.
+    :return: Задание или None, если не найдено или принадлежит другому пользователю.
+    """
+    result = await db.execute(select(TransferJob).where(TransferJob.id == job_id, TransferJob.user_id == user_id))
+    return result.scalar_one_or_none()
+
+
+async def count_active_transfer_jobs(db: AsyncSession, user_id: int) -> int:
+    """
+    Считает незавершенные задания пользователя.
+    :param db: Сессия базы данных.
+    :param user_id: ID пользователя.
+    :return: Количество заданий в состоянии pending или running.
+    """
+    result = await db.execute(
+        select(func.count()).where(
+            TransferJob.user_id == user_id, TransferJob.status.in_(["pending", "running"])
+        )
+    )
+    return result.scalar_one()
+
+
+async def _update_job(job_id: int, **values) -> None:
+    # Состояние пишется отдельной транзакцией, чтобы прогресс видели запросы других воркеров
+    async with SessionLocal() as db:
+        await db.execute(
+            update(TransferJob).where(TransferJob.id == job_id).values(updated_at=func.now(), **values)
+        )
+        await db.commit()
+
+
+def _remove_files(*paths: str) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+async def _fail_job(job_id: int, error: str, *paths: str) -> None:
+    _remove_files(*paths)
+    await _update_job(job_id, status="failed", error=error[:1000], finished_at=func.now())
+
+
+async def _is_finished(db: AsyncSession, job_id: int) -> bool:
+    # Задание очереди может выполниться повторно: завершенное не повторяется
+    status = (await db.execute(select(TransferJob.status).where(TransferJob.id == job_id))).scalar_one_or_none()
+    return status is None or status in ("done", "failed")
+
+
+def _export_queries(workspace_id: int) -> Dict[str, Any]:
+    def columns(table: str, model=None) -> list:
+        model = model or TABLE_MODELS[table]
+        return [getattr(model, column) for column in TABLE_COLUMNS[table]]
+
+    def with_archive(table: str, condition) -> Any:
+        # Строки основной и архивной таблицы; condition(model) — условие для каждой из них
+        model, archive = TABLE_MODELS[table], ARCHIVE_MODELS[table]
+        return union_all(
+            select(*columns(table)).where(condition(model)),
+            select(*columns(table, archive)).where(condition(archive)),
+        )
+
+    live_projects = select(Project.id).where(Project.workspace_id == workspace_id, Project.deleted_at.is_(None))
+    workspace_tasks = union_all(
+        select(Task.id).where(Task.project_id.in_(live_projects)),
+        select(ArchivedTask.id).where(ArchivedTask.project_id.in_(live_projects)),
+    )
+    return {
+        "members": select(WorkspaceUser.user_id, User.email, User.name, WorkspaceUser.access_level)
+        .join(User, User.id == WorkspaceUser.user_id)
+        .where(WorkspaceUser.workspace_id == workspace_id),
+        "projects": select(*columns("projects")).where(Project.id.in_(live_projects)),
+        "task_series": select(*columns("task_series")).where(TaskSeries.project_id.in_(live_projects)),
+        "tasks": with_archive("tasks", lambda model: model.project_id.in_(live_projects)),
+        "reminders": with_archive("reminders", lambda model: model.task_id.in_(workspace_tasks)),
+        "comments": with_archive("comments", lambda model: model.task_id.in_(workspace_tasks)),
+    }
+
+
+async def _write(file: BinaryIO, record: Any) -> None:
+    # Сериализация пачки строк занимает заметное время, поэтому выполняется вне цикла событий
+    await asyncio.to_thread(lambda: file.write(pack_record(record)))
+
+
+async def run_export(db: AsyncSession, payload: dict) -> None:
+    """
+    Выгружает рабочее пространство в файл (обработчик задания очереди transfer.export).
+    Все таблицы читаются из одного снимка базы серверными курсорами,
+    в памяти находится только текущая пачка из transfer_batch_size строк.
+    Ошибки в данных завершают задание; прочие ошибки передаются очереди для повтора.
+    :param db: Сессия базы данных.
+    :param payload: {"job_id": ID задания, "workspace_id": ID рабочего пространства}.
+    """
+    job_id, workspace_id = payload["job_id"], payload["workspace_id"]
+    path = export_file_path(job_id)
+    partial = path + ".part"
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    if await _is_finished(db, job_id):
+        return
+    try:
+        workspace = (
+            await db.execute(
+                select(Workspace.name, Workspace.created_at)
+                .where(Workspace.id == workspace_id, Workspace.deleted_at.is_(None))
+            )
+        ).one_or_none()
+        if workspace is None:
+            raise ValueError("Workspace not found")
+
+        queries = _export_queries(workspace_id)
+        counts = {}
+        for table, query in queries.items():
+            counts[table] = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar_one()
+        await _update_job(job_id, status="running", total_rows=sum(counts.values()), processed_rows=0)
+
+        processed = 0
+        with open(partial, "wb") as file:
+            await _write(file, {
+                "format": EXPORT_FORMAT,
+                "version": EXPORT_VERSION,
+                "workspace": {"id": workspace_id, "name": workspace.name, "created_at": workspace.created_at},
+                "exported_at": datetime.now(timezone.utc),
+                "counts": counts,
+            })
+            for table, query in queries.items():
+                await _write(file, {"table": table, "columns": TABLE_COLUMNS[table]})
+                result = await db.stream(query.execution_options(yield_per=settings.transfer_batch_size))
+                async for rows in result.partitions():
+                    await _write(file, {"rows": [list(row) for row in rows]})
+                    processed += len(rows)
+                    await _update_job(job_id, processed_rows=processed)
+            # Признак конца файла: без него загрузка считает файл обрезанным
+            await _write(file, {"end": True})
+        await db.rollback()
+        os.replace(partial, path)
+        await _update_job(job_id, status="done", finished_at=func.now())
+    except ValueError as error:
+        await _fail_job(job_id, str(error), partial)
+    except BaseException:
+        _remove_files(partial)
+        raise
+
+
+async def _read_records(file: BinaryIO) -> AsyncIterator[Any]:
+    records = read_records(file)
+    while True:
+        record = await asyncio.to_thread(next, records, None)
+        if record is None:
+            return
+        yield record
+
+
+def _converters(table: str) -> List[Optional[Callable[[Any], Any]]]:
+    # date и time записаны строками ISO; COPY в двоичном формате требует объекты Python
+    if table not in TABLE_MODELS:
+        return [None] * len(TABLE_COLUMNS[table])
+    converters = []
+    for column in TABLE_COLUMNS[table]:
+        column_type = TABLE_MODELS[table].__table__.c[column].type
+        if isinstance(column_type, Date):
+            converters.append(date.fromisoformat)
+        elif isinstance(column_type, Time):
+            converters.append(time.fromisoformat)
+        else:
+            converters.append(None)
+    return converters
+
+
+async def _load_staging(db: AsyncSession, records: AsyncIterator[Any], job_id: int) -> int:
+    # Строки файла загружаются COPY во временные таблицы с исходными ID
+    await db.execute(text(
+        "CREATE TEMP TABLE import_members "
+        "(user_id integer, email varchar(150), name varchar(100), access_level varchar(50)) ON COMMIT DROP"
+    ))
+    for table in TABLE_MODELS:
+        await db.execute(text(
+            f"CREATE TEMP TABLE import_{table} ON COMMIT DROP AS "
+            f"SELECT {', '.join(TABLE_COLUMNS[table])} FROM {table} WITH NO DATA"
+        ))
+    connection = await (await db.connection()).get_raw_connection()
+    driver = connection.driver_connection
+
+    table, converters, processed = None, [], 0
+    async for record in records:
+        if not isinstance(record, dict):
+            raise ValueError("Invalid record")
+        if "table" in record:
+            table = record["table"]
+            if TABLE_COLUMNS.get(table) != record.get("columns"):
+                raise ValueError(f"Unexpected table or columns: {table}")
+            converters = _converters(table)
+        elif "rows" in record:
+            if table is None:
+                raise ValueError("Rows before table header")
+            rows = [
+                tuple(
+                    convert(value) if convert is not None and value is not None else value
+                    for convert, value in zip(converters, row)
+                )
+                for row in record["rows"]
+            ]
+            await driver.copy_records_to_table(f"import_{table}", records=rows, columns=TABLE_COLUMNS[table])
+            processed += len(rows)
+            await _update_job(job_id, processed_rows=processed)
+        elif record.get("end"):
+            return processed
+    raise ValueError("Truncated file")
+
+
+async def _insert_imported(db: AsyncSession, user_id: int, name: str) -> Tuple[int, List[int]]:
+    # Перенос из временных таблиц с новыми ID выполняется на стороне базы
+    workspace_id = (
+        await db.execute(
+            insert(Workspace)
+            .values(name=name, created_by=user_id, created_at=func.now(), updated_at=func.now())
+            .returning(Workspace.id)
+        )
+    ).scalar_one()
+    invalid = await db.execute(
+        text("SELECT EXISTS (SELECT 1 FROM import_members WHERE access_level IS NULL OR access_level <> ALL(:levels))"),
+        {"levels": list(MEMBER_ACCESS_LEVELS)},
+    )
+    if invalid.scalar_one():
+        raise ValueError("Invalid member access level")
+    params = {"workspace_id": workspace_id, "user_id": user_id}
+    for statement in IMPORT_SQL:
+        await db.execute(text(statement), params)
+    result = await db.execute(select(WorkspaceUser.user_id).where(WorkspaceUser.workspace_id == workspace_id))
+    return workspace_id, list(result.scalars().all())
+
+
+async def run_import(db: AsyncSession, payload: dict) -> None:
+    """
+    Загружает файл выгрузки как новое рабочее пространство (обработчик задания очереди transfer.import).
+    Строки загружаются COPY во временные таблицы, затем переносятся в рабочие
+    таблицы с новыми ID одной транзакцией вместе с отметкой о завершении задания:
+    при ошибке не остается частичных данных, а повтор не загрузит файл дважды.
+    Ошибки в файле завершают задание; прочие ошибки передаются очереди для повтора.
+    :param db: Сессия базы данных.
+    :param payload: {"job_id": ID задания, "user_id": ID пользователя (становится администратором
+        пространства), "name": название нового пространства (по умолчанию — из файла)}.
+    """
+    job_id, user_id, name = payload["job_id"], payload["user_id"], payload.get("name")
+    path = import_file_path(job_id)
+    if await _is_finished(db, job_id):
+        await db.rollback()
+        _remove_files(path)
+        return
+    await db.rollback()
+    try:
+        with open(path, "rb") as file:
+            records = _read_records(file)
+            header = await anext(records, None)
+            if (
+                not isinstance(header, dict)
+                or header.get("format") != EXPORT_FORMAT
+                or header.get("version") != EXPORT_VERSION
+            ):
+                raise ValueError("Unsupported file format")
+            total = sum(int(count) for count in (header.get("counts") or {}).values())
+            await _update_job(job_id, status="running", total_rows=total, processed_rows=0)
+            processed = await _load_staging(db, records, job_id)
+
+        workspace_name = (name or header["workspace"]["name"])[:100]
+        workspace_id, member_ids = await _insert_imported(db, user_id, workspace_name)
+        await db.execute(
+            update(TransferJob)
+            .where(TransferJob.id == job_id)
+            .values(
+                status="done",
+                workspace_id=workspace_id,
+                processed_rows=processed,
+                finished_at=func.now(),
+                updated_at=func.now(),
+            )
+        )
+        await publish_invalidation(db, INVALIDATE_ROLES, member_ids)
+        await db.commit()
+    except ValueError as error:
+        await db.rollback()
+        await _fail_job(job_id, str(error), path)
+        return
+    _remove_files(path)
+
+
+async def prune_transfer_jobs(db: AsyncSession) -> None:
+    """
+    Отмечает прерванные задания (воркер завершился без отчета) и удаляет
+    задания и файлы старше transfer_retention_hours.
+    :param db: Сессия базы данных.
+    """
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        update(TransferJob)
+        .where(
+            TransferJob.status.in_(["pending", "running"]),
+            TransferJob.updated_at < now - timedelta(minutes=settings.transfer_stale_minutes),
+        )
+        .values(status="failed", error="Interrupted", finished_at=now)
+    )
+    result = await db.execute(
+        delete(TransferJob)
+        .where(TransferJob.created_at < now - timedelta(hours=settings.transfer_retention_hours))
+        .returning(TransferJob.file_path)
+    )
+    for path in result.scalars().all():
+        for candidate in (path, f"{path}.part") if path else ():
+            if os.path.exists(candidate):
+                os.remove(candidate)
+    await db.commit()
@@ -1,12 +1,16 @@
-from hmac import new
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from typing import Optional, List
+from sqlalchemy.orm import selectinload, noload
+from sqlalchemy.engine import Row
+from typing import Optional, List, Dict
 from app.models.user import User
 from app.schemas.user import UserResponse, UserWithWorkspaces, UserCreate
-from app.core.security import hash_password, verify_password
-from sqlalchemy.exc import IntegrityError
+from app.core.security import hash_password
+from sqlalchemy import update, func, any_, bindparam, literal, exists
+from sqlalchemy.types import String, Text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import Integer
+from sqlalchemy.dialects.postgresql import insert
 
 
 async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[UserResponse]:
@@ -16,8 +20,9 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[UserRespons
     :param user_id: ID пользователя.
     :return: Данные пользователя в формате Pydantic модели или None.
     """
+    # Связи пользователя (пространства, проекты, задачи) для ответа не нужны
     result = await db.execute(
-        select(User).where(User.id == user_id)
+        select(User).options(noload("*")).where(User.id == user_id)
     )
     user = result.scalar_one_or_none()
     if user:
@@ -25,6 +30,20 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[UserRespons
     return None
 
 
+async def get_users_by_ids(db: AsyncSession, user_ids: List[int]) -> Dict[int, UserResponse]:
+    """
+    Извлекает пользователей по списку ID одним запросом (для загрузчика запроса).
+    :param db: Сессия базы данных.
+    :param user_ids: ID пользователей.
+    :return: Словарь {user_id: пользователь}; ненайденные пользователи отсутствуют.
+    """
+    result = await db.execute(
+        select(User.id, User.name, User.email, User.created_at, User.updated_at)
+        .where(User.id == any_(bindparam("user_ids", user_ids, type_=ARRAY(Integer))))
+    )
+    return {row.id: UserResponse.model_validate(row._mapping) for row in result}
+
+
 async def get_user_with_workspaces(db: AsyncSession, user_id: int) -> Optional[UserWithWorkspaces]:
     """
     Извлекает пользователя с его рабочими пространствами.
@@ -50,27 +69,58 @@ async def get_user_with_workspaces(db: AsyncSession, user_id: int) -> Optional[U
     return None
 
 
-async def create_user(db: AsyncSession, user_data: UserCreate) -> UserResponse:
+async def create_user(db: AsyncSession, user_data: UserCreate) -> Optional[UserResponse]:
     """
-    Создает нового пользователя.
+    Создает нового пользователя одним запросом INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING,
+    без повторного чтения пользователя и его связей. Занятость email без учета регистра
+    проверяется в самом запросе: уникального индекса ux_users_email_lower может не быть,
+    если в базе остались адреса, различающиеся только регистром.
     :param db: Сессия базы данных.
     :param user_data: Данные для создания пользователя.
-    :return: Созданный пользователь в формате Pydantic модели.
+    :return: Созданный пользователь в формате Pydantic модели или None, если email занят
+        (без учета регистра).
+    """
+    hashed_password = await hash_password(user_data.password)
+    email_taken = exists().where(func.lower(User.email) == func.lower(user_data.email))
+    result = await db.execute(
+        insert(User)
+        .from_select(
+            ["name", "email", "password", "created_at", "updated_at"],
+            select(
+                literal(user_data.name, String),
+                literal(user_data.email, String),
+                literal(hashed_password, Text),
+                func.now(),
+                func.now(),
+            ).where(~email_taken),
+        )
+        .on_conflict_do_nothing()
+        .returning(User.id, User.name, User.email, User.created_at, User.updated_at)
+    )
+    row = result.one_or_none()
+    await db.commit()
+    if row is None:
+        return None
+    return UserResponse.model_validate(row._mapping)
+
+
+async def get_login_credentials(db: AsyncSession, email: str) -> Optional[Row]:
     """
-    hashed_password = hash_password(user_data.password)
-    new_user = User(
-        name=user_data.name,
-        email=user_data.email,
-        password=hashed_password,
+    Извлекает только ID и хэш пароля пользователя по email без учета регистра
+    (по индексу ux_users_email_lower). Если остались адреса, различающиеся только
+    регистром, выбирается точное совпадение, а при его отсутствии — пользователь
+    с наименьшим ID.
+    :param db: Сессия базы данных.
+    :param email: Email пользователя.
+    :return: Строка (id, password) или None, если пользователь не найден.
+    """
+    result = await db.execute(
+        select(User.id, User.password)
+        .where(func.lower(User.email) == func.lower(email))
+        .order_by((User.email == email).desc(), User.id)
+        .limit(1)
     )
-    try:
-        db.add(new_user)
-        await db.commit()
-        await db.refresh(new_user)
-        return UserResponse.model_validate(new_user)
-    except IntegrityError:
-        await db.rollback()
-        raise IntegrityError("User with this email already exists.", params=None)
+    return result.first()
 
 
 async def get_user_by_email(db: AsyncSession, email: str) -> User:
@@ -81,4 +131,21 @@ async def get_user_by_email(db: AsyncSession, email: str) -> User:
     :return: Пользователь или None, если не найден.
     """
     result = await db.execute(select(User).where(User.email == email))
-    return result.scalar_one_or_none()
\ No newline at end of file
+    return result.scalar_one_or_none()
+
+
+async def update_password_hash(db: AsyncSession, user_id: int, old_hash: str, new_hash: str) -> bool:
+    """
+    Заменяет хэш пароля пересчитанным по текущей политике.
+    Хэш заменяется, только если пароль не сменили параллельно.
+    :param db: Сессия базы данных.
+    :param user_id: ID пользователя.
+    :param old_hash: Хэш, по которому проверялся пароль.
+    :param new_hash: Новый хэш того же пароля.
+    :return: True, если хэш обновлен.
+    """
+    result = await db.execute(
+        update(User).where(User.id == user_id, User.password == old_hash).values(password=new_hash)
+    )
+    await db.commit()
+    return result.rowcount > 0
@@ -1,11 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, update, func
 from sqlalchemy.orm import selectinload
 from typing import Optional
 from app.models.user import User
 from app.models.workspace import Workspace
 from app.schemas.workspace import WorkspaceCreate, WorkspaceUpdate, WorkspaceResponse
 from app.models.workspace_user import WorkspaceUser
+from app.models.project import Project
+from app.crud.sync import record_workspace_deletion
+from app.crud.purge import PURGE_JOB
+from app.core.jobs import enqueue_job
+from app.core.invalidation import publish_invalidation, INVALIDATE_ROLES, INVALIDATE_PROJECT
 
 
 async def create_workspace(db: AsyncSession, workspace_data: WorkspaceCreate) -> WorkspaceResponse:
@@ -49,7 +54,9 @@ async def update_workspace(
     :param workspace_data: Новые данные для обновления рабочего пространства.
     :return: Обновленное рабочее пространство в формате Pydantic модели или None, если не найдено.
     """
-    result = await db.execute(select(Workspace).where(Workspace.id == workspace_id))
+    result = await db.execute(
+        select(Workspace).where(Workspace.id == workspace_id, Workspace.deleted_at.is_(None))
+    )
     workspace = result.scalar_one_or_none()
     if not workspace:
         return None
@@ -64,17 +71,30 @@ async def update_workspace(
 
 async def delete_workspace(db: AsyncSession, workspace_id: int) -> bool:
     """
-    Удаляет рабочее пространство.
+    Помечает рабочее пространство удаленным. Участники сразу теряют доступ,
+    а проекты, задачи и комментарии удаляются фоновой очисткой (задание очереди soft_deleted.purge).
     :param db: Сессия базы данных.
     :param workspace_id: ID рабочего пространства.
     :return: True, если удаление успешно, иначе False.
     """
-    result = await db.execute(select(Workspace).where(Workspace.id == workspace_id))
-    workspace = result.scalar_one_or_none()
-    if not workspace:
+    result = await db.execute(
+        update(Workspace)
+        .where(Workspace.id == workspace_id, Workspace.deleted_at.is_(None))
+        .values(deleted_at=func.now())
+        .returning(Workspace.id)
+    )
+    if result.scalar_one_or_none() is None:
         return False
 
-    await db.delete(workspace)
+    await record_workspace_deletion(db, workspace_id)
+    result = await db.execute(
+        delete(WorkspaceUser).where(WorkspaceUser.workspace_id == workspace_id).returning(WorkspaceUser.user_id)
+    )
+    member_ids = result.scalars().all()
+    project_ids = (await db.execute(select(Project.id).where(Project.workspace_id == workspace_id))).scalars().all()
+    await publish_invalidation(db, INVALIDATE_ROLES, member_ids)
+    await publish_invalidation(db, INVALIDATE_PROJECT, project_ids)
+    await enqueue_job(db, PURGE_JOB)
     await db.commit()
     return True
 
@@ -86,7 +106,12 @@ async def get_workspace_by_id(db: AsyncSession, workspace_id: int, user: User) -
     :param workspace_id: ID рабочего пространства.
     :return: Рабочее пространство в формате Pydantic модели или None, если не найдено.
     """
-    result = await db.execute(select(Workspace).where(Workspace.id == workspace_id).where(Workspace.created_by == User.id))
+    result = await db.execute(
+        select(Workspace)
+        .where(Workspace.id == workspace_id)
+        .where(Workspace.created_by == User.id)
+        .where(Workspace.deleted_at.is_(None))
+    )
     workspace = result.scalar_one_or_none()  
     if workspace:
         return WorkspaceResponse.model_validate(workspace)
@@ -99,6 +124,8 @@ async def get_workspaces_user(db: AsyncSession, user: User):
     :param db: Сессия базы данных
     :param user: Объект пользователя из БД 
     """
-    result = await db.execute(select(Workspace).where(Workspace.created_by == user.id))
+    result = await db.execute(
+        select(Workspace).where(Workspace.created_by == user.id).where(Workspace.deleted_at.is_(None))
+    )
     workspaces = result.scalars().all()
     return [WorkspaceResponse.model_validate(w) for w in workspaces]
\ No newline at end of file
@@ -1,6 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import Optional, List
+from typing import Optional, List, Dict
+from app.core.invalidation import publish_invalidation, INVALIDATE_ROLES
+from app.crud.sync import record_deletion
 from app.models.workspace_user import WorkspaceUser
 from app.schemas.workspace_user import WorkspaceUserCreate, WorkspaceUserUpdate, WorkspaceUserResponse
 
@@ -41,6 +43,7 @@ async def update_workspace_user(
     if workspace_user_data.access_level is not None:
         workspace_user.access_level = workspace_user_data.access_level
 
+    await publish_invalidation(db, INVALIDATE_ROLES, [workspace_user.user_id])
     await db.commit()
     await db.refresh(workspace_user)
     return WorkspaceUserResponse.model_validate(workspace_user)
@@ -58,7 +61,11 @@ async def delete_workspace_user(db: AsyncSession, workspace_user_id: int) -> boo
     if not workspace_user:
         return False
 
+    user_id = workspace_user.user_id
+    # Для исключенного участника пространство выглядит удаленным
+    record_deletion(db, "workspace", workspace_user.workspace_id, workspace_user.workspace_id, user_id=user_id)
     await db.delete(workspace_user)
+    await publish_invalidation(db, INVALIDATE_ROLES, [user_id])
     await db.commit()
     return True
 
@@ -88,4 +95,25 @@ async def get_users_in_workspace(db: AsyncSession, workspace_id: int) -> List[Wo
     workspace_users = result.scalars().all()
 
     # Преобразуем записи ORM в Pydantic-модели
-    return [WorkspaceUserResponse.model_validate(user) for user in workspace_users]
\ No newline at end of file
+    return [WorkspaceUserResponse.model_validate(user) for user in workspace_users]
+
+
+async def get_user_workspace_roles(
+    db: AsyncSession, user_id: int, limit: Optional[int] = None
+) -> Dict[int, str]:
+    """
+    Извлекает карту ролей пользователя: ID рабочего пространства -> уровень доступа.
+    :param db: Сессия базы данных.
+    :param user_id: ID пользователя.
+    :param limit: Максимальное количество рабочих пространств в карте.
+    :return: Словарь {workspace_id: access_level}.
+    """
+    query = (
+        select(WorkspaceUser.workspace_id, WorkspaceUser.access_level)
+        .where(WorkspaceUser.user_id == user_id)
+        .order_by(WorkspaceUser.workspace_id)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    result = await db.execute(query)
+    return {row.workspace_id: row.access_level for row in result}
@@ -1,10 +1,33 @@
 # app/main.py
+import asyncio
+import math
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
-from app.core.database import engine, Base
-from app.models import user, workspace, workspace_user, project, task, reminder
+from app.core.database import engine, Base, SessionLocal
+from app.core.migrations import apply_schema
+from app.core.partitions import maintain_partitions
+from app.core.background import register_periodic_job, start_periodic_jobs, stop_periodic_jobs
+from app.core.write_behind import write_behind
+from app.core.replicas import replica_router, poll_replica_lag, SAFE_METHODS, LAST_WRITE_COOKIE
+from app.core.jobs import register_job_handler, job_worker, prune_jobs
+from app.core.listener import pg_listener
+from app.core.invalidation import start_invalidation_bus
+from app.core.security import configure_password_hashing
+from app.core.compression import CompressionMiddleware
+from app.models import user, workspace, workspace_user, project, task, reminder, refresh_token, rate_limit, task_stats, deleted_record, task_series, transfer_job, job, archive
+from app.crud.refresh_token import load_revoked_refresh_families, prune_refresh_tokens
+from app.crud.task_stats import reconcile_task_stats
+from app.crud.sync import prune_deleted_records
+from app.crud.purge import purge_deleted, purge_deleted_job, PURGE_JOB
+from app.crud.comments import apply_comment_batch
+from app.crud.task import apply_completion_batch
+from app.crud.transfer import prune_transfer_jobs, run_export, run_import
+from app.crud.archive import archive_completed_tasks
+from app.crud.task_series import prune_series_reminders_sent
+from app.core.config import settings
 from app.routers.api.auth import router as auth_router
 from app.routers.api.ping import router as ping_router
 from app.routers.api.workspace import router as workspace_router
@@ -12,14 +35,56 @@ from app.routers.api.project import router as project_router
 from app.routers.api.task import router as task_router
 from app.routers.api.user import router as user_router
 from app.routers.api.comments import router as comments_router
+from app.routers.api.search import router as search_router
+from app.routers.api.sync import router as sync_router
+from app.routers.api.task_series import router as task_series_router
+from app.routers.api.transfer import router as transfer_router
+from app.routers.api.metrics import router as metrics_router
+from app.routers.api.batch import router as batch_router
+
+
+register_periodic_job("refresh_tokens.prune", 60 * 60, prune_refresh_tokens)
+register_periodic_job("task_stats.reconcile", 24 * 60 * 60, reconcile_task_stats, run_at_start=False)
+register_periodic_job("deleted_records.prune", 24 * 60 * 60, prune_deleted_records)
+register_periodic_job("soft_deleted.purge", settings.purge_interval_seconds, purge_deleted)
+register_periodic_job("transfer_jobs.prune", 10 * 60, prune_transfer_jobs)
+register_periodic_job("jobs.prune", 60 * 60, prune_jobs)
+register_periodic_job("series_reminders_sent.prune", 24 * 60 * 60, prune_series_reminders_sent)
+register_periodic_job("tasks.archive", settings.archive_interval_seconds, archive_completed_tasks)
+register_periodic_job("partitions.maintain", settings.partition_maintenance_interval_seconds, maintain_partitions)
+if replica_router.enabled:
+    register_periodic_job("replicas.poll_lag", settings.replica_lag_poll_seconds, poll_replica_lag)
+write_behind.register("comment", apply_comment_batch)
+write_behind.register("task_completion", apply_completion_batch)
+register_job_handler("transfer.export", run_export, max_attempts=3)
+register_job_handler("transfer.import", run_import, max_attempts=3)
+register_job_handler(PURGE_JOB, purge_deleted_job)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Калибровка стоимости хэширования паролей под CPU хоста
+    await asyncio.to_thread(configure_password_hashing)
     async with engine.begin() as conn:
         # await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+        await apply_schema(conn, Base.metadata)
+    async with SessionLocal() as db:
+        await load_revoked_refresh_families(db)
+    if write_behind.enabled:
+        await write_behind.start()
+    start_invalidation_bus()
+    if settings.job_worker_enabled:
+        job_worker.start()
+    pg_listener.start()
+    periodic_tasks = start_periodic_jobs()
     yield
+    await stop_periodic_jobs(periodic_tasks)
+    if settings.job_worker_enabled:
+        await job_worker.stop()
+    await pg_listener.stop()
+    if write_behind.enabled:
+        await write_behind.stop()
+    await replica_router.dispose()
     await engine.dispose()
 
 app = FastAPI(lifespan=lifespan, swagger_ui_parameters={"syntaxHighlight.theme": "obsidian"})
@@ -32,6 +97,31 @@ app = FastAPI(lifespan=lifespan, swagger_ui_parameters={"syntaxHighlight.theme":
 #     # allow_headers=["*"],
 # )
 
+# Сжатие ответов по Accept-Encoding (zstd, br, gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+
+
+@app.middleware("http")
+async def read_your_writes_middleware(request: Request, call_next):
+    """
+    Отмечает успешные изменения пользователя, чтобы его следующие чтения
+    не попали на реплику, которая еще не получила эти изменения.
+    """
+    response = await call_next(request)
+    if replica_router.enabled and request.method not in SAFE_METHODS and response.status_code < 400:
+        user_id = getattr(request.state, "user_id", None)
+        if user_id is not None:
+            written_at = time.time()
+            replica_router.mark_write(user_id, written_at)
+            response.set_cookie(
+                LAST_WRITE_COOKIE,
+                f"{written_at:.3f}",
+                max_age=math.ceil(settings.replica_max_lag_seconds),
+                httponly=True,
+                samesite="strict",
+            )
+    return response
+
 
 @app.get("/docs", include_in_schema=False)
 async def custom_swagger_ui_html():
@@ -47,4 +137,10 @@ app.include_router(workspace_router)
 app.include_router(project_router)
 app.include_router(task_router)
 app.include_router(user_router)
-app.include_router(comments_router)
\ No newline at end of file
+app.include_router(comments_router)
+app.include_router(search_router)
+app.include_router(sync_router)
+app.include_router(task_series_router)
+app.include_router(transfer_router)
+app.include_router(metrics_router)
+app.include_router(batch_router)
\ No newline at end of file
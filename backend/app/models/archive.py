@@ -0,0 +1,100 @@
+from app.core.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, Text, ForeignKey, TIMESTAMP, Boolean, Date, Index, func
+from datetime import datetime, date
+
+
+# Архив выполненных задач вместе с их комментариями и напоминаниями (crud/archive.py).
+# Колонки совпадают с колонками основных таблиц (плюс archived_at): строки переносятся
+# INSERT ... SELECT по именам колонок, а чтения с include_archived объединяют таблицы UNION ALL.
+
+
+class ArchivedTask(Base):
+    __tablename__ = "tasks_archive"
+    __table_args__ = (
+        Index("ix_tasks_archive_project_id", "project_id"),
+        Index("ix_tasks_archive_assigned_due", "assigned_to", "due_date"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False, comment="ID задачи (из tasks)")
+    name: Mapped[str] = mapped_column(String(150), nullable=False, comment="Название задачи")
+    project_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, comment="ID проекта"
+    )
+    created_by: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, comment="ID пользователя, создавшего задачу"
+    )
+    assigned_to: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, comment="ID пользователя, которому назначена задача"
+    )
+    due_date: Mapped[date] = mapped_column(Date, nullable=True, comment="Срок выполнения задачи")
+    is_completed: Mapped[bool] = mapped_column(Boolean, nullable=False, comment="Флаг выполнения задачи")
+    priority: Mapped[str] = mapped_column(String(50), nullable=True, comment="Приоритет задачи (None, low, normal, high)")
+    series_id: Mapped[int] = mapped_column(Integer, nullable=True, comment="ID серии повторяющихся задач")
+    occurrence_date: Mapped[date] = mapped_column(Date, nullable=True, comment="Дата вхождения серии")
+    comment_count: Mapped[int] = mapped_column(Integer, nullable=False, comment="Количество комментариев")
+    last_comment_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True, comment="Время последнего комментария"
+    )
+    completed_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True, comment="Время выполнения задачи"
+    )
+    completion_changed_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True, comment="Время последней отметки выполнения"
+    )
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False, comment="Дата создания записи")
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, comment="Дата последнего обновления"
+    )
+    archived_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), comment="Дата переноса в архив"
+    )
+
+
+class ArchivedComment(Base):
+    __tablename__ = "comments_archive"
+    __table_args__ = (
+        # Постраничное чтение комментариев архивной задачи
+        Index("ix_comments_archive_task_created", "task_id", "created_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False, comment="ID комментария (из comments)")
+    task_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("tasks_archive.id", ondelete="CASCADE"), nullable=False, comment="ID архивной задачи"
+    )
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, comment="ID автора комментария"
+    )
+    content: Mapped[str] = mapped_column(Text, nullable=False, comment="Текст комментария")
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, comment="Дата создания комментария"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, comment="Дата последнего обновления комментария"
+    )
+    archived_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), comment="Дата переноса в архив"
+    )
+
+
+class ArchivedReminder(Base):
+    __tablename__ = "reminders_archive"
+    __table_args__ = (
+        Index("ix_reminders_archive_task_id", "task_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False, comment="ID напоминания (из reminders)")
+    task_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("tasks_archive.id", ondelete="CASCADE"), nullable=False, comment="ID архивной задачи"
+    )
+    reminder_time: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, comment="Время напоминания"
+    )
+    is_sent: Mapped[bool] = mapped_column(Boolean, nullable=False, comment="Отправлено ли напоминание")
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False, comment="Дата создания записи")
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, comment="Дата последнего обновления"
+    )
+    archived_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), comment="Дата переноса в архив"
+    )
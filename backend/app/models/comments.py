@@ -5,6 +5,8 @@ from datetime import datetime
 
 class Comment(Base):
     __tablename__ = "comments"
+    # Секции по месяцам создания (app/core/partitions.py)
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True, comment="Уникальный идентификатор комментария")
     task_id: Mapped[int] = mapped_column(
@@ -15,12 +17,12 @@ class Comment(Base):
     )
     content: Mapped[str] = mapped_column(Text, nullable=False, comment="Текст комментария")
     created_at: Mapped[datetime] = mapped_column(
-        TIMESTAMP(timezone=True), default=datetime.now, nullable=False, comment="Дата создания комментария"
+        TIMESTAMP(timezone=True), default=datetime.now, primary_key=True, nullable=False, comment="Дата создания комментария"
     )
     updated_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), default=datetime.now, onupdate=datetime.now, nullable=False, comment="Дата последнего обновления комментария"
     )
 
     # Связи
-    task: Mapped["Task"] = relationship("Task", back_populates="comments", lazy="joined")
-    user: Mapped["User"] = relationship("User", back_populates="comments", lazy="joined")
+    task: Mapped["Task"] = relationship("Task", back_populates="comments", lazy="noload")
+    user: Mapped["User"] = relationship("User", back_populates="comments", lazy="noload")
@@ -0,0 +1,25 @@
+from app.core.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, BigInteger, TIMESTAMP, Index
+from datetime import datetime
+
+
+class DeletedRecord(Base):
+    __tablename__ = "deleted_records"
+    __table_args__ = (
+        Index("ix_deleted_records_workspace_deleted_at", "workspace_id", "deleted_at"),
+        Index("ix_deleted_records_user_deleted_at", "user_id", "deleted_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True, comment="Уникальный идентификатор")
+    entity_type: Mapped[str] = mapped_column(
+        String(20), nullable=False, comment="Тип удаленного объекта (workspace, project, task, comment, reminder)"
+    )
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False, comment="ID удаленного объекта")
+    workspace_id: Mapped[int] = mapped_column(Integer, nullable=False, comment="ID рабочего пространства объекта")
+    user_id: Mapped[int] = mapped_column(
+        Integer, nullable=True, comment="ID пользователя, которому адресована запись (для потери доступа к пространству)"
+    )
+    deleted_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.now, nullable=False, index=True, comment="Дата удаления"
+    )
@@ -0,0 +1,35 @@
+from app.core.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, BigInteger, Text, TIMESTAMP, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Выборка готовых к выполнению заданий
+        Index("ix_jobs_pending_run_at", "run_at", postgresql_where=text("status = 'pending'")),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True, comment="Уникальный идентификатор")
+    name: Mapped[str] = mapped_column(String(50), nullable=False, comment="Тип задания (имя обработчика)")
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict, comment="Параметры задания")
+    status: Mapped[str] = mapped_column(
+        String(10), nullable=False, default="pending", comment="Состояние (pending, failed); выполненные удаляются"
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, comment="Число начатых попыток")
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, comment="Максимум попыток")
+    run_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), comment="Не выполнять раньше этого времени"
+    )
+    locked_until: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True, comment="Задание выполняется воркером до этого времени (продлевается)"
+    )
+    last_error: Mapped[str] = mapped_column(Text, nullable=True, comment="Ошибка последней попытки")
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), comment="Дата создания записи"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), comment="Дата последнего обновления"
+    )
@@ -20,6 +20,9 @@ class Project(Base):
     updated_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), default=datetime.now, onupdate=datetime.now, nullable=False, comment="Дата последнего обновления"
     )
+    deleted_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True, comment="Дата удаления (содержимое удаляется в фоне)"
+    )
 
     workspace: Mapped["Workspace"] = relationship("Workspace", back_populates="projects", lazy="joined")
     creator: Mapped["User"] = relationship("User", back_populates="created_projects", lazy="joined")
@@ -0,0 +1,16 @@
+from app.core.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Float, TIMESTAMP
+from datetime import datetime
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+    # Состояние лимитов не требует надежного хранения, поэтому таблица нежурналируемая
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key: Mapped[str] = mapped_column(String(200), primary_key=True, comment="Ключ лимита (маршрут + пользователь/IP)")
+    tokens: Mapped[float] = mapped_column(Float, nullable=False, comment="Оставшиеся токены в ведре")
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, comment="Время последнего пополнения"
+    )
@@ -0,0 +1,28 @@
+from app.core.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, ForeignKey, TIMESTAMP
+from datetime import datetime
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True, comment="Уникальный идентификатор рефреш-токена")
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True, comment="ID владельца токена"
+    )
+    family_id: Mapped[str] = mapped_column(
+        String(32), nullable=False, index=True, comment="Идентификатор цепочки ротации (первый jti цепочки)"
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, index=True, comment="Срок действия токена"
+    )
+    replaced_by: Mapped[str] = mapped_column(
+        String(32), nullable=True, comment="jti токена, выданного взамен при ротации"
+    )
+    revoked_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True, comment="Дата отзыва токена"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.now, nullable=False, comment="Дата выдачи токена"
+    )
@@ -5,17 +5,22 @@ from datetime import datetime
 
 class Reminder(Base):
     __tablename__ = "reminders"
+    # Секции по месяцам времени напоминания (app/core/partitions.py)
+    __table_args__ = {"postgresql_partition_by": "RANGE (reminder_time)"}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True, comment="Уникальный идентификатор")
     task_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, comment="ID связанной задачи"
     )
     reminder_time: Mapped[datetime] = mapped_column(
-        TIMESTAMP(timezone=True), nullable=False, comment="Время напоминания"
+        TIMESTAMP(timezone=True), primary_key=True, nullable=False, comment="Время напоминания"
     )
     is_sent: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False, comment="Отправлено ли напоминание")
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), default=datetime.now, nullable=False, comment="Дата создания записи"
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.now, onupdate=datetime.now, nullable=False, comment="Дата последнего обновления"
+    )
 
     task: Mapped["Task"] = relationship("Task", back_populates="reminders", lazy="joined")
@@ -28,6 +28,24 @@ class Task(Base):
     priority: Mapped[str] = mapped_column(
         String(50), default=None, nullable=True, comment="Приоритет задачи (None, low, normal, high)"
     )
+    series_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("task_series.id", ondelete="CASCADE"), nullable=True, comment="ID серии повторяющихся задач"
+    )
+    occurrence_date: Mapped[date] = mapped_column(
+        Date, nullable=True, comment="Дата вхождения серии, которое представляет задача"
+    )
+    comment_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False, comment="Количество комментариев (денормализовано)"
+    )
+    last_comment_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True, comment="Время последнего комментария (денормализовано)"
+    )
+    completed_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True, comment="Время выполнения задачи (для переноса в архив)"
+    )
+    completion_changed_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True, comment="Время последней отметки выполнения (порядок отложенной записи)"
+    )
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), default=datetime.now, nullable=False, comment="Дата создания записи"
     )
@@ -45,9 +63,10 @@ class Task(Base):
     )
 
 
+    # Комментарии не загружаются вместе с задачей: они читаются постранично (crud/comments.py)
     comments: Mapped[list["Comment"]] = relationship(
-        "Comment", back_populates="task", lazy="selectin"
-    )    
+        "Comment", back_populates="task", lazy="noload"
+    )
 
     reminders: Mapped[list["Reminder"]] = relationship("Reminder", back_populates="task", lazy="selectin")
     assigned: Mapped["User"] = relationship("User", foreign_keys=[assigned_to], lazy="joined")
@@ -0,0 +1,72 @@
+from app.core.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, ForeignKey, TIMESTAMP, Date, Time, Index, func
+from datetime import datetime, date, time
+
+
+class TaskSeries(Base):
+    __tablename__ = "task_series"
+    __table_args__ = (
+        Index("ix_task_series_assigned_start", "assigned_to", "start_date"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True, comment="Уникальный идентификатор")
+    name: Mapped[str] = mapped_column(String(150), nullable=False, comment="Название задач серии")
+    project_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True, comment="ID проекта"
+    )
+    created_by: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, comment="ID пользователя, создавшего серию"
+    )
+    assigned_to: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, comment="ID исполнителя задач серии"
+    )
+    priority: Mapped[str] = mapped_column(
+        String(50), default=None, nullable=True, comment="Приоритет задач серии (None, low, normal, high)"
+    )
+    rrule: Mapped[str] = mapped_column(String(255), nullable=False, comment="Правило повторения (RRULE)")
+    start_date: Mapped[date] = mapped_column(Date, nullable=False, comment="Дата начала серии")
+    end_date: Mapped[date] = mapped_column(
+        Date, nullable=True, comment="Дата последнего вхождения (None — бесконечная серия)"
+    )
+    reminder_time: Mapped[time] = mapped_column(
+        Time, nullable=True, comment="Время напоминания в день вхождения (UTC)"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.now, nullable=False, comment="Дата создания записи"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.now, onupdate=datetime.now, nullable=False, comment="Дата последнего обновления"
+    )
+
+
+class SeriesReminderSent(Base):
+    """
+    Отметка об отправке напоминания нематериализованного вхождения серии.
+    Такие напоминания вычисляются по правилу серии и не хранятся в таблице reminders.
+    """
+    __tablename__ = "task_series_reminders_sent"
+
+    series_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("task_series.id", ondelete="CASCADE"), primary_key=True, comment="ID серии"
+    )
+    occurrence_date: Mapped[date] = mapped_column(Date, primary_key=True, comment="Дата вхождения")
+    sent_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, comment="Время отметки об отправке"
+    )
+
+
+class SeriesException(Base):
+    """
+    Исключенная дата серии (EXDATE): вхождение удалено пользователем и больше
+    не вычисляется по правилу серии.
+    """
+    __tablename__ = "task_series_exceptions"
+
+    series_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("task_series.id", ondelete="CASCADE"), primary_key=True, comment="ID серии"
+    )
+    occurrence_date: Mapped[date] = mapped_column(Date, primary_key=True, comment="Дата удаленного вхождения")
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, comment="Время удаления вхождения"
+    )
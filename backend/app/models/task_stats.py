@@ -0,0 +1,18 @@
+from app.core.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, ForeignKey
+
+
+class TaskStats(Base):
+    __tablename__ = "task_stats"
+
+    project_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True, comment="ID проекта"
+    )
+    assignee_id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, default=0, comment="ID исполнителя (0 — задачи без исполнителя)"
+    )
+    open_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="Количество открытых задач")
+    completed_count: Mapped[int] = mapped_column(
+        Integer, default=0, nullable=False, comment="Количество выполненных задач"
+    )
@@ -0,0 +1,33 @@
+from app.core.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, BigInteger, Text, TIMESTAMP, ForeignKey
+from datetime import datetime
+
+
+class TransferJob(Base):
+    __tablename__ = "transfer_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True, comment="Уникальный идентификатор")
+    kind: Mapped[str] = mapped_column(String(10), nullable=False, comment="Тип задания (export, import)")
+    status: Mapped[str] = mapped_column(
+        String(10), nullable=False, default="pending", comment="Состояние (pending, running, done, failed)"
+    )
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True, comment="ID пользователя, запустившего задание"
+    )
+    workspace_id: Mapped[int] = mapped_column(
+        Integer, nullable=True, comment="ID выгружаемого или созданного при загрузке рабочего пространства"
+    )
+    file_path: Mapped[str] = mapped_column(Text, nullable=True, comment="Путь к файлу выгрузки или загрузки")
+    total_rows: Mapped[int] = mapped_column(BigInteger, nullable=True, comment="Всего строк для обработки")
+    processed_rows: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False, comment="Обработано строк")
+    error: Mapped[str] = mapped_column(Text, nullable=True, comment="Текст ошибки для failed")
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.now, nullable=False, comment="Дата создания записи"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.now, onupdate=datetime.now, nullable=False, comment="Дата последнего обновления"
+    )
+    finished_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True, comment="Дата завершения задания"
+    )
@@ -44,6 +44,6 @@ class User(Base):
     comments: Mapped[list["Comment"]] = relationship(
         "Comment",
         back_populates="user",
-        lazy="selectin",  # Подгружаем связанные комментарии
+        lazy="noload",  # Комментарии читаются постранично, а не вместе с пользователем
     )
 
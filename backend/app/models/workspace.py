@@ -17,6 +17,9 @@ class Workspace(Base):
     updated_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), default=datetime.now, onupdate=datetime.now, nullable=False, comment="Дата последнего обновления"
     )
+    deleted_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True, comment="Дата удаления (содержимое удаляется в фоне)"
+    )
 
     # Связь с создателем (User)
     creator: Mapped["User"] = relationship(
@@ -1,26 +1,65 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.exc import IntegrityError
 from app.schemas.user import UserCreate, UserLogin, UserResponse
 from app.routers.dependencies.jwt_functions import (
     create_access_token,
     create_refresh_token,
     get_current_user,
-    decode_token
+    decode_token,
+    REFRESH_TOKEN_EXPIRE_DAYS,
 )
-from app.crud.user import create_user, get_user_by_email, get_user_by_id
-from app.core.security import verify_password
+from app.crud.user import create_user, get_login_credentials, update_password_hash
+from app.crud.workspace_user import get_user_workspace_roles
+from app.crud.refresh_token import store_refresh_token, rotate_refresh_token, revoke_refresh_family
+from app.core.cache import revoked_refresh_families, used_refresh_tokens
+from app.core.config import settings
+from app.core.security import verify_and_update_password
 from app.core.database import get_db
+from app.routers.dependencies.rate_limit import RateLimiter, ConcurrencyLimiter
 
 router = APIRouter(
     prefix="/auth",
     tags=["Authentication"]
 )
 
+# bcrypt нагружает CPU, поэтому число одновременных хэширований ограничено
+password_hash_concurrency = ConcurrencyLimiter(settings.login_max_concurrency, queue_timeout=0.5)
+
+
+async def _load_workspace_roles(db: AsyncSession, user_id: int) -> dict | None:
+    """
+    Загружает карту ролей пользователя для встраивания в access-токен.
+    :param db: Сессия базы данных.
+    :param user_id: ID пользователя.
+    :return: Карта ролей или None, если встраивание отключено.
+    """
+    if not settings.token_embed_workspace_roles:
+        return None
+    return await get_user_workspace_roles(db, user_id, limit=settings.token_roles_max_workspaces)
+
+
+async def _issue_refresh_token(db: AsyncSession, user_id: int) -> str:
+    """
+    Выдает рефреш-токен, начинающий новую цепочку ротации, и сохраняет его.
+    :param db: Сессия базы данных.
+    :param user_id: ID пользователя.
+    :return: Рефреш-токен.
+    """
+    jti = uuid4().hex
+    expires_at = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    await store_refresh_token(db, user_id, jti, jti, expires_at)
+    return create_refresh_token({"sub": user_id}, jti=jti, family_id=jti)
+
 
 @router.post(
     "/register",
     summary="Регистрация нового пользователя",
+    dependencies=[
+        Depends(RateLimiter("auth.register", rate=0.1, burst=5, per="ip")),
+        Depends(password_hash_concurrency),
+    ],
     response_description="Информация о зарегистрированном пользователе",
     responses={
         200: {
@@ -64,16 +103,13 @@ async def register(
     - **username**: Имя пользователя
     - **password**: Пароль пользователя
     """
-    try:
-        user = await create_user(db, user_data)
-    except IntegrityError:
+    user = await create_user(db, user_data)
+    if user is None:
         raise HTTPException(status_code=400, detail="User with this email already exists.")
-    except TypeError:
-        raise HTTPException(status_code=400, detail="Invalid data")
     
     # Создание токенов
     access_token = create_access_token({"sub": user.id})
-    refresh_token = create_refresh_token({"sub": user.id})
+    refresh_token = await _issue_refresh_token(db, user.id)
     
     # Возврат информации о пользователе
     return {
@@ -86,7 +122,14 @@ async def register(
     }
 
 
-@router.post("/login", summary="Авторизация пользователя")
+@router.post(
+    "/login",
+    summary="Авторизация пользователя",
+    dependencies=[
+        Depends(RateLimiter("auth.login", rate=0.2, burst=10, per="ip")),
+        Depends(password_hash_concurrency),
+    ],
+)
 async def login(
     user_data: UserLogin,
     db: AsyncSession = Depends(get_db),
@@ -96,12 +139,20 @@ async def login(
     
     Проверяет учетные данные пользователя и выдает JWT-токены.
     """
-    user = await get_user_by_email(db, user_data.email)
-    if not user or not verify_password(user_data.password, user.password):
+    credentials = await get_login_credentials(db, user_data.email)
+    if not credentials:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    valid, new_hash = await verify_and_update_password(user_data.password, credentials.password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    user_id = credentials.id
+    # Хэш с устаревшей стоимостью или схемой пересчитывается, пока известен пароль
+    if new_hash is not None:
+        await update_password_hash(db, user_id, credentials.password, new_hash)
 
-    access_token = create_access_token({"sub": user.id})
-    refresh_token = create_refresh_token({"sub": user.id})
+    workspace_roles = await _load_workspace_roles(db, user_id)
+    access_token = create_access_token({"sub": user_id}, workspace_roles)
+    refresh_token = await _issue_refresh_token(db, user_id)
 
     return {
         "access_token": access_token,
@@ -127,15 +178,48 @@ async def refresh_access_token(
 ):
     """
     Обновляет токен доступа (access token) с использованием рефреш-токена.
+
+    Рефреш-токен ротируется: в ответе выдается новый, а предъявленный становится
+    недействительным. Повторное использование старого токена отзывает всю цепочку.
     """
     payload = decode_token(refresh_token)
-    user_id: int = int(payload.get("sub"))
-    if not user_id:
+    jti = payload.get("jti")
+    family_id = payload.get("fam")
+    if not payload.get("sub") or not jti or not family_id:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = await get_user_by_id(db, user_id=user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    # Быстрые проверки по кэшу без обращения к базе данных
+    if revoked_refresh_families.get(family_id):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    if used_refresh_tokens.get(jti) is not None:
+        await revoke_refresh_family(db, family_id)
+        raise HTTPException(status_code=401, detail="Token reuse detected")
+
+    new_jti = uuid4().hex
+    expires_at = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    rotated = await rotate_refresh_token(db, jti, new_jti, expires_at)
+    if rotated is None:
+        raise HTTPException(status_code=401, detail="Invalid or revoked token")
+    user_id, family_id = rotated
+
+    workspace_roles = await _load_workspace_roles(db, user_id)
+    new_access_token = create_access_token({"sub": user_id}, workspace_roles)
+    new_refresh_token = create_refresh_token({"sub": user_id}, jti=new_jti, family_id=family_id)
+    return {"access_token": new_access_token, "refresh_token": new_refresh_token, "token_type": "bearer"}
+
+
+@router.post("/logout", summary="Отзыв рефреш-токена")
+async def logout(
+    refresh_token: str,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Отзывает рефреш-токен вместе со всей его цепочкой ротации.
+    """
+    payload = decode_token(refresh_token)
+    family_id = payload.get("fam")
+    if not family_id:
+        raise HTTPException(status_code=401, detail="Invalid token")
 
-    new_access_token = create_access_token({"sub": user.id})
-    return {"access_token": new_access_token, "token_type": "bearer"}
\ No newline at end of file
+    await revoke_refresh_family(db, family_id)
+    return {"message": "Logged out successfully"}
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+import time
+from typing import List, Optional
+from urllib.parse import urlsplit
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.replicas import replica_router, SAFE_METHODS
+from app.routers.dependencies.batch import BatchContext
+from app.routers.dependencies.jwt_functions import get_current_user
+from app.routers.dependencies.loaders import Loaders
+from app.routers.dependencies.read_db import get_cookie_write_time
+from app.schemas.batch import BatchOperation, BatchOperationResult, BatchRequest, BatchResponse
+from app.schemas.user import CurrentUser
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batch", tags=["Batch"])
+
+# Заголовки исходного запроса, передаваемые операциям пакета.
+# Accept не передается: результаты операций встраиваются в JSON-ответ пакета
+FORWARDED_HEADERS = (b"authorization", b"cookie", b"accept-language", b"user-agent")
+
+
+async def _call_route(request: Request, operation: BatchOperation, context: BatchContext) -> BatchOperationResult:
+    """
+    Выполняет операцию пакета через маршрутизатор приложения, минуя HTTP и middleware.
+    """
+    url = urlsplit(operation.path)
+    body = b"" if operation.body is None else json.dumps(operation.body).encode()
+    headers = [(name, value) for name, value in request.scope["headers"] if name in FORWARDED_HEADERS]
+    headers.append((b"content-type", b"application/json"))
+    headers.append((b"content-length", str(len(body)).encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": operation.method,
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        "app": request.app,
+        "state": {"batch": context},
+    }
+    # Обработчики исключений приложения: HTTPException и ошибки валидации превращаются в ответы
+    if "starlette.exception_handlers" in request.scope:
+        scope["starlette.exception_handlers"] = request.scope["starlette.exception_handlers"]
+
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if body_sent:
+            return {"type": "http.disconnect"}
+        body_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    status = 500
+    response_headers = {}
+    chunks: List[bytes] = []
+
+    async def send(message):
+        nonlocal status, response_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in message["headers"]}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app.router(scope, receive, send)
+    except StarletteHTTPException as error:
+        # Маршрут не найден или метод не поддерживается
+        return BatchOperationResult(id=operation.id, status=error.status_code, body={"detail": error.detail})
+
+    content = b"".join(chunks)
+    response_headers.pop("content-length", None)
+    content_type = response_headers.pop("content-type", "")
+    if not content:
+        result_body = None
+    elif content_type.startswith("application/json"):
+        result_body = json.loads(content)
+    else:
+        result_body = content.decode("utf-8", errors="replace")
+    return BatchOperationResult(id=operation.id, status=status, headers=response_headers, body=result_body)
+
+
+async def _run_operation(request: Request, operation: BatchOperation, context: BatchContext) -> BatchOperationResult:
+    try:
+        return await _call_route(request, operation, context)
+    except Exception:
+        logger.exception("Batch operation %s %s failed", operation.method, operation.path)
+        return BatchOperationResult(id=operation.id, status=500, body={"detail": "Internal Server Error"})
+
+
+async def _run_reads(
+    request: Request,
+    operations: List[BatchOperation],
+    user: CurrentUser,
+    written_at: Optional[float],
+) -> List[BatchOperationResult]:
+    """
+    Выполняет независимые чтения параллельно. AsyncSession не допускает параллельных
+    запросов, поэтому каждый исполнитель получает свою сессию (на реплике, которая уже
+    видит записи пользователя, или на primary) и выполняет операции из общей очереди по одной.
+    """
+    results: List[Optional[BatchOperationResult]] = [None] * len(operations)
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, operation in enumerate(operations):
+        queue.put_nowait((index, operation))
+
+    async def worker():
+        async with replica_router.session(user.id, written_at) as session:
+            context = BatchContext(user, session, Loaders(session))
+            while not queue.empty():
+                index, operation = queue.get_nowait()
+                results[index] = await _run_operation(request, operation, context)
+                if results[index].status >= 500:
+                    # Транзакция после ошибки базы данных непригодна для следующих операций
+                    await session.rollback()
+                    context.loaders = Loaders(session)
+
+    workers = min(settings.batch_read_concurrency, len(operations))
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return results
+
+
+@router.post("", response_model=BatchResponse)
+async def batch_endpoint(
+    batch: BatchRequest,
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Выполняет несколько запросов к API за один HTTP-запрос.
+
+    Пользователь аутентифицируется один раз на весь пакет; операции используют общую
+    сессию базы данных, загрузчики и проверенные роли. Операции выполняются по порядку:
+    изменяющие — последовательно в общей сессии, идущие подряд GET — параллельно.
+    Ошибка одной операции не прерывает пакет: у каждой операции свой статус в результате.
+    """
+    for operation in batch.operations:
+        if urlsplit(operation.path).path.rstrip("/") == router.prefix:
+            raise HTTPException(status_code=400, detail="Nested batch requests are not allowed")
+
+    context = BatchContext(current_user, db, Loaders(db))
+    written_at = get_cookie_write_time(request)
+    wrote = False
+    results: List[BatchOperationResult] = []
+    operations = batch.operations
+    position = 0
+    while position < len(operations):
+        end = position
+        while end < len(operations) and operations[end].method in SAFE_METHODS:
+            end += 1
+        reads = operations[position:end]
+        if len(reads) > 1 and settings.batch_read_concurrency > 1:
+            results.extend(await _run_reads(request, reads, current_user, written_at))
+            position = end
+            continue
+
+        operation = operations[position]
+        result = await _run_operation(request, operation, context)
+        results.append(result)
+        position += 1
+        if result.status >= 500 or (result.status >= 400 and operation.method not in SAFE_METHODS):
+            # Операция могла оставить в сессии незакоммиченные изменения или прерванную транзакцию
+            await db.rollback()
+        elif operation.method in SAFE_METHODS:
+            continue
+        else:
+            # Следующие чтения пакета должны видеть эту запись и на репликах
+            wrote = True
+            written_at = time.time()
+        # Коммит и откат сбрасывают объекты сессии; роли могли измениться
+        context.loaders = Loaders(db)
+        current_user.resolved_roles.clear()
+
+    if not wrote:
+        # Пакет только читал данные: последующие чтения пользователя могут идти на реплики
+        del request.state.user_id
+    return BatchResponse(results=results)
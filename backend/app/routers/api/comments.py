@@ -1,13 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, Depends, HTTPException, status
-from app.models.comments import Comment
 from app.schemas.comments import CommentResponse, CommentCreate
-from app.models.task import Task
 from app.models.user import User
 from app.core.database import get_db
 from app.routers.dependencies.jwt_functions import get_current_user
 from app.routers.dependencies.permissions import check_workspace_access
-from app.crud.task import get_task_by_id
+from app.crud.task import get_workspace_id_by_task_id
+from app.crud.comments import create_comment as create_task_comment, queue_comment
+from app.crud.archive import get_archived_task_workspace_id, restore_archived_task
+from app.core.write_behind import write_behind
 
 router = APIRouter(
     prefix="/comments",
@@ -23,23 +24,26 @@ async def create_comment(
     """
     Создание нового комментария к задаче.
     """
-    # Проверяем права доступа к задаче
-    task = await get_task_by_id(db, comment_data.task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    if not await check_workspace_access(task.project.workspace_id, current_user, db):
+    # Проверяем права доступа к задаче (без загрузки самой задачи)
+    archived = False
+    try:
+        workspace_id = await get_workspace_id_by_task_id(db, comment_data.task_id)
+    except HTTPException:
+        workspace_id = await get_archived_task_workspace_id(db, comment_data.task_id)
+        if workspace_id is None:
+            raise
+        archived = True
+    if not await check_workspace_access(workspace_id, current_user, db):
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Создаём комментарий
-    new_comment = Comment(
-        task_id=comment_data.task_id,
-        user_id=current_user.id,
-        content=comment_data.content,
-    )
-    db.add(new_comment)
-    await db.commit()
-    await db.refresh(new_comment)
-
-    return CommentResponse.model_validate(new_comment)
+    # Архивная задача возвращается в основные таблицы до добавления комментария
+    if archived:
+        await restore_archived_task(db, comment_data.task_id)
+        await db.commit()
 
+    # При отложенной записи ответ отдается сразу после постановки в очередь
+    if write_behind.enabled:
+        return await queue_comment(db, comment_data, current_user.id)
 
+    # Создаём комментарий и обновляем счетчик комментариев задачи
+    return await create_task_comment(db, comment_data, current_user.id)
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+from app.core.security import password_hash_metrics
+from app.models.user import User
+from app.routers.dependencies.jwt_functions import get_current_user
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("/password-hash")
+async def password_hash_metrics_endpoint(current_user: User = Depends(get_current_user)):
+    """
+    Политика хэширования паролей этого воркера, распределение длительностей
+    хэширования и проверки, оценка пропускной способности входа.
+    """
+    return password_hash_metrics()
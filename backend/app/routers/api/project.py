@@ -1,21 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Annotated
+from fastapi import Query
 from app.core.database import get_db
+from app.routers.dependencies.read_db import get_read_db
+from app.routers.dependencies.loaders import Loaders, get_loaders
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
+from app.schemas.task import TaskListParams
+from app.schemas.task_stats import ProjectStats
+from app.crud.task_stats import get_project_stats
 from app.crud.project import (
     create_project,
     update_project,
     delete_project,
-    get_project_by_id,
-    get_tasks_for_project,
-    get_all_projects
+    get_all_projects,
+    get_workspace_id_by_project_id,
 )
+from app.crud.task import get_tasks_for_project
 from app.routers.dependencies.jwt_functions import get_current_user
 from app.routers.dependencies.permissions import check_workspace_owner, check_workspace_access
 from app.models.user import User
+from app.core.config import settings
+from app.core.negotiation import NegotiatedRoute
+from app.routers.dependencies.rate_limit import RateLimiter, ConcurrencyLimiter
 
-router = APIRouter(prefix="/projects", tags=["Projects"])
+router = APIRouter(prefix="/projects", tags=["Projects"], route_class=NegotiatedRoute)
 
 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
@@ -40,11 +49,12 @@ async def get_project_endpoint(
     project_id: int,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
 ):
     """
     Получение информации о проекте. Доступно для всех пользователей, имеющих доступ к рабочему пространству.
     """
-    project = await get_project_by_id(db, project_id)
+    project = await loaders.projects.load(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -63,11 +73,12 @@ async def update_project_endpoint(
     project_data: ProjectUpdate,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
 ):
     """
     Обновление проекта. Только для создателя рабочего пространства.
     """
-    project = await get_project_by_id(db, project_id)
+    project = await loaders.projects.load(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -83,11 +94,12 @@ async def delete_project_endpoint(
     project_id: int,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
 ):
     """
     Удаление проекта. Только для создателя рабочего пространства.
     """
-    project = await get_project_by_id(db, project_id)
+    project = await loaders.projects.load(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -98,29 +110,46 @@ async def delete_project_endpoint(
     return {"message": "Project deleted successfully"}
 
 
-@router.get("/{project_id}/tasks", response_model=List[dict])
+@router.get(
+    "/{project_id}/tasks",
+    response_model=List[dict],
+    dependencies=[
+        Depends(RateLimiter("projects.tasks", rate=5, burst=20)),
+        Depends(ConcurrencyLimiter(settings.list_max_concurrency)),
+    ],
+)
 async def get_project_tasks_endpoint(
     project_id: int,
+    params: Annotated[TaskListParams, Query()],
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Получение задач проекта. Доступно для всех пользователей, имеющих доступ к рабочему пространству.
+
+    Поддерживает фильтры (is_completed, priority, assigned_to, due_from, due_to),
+    сортировку (sort=-priority,due_date), выборку полей (fields=id,name,due_date)
+    и постраничный вывод (limit, offset).
     """
-    project = await get_project_by_id(db, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    # Извлекаем только ID рабочего пространства (404, если проекта нет)
+    workspace_id = await get_workspace_id_by_project_id(db, project_id)
 
     # Проверка прав доступа на уровне рабочего пространства
-    workspace_id = project.workspace_id
     if not await check_workspace_access(workspace_id, current_user, db, roles=["admin", "editor", "viewer"]):
         raise HTTPException(status_code=403, detail="Access denied")
 
-    tasks = await get_tasks_for_project(db, project_id)
+    tasks = await get_tasks_for_project(db, project_id, params)
     return tasks
 
 
-@router.get("/{workspace_id}/projects/all", response_model=List[ProjectResponse])
+@router.get(
+    "/{workspace_id}/projects/all",
+    response_model=List[ProjectResponse],
+    dependencies=[
+        Depends(RateLimiter("projects.all", rate=5, burst=20)),
+        Depends(ConcurrencyLimiter(settings.list_max_concurrency)),
+    ],
+)
 async def get_all_projects_for_user(
     workspace_id: int,
     current_user: User = Depends(get_current_user),
@@ -131,3 +160,19 @@ async def get_all_projects_for_user(
     """
     projects = await get_all_projects(db, current_user, workspace_id)
     return projects
+
+
+@router.get("/{project_id}/stats", response_model=ProjectStats)
+async def get_project_stats_endpoint(
+    project_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Статистика задач проекта: открытые, выполненные, просроченные и по исполнителям.
+    """
+    workspace_id = await get_workspace_id_by_project_id(db, project_id)
+    if not await check_workspace_access(workspace_id, current_user, db, roles=["admin", "editor", "viewer"]):
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return await get_project_stats(db, project_id)
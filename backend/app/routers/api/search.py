@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.config import settings
+from app.core.database import get_db
+from app.crud.search import search
+from app.schemas.search import SearchResponse, SearchType
+from app.models.user import User
+from app.routers.dependencies.jwt_functions import get_current_user
+from app.routers.dependencies.rate_limit import RateLimiter, ConcurrencyLimiter
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get(
+    "/",
+    response_model=SearchResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[
+        Depends(RateLimiter("search", rate=2, burst=10)),
+        Depends(ConcurrencyLimiter(settings.list_max_concurrency)),
+    ],
+)
+async def search_endpoint(
+    q: str = Query(..., min_length=2, max_length=200, description="Поисковый запрос"),
+    # Неизвестный тип отклоняется с 422, а не превращается в поиск по всем типам
+    types: Optional[List[SearchType]] = Query(None, description="Типы объектов: task, project, comment"),
+    limit: int = Query(20, ge=1, le=100, description="Размер страницы"),
+    offset: int = Query(0, ge=0, le=10000, description="Смещение"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Поиск по задачам, проектам и комментариям во всех рабочих пространствах пользователя.
+    Результаты отсортированы по релевантности (полнотекстовый ранг + триграммное сходство).
+    """
+    results, has_more = await search(db, current_user.id, q.strip(), types, limit, offset)
+    return SearchResponse(results=results, has_more=has_more)
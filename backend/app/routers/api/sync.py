@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from app.core.config import settings
+from app.core.database import get_db
+from app.crud.sync import get_changes, decode_cursor
+from app.schemas.sync import SyncResponse
+from app.models.user import User
+from app.routers.dependencies.jwt_functions import get_current_user
+from app.routers.dependencies.rate_limit import RateLimiter, ConcurrencyLimiter
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+@router.get(
+    "/",
+    response_model=SyncResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[
+        Depends(RateLimiter("sync", rate=1, burst=10)),
+        Depends(ConcurrencyLimiter(settings.list_max_concurrency)),
+    ],
+)
+async def sync_endpoint(
+    since: Optional[str] = Query(None, description="Курсор из предыдущего ответа; без него — полная выгрузка"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Изменения проектов, задач, комментариев и напоминаний во всех рабочих пространствах
+    пользователя с момента курсора, включая удаления.
+    Если курсор старше срока хранения удалений, возвращается 410 и нужна полная синхронизация.
+    """
+    since_moment = None
+    if since is not None:
+        try:
+            since_moment = decode_cursor(since)
+        except (ValueError, OverflowError, OSError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        retention = timedelta(days=settings.sync_tombstone_retention_days)
+        if since_moment < datetime.now(timezone.utc) - retention:
+            raise HTTPException(status_code=410, detail="Cursor expired, full sync required")
+
+    return await get_changes(db, current_user.id, since_moment)
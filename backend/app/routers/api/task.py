@@ -1,32 +1,63 @@
 import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
-from app.models.project import Project
-from app.models.workspace import Workspace
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
+from app.routers.dependencies.read_db import get_read_db
+from app.routers.dependencies.loaders import Loaders, get_loaders
 from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
 from app.crud.task import (
     create_task,
     update_task,
     delete_task,
-    get_task_by_id,
     get_tasks_for_project,
-    get_user_tasks_by_date
+    get_user_tasks_by_date,
+    get_user_agenda,
+    get_workspace_id_by_task_id,
 )
+from app.crud.comments import get_task_comments_page
+from app.crud.archive import get_archived_task, get_archived_task_workspace_id, restore_archived_task
 from app.routers.dependencies.jwt_functions import get_current_user
 from app.routers.dependencies.permissions import (
     check_workspace_access,
     check_workspace_editor_or_owner,
 )
 from app.models.user import User
+from app.models.task import Task
 from datetime import date
 from fastapi import Query
 from app.schemas.comments import CommentsListResponse
-from app.models.comments import Comment
+from app.core.config import settings
+from app.core.negotiation import NegotiatedRoute
+from app.routers.dependencies.rate_limit import RateLimiter, ConcurrencyLimiter
+from app.crud.task_stats import track_task_change, task_state, lock_task_state
+from app.core.write_behind import write_behind
 
-router = APIRouter(prefix="/tasks", tags=["Tasks"])
+router = APIRouter(prefix="/tasks", tags=["Tasks"], route_class=NegotiatedRoute)
+
+
+async def _load_task_for_write(task_id: int, current_user: User, db: AsyncSession, loaders: Loaders) -> Task:
+    """
+    Загружает задачу для изменения. Архивная задача сначала возвращается в основные таблицы:
+    это может сделать любой участник пространства (перенос не меняет данные задачи),
+    права на само изменение проверяет обработчик.
+    :raises HTTPException: 404, если задачи нет; 403, если нет доступа к архивной задаче.
+    """
+    task = await loaders.tasks.load(task_id)
+    if task is not None:
+        return task
+    workspace_id = await get_archived_task_workspace_id(db, task_id)
+    if workspace_id is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not await check_workspace_access(workspace_id, current_user, db):
+        raise HTTPException(status_code=403, detail="Access denied")
+    await restore_archived_task(db, task_id)
+    await db.commit()
+    loaders.tasks.clear(task_id)
+    task = await loaders.tasks.load(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
 
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
@@ -52,35 +83,25 @@ async def create_task_endpoint(
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task_endpoint(
     task_id: int,
+    include_archived: bool = Query(False, description="Искать задачу и в архиве"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
 ):
     """
     Получение информации о задаче. Доступно для всех уровней доступа.
     """
-    # Извлечение задачи
-    task = await get_task_by_id(db, task_id)
-    if not task:
+    # Задача загружается вместе с проектом (неудаленным)
+    task = await loaders.tasks.load(task_id)
+    if task:
+        workspace_id = task.project.workspace_id
+    elif include_archived and (archived := await get_archived_task(db, task_id)):
+        task, workspace_id = archived
+    else:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    # Извлечение проекта, к которому принадлежит задача
-    result = await db.execute(
-        select(Project).where(Project.id == task.project_id)
-    )
-    project = result.scalar_one_or_none()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    # Извлечение рабочего пространства, к которому принадлежит проект
-    result = await db.execute(
-        select(Workspace).where(Workspace.id == project.workspace_id)
-    )
-    workspace = result.scalar_one_or_none()
-    if not workspace:
-        raise HTTPException(status_code=404, detail="Workspace not found")
-
     # Проверка прав доступа к рабочему пространству
-    if not await check_workspace_access(workspace.id, current_user, db):
+    if not await check_workspace_access(workspace_id, current_user, db):
         raise HTTPException(status_code=403, detail="Access denied")
 
     return task
@@ -92,18 +113,18 @@ async def update_task_endpoint(
     task_data: TaskUpdate,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
 ):
     """
     Редактирование задачи. Доступно для создателя и редактора рабочего пространства.
     """
-    task = await get_task_by_id(db, task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    task = await _load_task_for_write(task_id, current_user, db, loaders)
 
     # Проверяем права на редактирование
     await check_workspace_editor_or_owner(task.project.workspace_id, current_user, db)
 
-    updated_task = await update_task(db, task_id, task_data)
+    # Задача уже загружена: повторный SELECT не нужен
+    updated_task = await update_task(db, task, task_data)
     return updated_task
 
 
@@ -113,43 +134,43 @@ async def mark_task_as_completed(
     mark_as_completed: bool = True,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
 ):
     """
     Отметить задачу выполненной. Читатель может только для своих задач.
     """
-    # Извлечение задачи
-    task = await get_task_by_id(db, task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    # Извлечение проекта, к которому принадлежит задача
-    result = await db.execute(
-        select(Project).where(Project.id == task.project_id)
-    )
-    project = result.scalar_one_or_none()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    # Извлечение рабочего пространства, к которому принадлежит проект
-    result = await db.execute(
-        select(Workspace).where(Workspace.id == project.workspace_id)
-    )
-    workspace = result.scalar_one_or_none()
-    if not workspace:
-        raise HTTPException(status_code=404, detail="Workspace not found")
+    # Задача загружается вместе с проектом (неудаленным); архивная возвращается из архива
+    task = await _load_task_for_write(task_id, current_user, db, loaders)
+    workspace_id = task.project.workspace_id
 
     # Проверяем права на рабочее пространство
-    if not await check_workspace_access(workspace.id, current_user, db):
+    if not await check_workspace_access(workspace_id, current_user, db):
         raise HTTPException(status_code=403, detail="Access denied")
 
     # Читатель может отметить только свои задачи
     if task.assigned_to != current_user.id and not await check_workspace_editor_or_owner(
-        workspace.id, current_user, db
+        workspace_id, current_user, db
     ):
         raise HTTPException(status_code=403, detail="Access denied to complete this task")
 
-    # Отмечаем задачу выполненной
+    # При отложенной записи отметка применяется пачкой в фоне; время постановки
+    # определяет, какая из отметок, принятых разными воркерами, применится последней
+    changed_at = datetime.datetime.now(datetime.timezone.utc)
+    if write_behind.enabled:
+        await write_behind.enqueue(
+            "task_completion",
+            {"task_id": task.id, "is_completed": mark_as_completed, "changed_at": changed_at.isoformat()},
+        )
+        return TaskResponse.model_validate(task).model_copy(update={"is_completed": mark_as_completed})
+
+    # Отмечаем задачу выполненной и обновляем статистику в той же транзакции;
+    # строка задачи блокируется, чтобы параллельная отметка не применила ту же дельту
+    before = await lock_task_state(db, task)
+    if task.is_completed != mark_as_completed:
+        task.completed_at = changed_at if mark_as_completed else None
     task.is_completed = mark_as_completed
+    task.completion_changed_at = changed_at
+    await track_task_change(db, before, task_state(task))
     await db.commit()
     await db.refresh(task)
 
@@ -161,54 +182,102 @@ async def delete_task_endpoint(
     task_id: int,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
 ):
     """
     Удаление задачи. Доступно для создателя и редактора рабочего пространства.
     """
-    task = await get_task_by_id(db, task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    task = await _load_task_for_write(task_id, current_user, db, loaders)
 
     # Проверяем права на удаление
     await check_workspace_editor_or_owner(task.project.workspace_id, current_user, db)
 
-    await delete_task(db, task_id)
+    await delete_task(db, task)
+    loaders.tasks.clear(task_id)
     return {"message": "Task deleted successfully"}
 
 
-@router.get("/user/tasks", status_code=status.HTTP_200_OK)
+@router.get(
+    "/user/tasks",
+    status_code=status.HTTP_200_OK,
+    dependencies=[
+        Depends(RateLimiter("tasks.user", rate=5, burst=20)),
+        Depends(ConcurrencyLimiter(settings.list_max_concurrency)),
+    ],
+)
 async def get_user_tasks_by_date_endpoint(
     target_date: date = Query(..., description="Дата для получения задач (формат: YYYY-MM-DD)"),
+    include_archived: bool = Query(False, description="Включать задачи из архива"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Получение задач пользователя на указанную дату.
     """
-    tasks = await get_user_tasks_by_date(db, current_user.id, target_date)
+    tasks = await get_user_tasks_by_date(db, current_user.id, target_date, include_archived)
     return tasks
 
 
-@router.get("/{task_id}/comments", response_model=CommentsListResponse, status_code=status.HTTP_200_OK)
+@router.get(
+    "/user/agenda",
+    status_code=status.HTTP_200_OK,
+    dependencies=[
+        Depends(RateLimiter("tasks.agenda", rate=5, burst=20)),
+        Depends(ConcurrencyLimiter(settings.list_max_concurrency)),
+    ],
+)
+async def get_user_agenda_endpoint(
+    date_from: date = Query(..., description="Начало периода (формат: YYYY-MM-DD)"),
+    date_to: date = Query(..., description="Конец периода включительно (формат: YYYY-MM-DD)"),
+    include_archived: bool = Query(False, description="Включать задачи из архива"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Получение задач пользователя за период, включая вхождения повторяющихся задач.
+    Нематериализованные вхождения возвращаются с id=None и series_id/occurrence_date.
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to must not be earlier than date_from")
+    if (date_to - date_from).days >= settings.agenda_max_days:
+        raise HTTPException(status_code=400, detail=f"Period must not exceed {settings.agenda_max_days} days")
+
+    return await get_user_agenda(db, current_user.id, date_from, date_to, include_archived)
+
+
+@router.get(
+    "/{task_id}/comments",
+    response_model=CommentsListResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[
+        Depends(RateLimiter("tasks.comments", rate=5, burst=20)),
+        Depends(ConcurrencyLimiter(settings.list_max_concurrency)),
+    ],
+)
 async def get_task_comments(
     task_id: int,
+    limit: int = Query(50, ge=1, le=200, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор из предыдущей страницы"),
+    include_archived: bool = Query(False, description="Искать задачу и в архиве"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    Получение всех комментариев задачи.
+    Получение комментариев задачи постранично, в порядке создания.
     """
-    # Проверяем права доступа к задаче
-    task = await get_task_by_id(db, task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    if not await check_workspace_access(task.project.workspace_id, current_user, db):
+    # Проверяем права доступа к задаче (без загрузки самой задачи).
+    # Комментарии архивной задачи перенесены в архив вместе с ней
+    workspace_id = await get_archived_task_workspace_id(db, task_id) if include_archived else None
+    archived = workspace_id is not None
+    if not archived:
+        workspace_id = await get_workspace_id_by_task_id(db, task_id)
+    if not await check_workspace_access(workspace_id, current_user, db):
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Извлекаем комментарии задачи
-    result = await db.execute(
-        select(Comment).where(Comment.task_id == task_id).order_by(Comment.created_at)
-    )
-    comments = result.scalars().all()
+    # Извлекаем страницу комментариев задачи
+    try:
+        comments, next_cursor = await get_task_comments_page(db, task_id, limit, cursor, archived)
+    except (ValueError, OverflowError, OSError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    return CommentsListResponse(comments=comments)
+    return CommentsListResponse(comments=comments, next_cursor=next_cursor)
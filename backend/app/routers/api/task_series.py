@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from app.core.database import get_db
+from app.schemas.task import TaskResponse
+from app.schemas.task_series import TaskSeriesCreate, TaskSeriesResponse
+from app.crud.task_series import (
+    create_task_series,
+    get_task_series_by_id,
+    delete_task_series,
+    materialize_occurrence,
+)
+from app.crud.project import get_workspace_id_by_project_id
+from app.routers.dependencies.jwt_functions import get_current_user
+from app.routers.dependencies.permissions import check_workspace_access, check_workspace_editor_or_owner
+from app.models.user import User
+
+router = APIRouter(prefix="/task-series", tags=["Task series"])
+
+
+@router.post("/", response_model=TaskSeriesResponse, status_code=status.HTTP_201_CREATED)
+async def create_task_series_endpoint(
+    series_data: TaskSeriesCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Создание серии повторяющихся задач. Доступно для создателя и редактора рабочего пространства.
+    """
+    await check_workspace_editor_or_owner(series_data.project_id, current_user, db)
+
+    series_data.created_by = current_user.id
+    return await create_task_series(db, series_data)
+
+
+@router.get("/{series_id}", response_model=TaskSeriesResponse)
+async def get_task_series_endpoint(
+    series_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Получение серии повторяющихся задач.
+    """
+    series = await get_task_series_by_id(db, series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Task series not found")
+
+    workspace_id = await get_workspace_id_by_project_id(db, series.project_id)
+    if not await check_workspace_access(workspace_id, current_user, db):
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return TaskSeriesResponse.model_validate(series)
+
+
+@router.post("/{series_id}/occurrences/{occurrence_date}", response_model=TaskResponse)
+async def materialize_occurrence_endpoint(
+    series_id: int,
+    occurrence_date: date,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Материализация вхождения серии в обычную задачу перед ее изменением или выполнением.
+    Повторный вызов возвращает уже созданную задачу. Как и отметка выполнения, доступна
+    исполнителю серии, а также редактору и создателю рабочего пространства.
+    """
+    series = await get_task_series_by_id(db, series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Task series not found")
+
+    workspace_id = await get_workspace_id_by_project_id(db, series.project_id)
+    if not await check_workspace_access(workspace_id, current_user, db):
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # Читатель может материализовать только вхождения своих серий
+    if series.assigned_to != current_user.id:
+        await check_workspace_editor_or_owner(series.project_id, current_user, db)
+
+    task = await materialize_occurrence(db, series, occurrence_date)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Occurrence not found")
+    await db.commit()
+    # После коммита объект устарел: перечитываем его до сериализации
+    await db.refresh(task)
+
+    return TaskResponse.model_validate(task)
+
+
+@router.delete("/{series_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_task_series_endpoint(
+    series_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Удаление серии вместе с материализованными вхождениями.
+    Доступно для создателя и редактора рабочего пространства.
+    """
+    series = await get_task_series_by_id(db, series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Task series not found")
+
+    await check_workspace_editor_or_owner(series.project_id, current_user, db)
+
+    workspace_id = await get_workspace_id_by_project_id(db, series.project_id)
+    await delete_task_series(db, series, workspace_id)
@@ -0,0 +1,130 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.core.jobs import enqueue_job
+from app.core.config import settings
+from app.core.database import get_db
+from app.crud.transfer import (
+    create_transfer_job,
+    get_transfer_job,
+    count_active_transfer_jobs,
+)
+from app.models.transfer_job import TransferJob
+from app.models.user import User
+from app.routers.dependencies.jwt_functions import get_current_user
+from app.routers.dependencies.permissions import check_workspace_owner
+from app.schemas.transfer import TransferJobResponse
+
+router = APIRouter(prefix="/transfers", tags=["Transfers"])
+
+MEDIA_TYPE = "application/x-msgpack"
+
+
+async def _check_active_limit(db: AsyncSession, user_id: int) -> None:
+    if await count_active_transfer_jobs(db, user_id) >= settings.transfer_max_active_jobs:
+        raise HTTPException(status_code=429, detail="Too many active transfer jobs")
+
+
+async def _save_upload(request: Request, path: str) -> None:
+    # Тело запроса пишется на диск по частям, не накапливаясь в памяти
+    limit = settings.transfer_max_upload_mb * 1024 * 1024
+    size = 0
+    with open(path, "wb") as file:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > limit:
+                raise HTTPException(status_code=413, detail="File too large")
+            file.write(chunk)
+
+
+@router.post("/export/{workspace_id}", response_model=TransferJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def export_workspace_endpoint(
+    workspace_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Запуск выгрузки рабочего пространства в файл. Только для администраторов пространства.
+    Прогресс — GET /transfers/{job_id}, файл — GET /transfers/{job_id}/file.
+    """
+    await check_workspace_owner(workspace_id, current_user, db)
+    await _check_active_limit(db, current_user.id)
+
+    os.makedirs(settings.transfer_dir, exist_ok=True)
+    job = await create_transfer_job(db, "export", current_user.id, workspace_id)
+    await enqueue_job(db, "transfer.export", {"job_id": job.id, "workspace_id": workspace_id})
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+@router.post("/import", response_model=TransferJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_workspace_endpoint(
+    request: Request,
+    name: Optional[str] = Query(None, max_length=100, description="Название нового пространства"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Загрузка файла выгрузки (тело запроса, application/x-msgpack) как нового рабочего пространства.
+    Участники сопоставляются с зарегистрированными пользователями по email.
+    """
+    await _check_active_limit(db, current_user.id)
+
+    os.makedirs(settings.transfer_dir, exist_ok=True)
+    job = await create_transfer_job(db, "import", current_user.id)
+    # Задание фиксируется до загрузки файла, чтобы очистка удалила файл прерванной загрузки
+    await db.commit()
+    await db.refresh(job)
+    try:
+        await _save_upload(request, job.file_path)
+    except BaseException:
+        if os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        job.status = "failed"
+        job.error = "Upload interrupted"
+        await db.commit()
+        raise
+
+    await enqueue_job(db, "transfer.import", {"job_id": job.id, "user_id": current_user.id, "name": name})
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+@router.get("/{job_id}", response_model=TransferJobResponse)
+async def get_transfer_job_endpoint(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Состояние и прогресс задания выгрузки или загрузки.
+    """
+    job = await get_transfer_job(db, job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Transfer job not found")
+    return job
+
+
+@router.get("/{job_id}/file")
+async def download_export_endpoint(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Скачивание файла завершенной выгрузки.
+    """
+    job: Optional[TransferJob] = await get_transfer_job(db, job_id, current_user.id)
+    if not job or job.kind != "export":
+        raise HTTPException(status_code=404, detail="Transfer job not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail="Export is not finished")
+    if not os.path.exists(job.file_path):
+        raise HTTPException(status_code=410, detail="Export file expired")
+    return FileResponse(
+        job.file_path, media_type=MEDIA_TYPE, filename=f"workspace-{job.workspace_id}-{job.id}.msgpack"
+    )
@@ -2,23 +2,36 @@ from fastapi import APIRouter, Depends, status, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from app.models.user import User
 from app.models.task import Task
+from app.models.project import Project
 from app.models.reminder import Reminder
-from app.schemas.reminder import ReminderResponse
+from app.schemas.reminder import ReminderResponse, RemindersSent
 from app.core.database import get_db
+from app.routers.dependencies.read_db import get_read_db
 from app.routers.dependencies.jwt_functions import get_current_user
+from app.core.config import settings
+from app.routers.dependencies.rate_limit import RateLimiter, ConcurrencyLimiter
+from app.crud.task_series import get_due_series_reminders, mark_series_reminders_sent
+from app.crud.reminder import mark_reminders_sent
 
 router = APIRouter(
     tags=["User"],
     prefix="/user",    
 )
 
-@router.get("/reminders", status_code=status.HTTP_200_OK)
+@router.get(
+    "/reminders",
+    status_code=status.HTTP_200_OK,
+    dependencies=[
+        Depends(RateLimiter("user.reminders", rate=5, burst=20)),
+        Depends(ConcurrencyLimiter(settings.list_max_concurrency)),
+    ],
+)
 async def get_user_reminders(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Получение напоминаний для пользователя по его задачам.
@@ -30,8 +43,10 @@ async def get_user_reminders(
     result = await db.execute(
         select(Reminder, Task)
         .join(Task, Reminder.task_id == Task.id)
+        .join(Project, Task.project_id == Project.id)
         .where(
             Task.assigned_to == current_user.id,  # Только задачи пользователя
+            Project.deleted_at.is_(None),        # Кроме удаленных проектов и рабочих пространств
             Reminder.reminder_time <= now,       # Напоминания с прошедшим временем
             Reminder.is_sent == False           # Напоминания, которые ещё не отправлены
         )
@@ -53,4 +68,26 @@ async def get_user_reminders(
         for reminder, task in reminders
     ]
 
+    # Напоминания повторяющихся задач вычисляются по правилу серии
+    reminders_data.extend(await get_due_series_reminders(
+        db, current_user.id, now, timedelta(hours=settings.recurring_reminder_lookback_hours)
+    ))
+
     return reminders_data
+
+
+@router.post("/reminders/sent", status_code=status.HTTP_200_OK)
+async def mark_user_reminders_sent(
+    sent: RemindersSent,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Отметка показанных напоминаний отправленными, чтобы они не возвращались
+    при следующем опросе. Напоминания вхождений серий (reminder_id=None)
+    передаются парой series_id и occurrence_date.
+    """
+    reminders = await mark_reminders_sent(db, current_user.id, sent.reminder_ids)
+    occurrences = await mark_series_reminders_sent(db, current_user.id, sent.occurrences)
+    await db.commit()
+    return {"reminders": reminders, "occurrences": occurrences}
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Annotated
 from app.core.database import get_db
 from app.models.workspace import Workspace
 from app.schemas.workspace import (
@@ -17,7 +18,13 @@ from app.crud.workspace import (
 )
 from app.crud.workspace_user import get_users_in_workspace
 from app.routers.dependencies.jwt_functions import get_current_user
-from app.routers.dependencies.permissions import check_workspace_owner
+from app.routers.dependencies.permissions import check_workspace_owner, check_workspace_access
+from app.routers.dependencies.loaders import Loaders, get_loaders
+from app.schemas.workspace_user import WorkspaceMemberResponse
+from app.schemas.task_stats import WorkspaceStats
+from app.crud.task_stats import get_workspace_stats
+from app.schemas.snapshot import SnapshotParams, WorkspaceSnapshot
+from app.crud.snapshot import get_workspace_snapshot, get_workspace_version
 from app.models.user import User
 
 router = APIRouter(prefix="/workspaces", tags=["Workspaces"])
@@ -94,3 +101,97 @@ async def update_workspace_endpoint(
 
     return {"workspace_id": workspace_id,
             "name": workspace_data.name}
+
+
+@router.delete("/{workspace_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_workspace_endpoint(
+    workspace_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Удаление рабочего пространства. Только для владельцев.
+    Содержимое пространства удаляется в фоне.
+    """
+    workspace = await get_workspace_by_id(db, workspace_id, current_user)
+    if not workspace:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+
+    # Проверяем, является ли пользователь владельцем
+    if workspace.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    await delete_workspace(db, workspace_id)
+
+
+@router.get("/{workspace_id}/members", response_model=List[WorkspaceMemberResponse])
+async def get_workspace_members_endpoint(
+    workspace_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
+):
+    """
+    Участники рабочего пространства с уровнями доступа, именами и email.
+    Данные пользователей загружаются одним запросом для всех участников.
+    """
+    if not await check_workspace_access(workspace_id, current_user, db, roles=["admin", "editor", "member", "viewer"]):
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    members = await get_users_in_workspace(db, workspace_id)
+    users = await loaders.users.load_many([member.user_id for member in members])
+    return [
+        WorkspaceMemberResponse(**member.model_dump(), name=user.name, email=user.email)
+        for member, user in zip(members, users)
+        if user is not None
+    ]
+
+
+@router.get("/{workspace_id}/stats", response_model=WorkspaceStats)
+async def get_workspace_stats_endpoint(
+    workspace_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Статистика задач рабочего пространства с разбивкой по проектам и исполнителям.
+    """
+    if not await check_workspace_access(workspace_id, current_user, db, roles=["admin", "editor", "viewer"]):
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return await get_workspace_stats(db, workspace_id)
+
+
+@router.get("/{workspace_id}/snapshot", response_model=WorkspaceSnapshot, response_model_exclude_none=True)
+async def get_workspace_snapshot_endpoint(
+    workspace_id: int,
+    params: Annotated[SnapshotParams, Query()],
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Снимок рабочего пространства за один запрос: проекты, задачи и участники.
+    Поддерживает ETag: при совпадении If-None-Match возвращается 304 без тела.
+    """
+    if not await check_workspace_access(workspace_id, current_user, db, roles=["admin", "editor", "viewer"]):
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    version = await get_workspace_version(db, workspace_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+
+    # Параметры запроса меняют содержимое ответа, поэтому входят в ETag
+    etag = '"' + hashlib.sha256(f"{version}?{request.url.query}".encode()).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    snapshot = await get_workspace_snapshot(db, workspace_id, params)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+
+    response.headers.update(headers)
+    return snapshot
@@ -0,0 +1,28 @@
+from typing import TYPE_CHECKING, Optional
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.user import CurrentUser
+
+if TYPE_CHECKING:
+    from app.routers.dependencies.loaders import Loaders
+
+
+class BatchContext:
+    """
+    Общее состояние операции пакетного запроса (POST /batch): пользователь,
+    аутентифицированный один раз на весь пакет, сессия базы данных и загрузчики.
+    Передается в операцию через request.state.batch; зависимости get_db, get_read_db,
+    get_loaders и get_current_user возвращают его объекты вместо создания своих.
+    """
+
+    def __init__(self, user: CurrentUser, db: AsyncSession, loaders: "Loaders"):
+        self.user = user
+        self.db = db
+        self.loaders = loaders
+
+
+def get_batch_context(request: Request) -> Optional[BatchContext]:
+    """
+    Возвращает состояние пакета, если запрос — операция пакетного запроса.
+    """
+    return getattr(request.state, "batch", None)
@@ -1,13 +1,21 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Annotated
-from fastapi import Depends, HTTPException, Header
+from typing import Annotated, Optional
+from fastapi import Depends, HTTPException, Header, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import LRUCache, principal_cache, lookup_expires_at
 from app.core.database import get_db
-from app.schemas.user import UserResponse
+from app.schemas.user import CurrentUser
 from app.crud.user import get_user_by_id
 from app.core.config import settings
+from app.routers.dependencies.batch import get_batch_context
 
 # Конфигурация токенов
 ACCESS_TOKEN_EXPIRE_MINUTES = 15
@@ -15,82 +23,163 @@ REFRESH_TOKEN_EXPIRE_DAYS = 7
 JWT_ALGORITHM = "HS256"
 JWT_SECRET_KEY = settings.jwt_secret_key
 
+_JWT_KEY_BYTES = JWT_SECRET_KEY.encode()
 
-def create_access_token(data: dict) -> str:
+# Компактные коды уровней доступа для карты ролей в токене
+ROLE_CODES = {"admin": "a", "editor": "e", "member": "m", "viewer": "v"}
+ROLE_NAMES = {code: role for role, code in ROLE_CODES.items()}
+
+# Кэш проверенных токенов: sha256(token) -> claims, запись живет до `exp` токена
+token_cache = LRUCache(maxsize=settings.jwt_cache_size)
+
+
+def create_access_token(data: dict, workspace_roles: Optional[dict] = None) -> str:
     """
     Создает JWT-токен для доступа (access token).
     
     :param data: Данные, которые необходимо включить в токен.
+    :param workspace_roles: Карта ролей {workspace_id: access_level}. Встраивается в токен
+        не более чем для `token_roles_max_workspaces` пространств; для остальных
+        права проверяются по базе данных.
     :return: Сгенерированный JWT-токен.
     """
     to_encode = data.copy()
     expire = datetime.now() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire, "sub": str(data.get("sub", ""))})
+    to_encode.update({"exp": expire, "iat": int(time.time()), "sub": str(data.get("sub", ""))})
+    if workspace_roles and settings.token_embed_workspace_roles:
+        limited = list(workspace_roles.items())[: settings.token_roles_max_workspaces]
+        to_encode["wsr"] = {str(workspace_id): ROLE_CODES.get(level, level) for workspace_id, level in limited}
     return jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 
-def create_refresh_token(data: dict) -> str:
+def create_refresh_token(data: dict, jti: Optional[str] = None, family_id: Optional[str] = None) -> str:
     """
     Создает рефреш-токен (refresh token).
     
     :param data: Данные, которые необходимо включить в токен.
+    :param jti: Идентификатор токена в хранилище рефреш-токенов.
+    :param family_id: Идентификатор цепочки ротации.
     :return: Сгенерированный JWT-токен.
     """
     to_encode = data.copy()
     expire = datetime.now() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "sub": str(data.get("sub", ""))})
+    if jti:
+        to_encode.update({"jti": jti, "fam": family_id or jti})
     return jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 
+def _b64url_decode(segment: str) -> bytes:
+    """
+    Декодирует base64url-сегмент JWT без выравнивания.
+    """
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _verify_hs256(token: str) -> dict:
+    """
+    Проверяет подпись HS256 и срок действия токена без python-jose.
+
+    :param token: JWT-токен.
+    :return: Декодированные данные из токена.
+    :raises ValueError: Если токен поврежден, подпись неверна или токен истек.
+    """
+    signing_input, _, signature = token.rpartition(".")
+    header_segment, _, payload_segment = signing_input.partition(".")
+    if not header_segment or not payload_segment or not signature:
+        raise ValueError("Malformed token")
+
+    header = json.loads(_b64url_decode(header_segment))
+    if not isinstance(header, dict) or header.get("alg") != JWT_ALGORITHM:
+        raise ValueError("Unexpected algorithm")
+
+    expected = hmac.new(_JWT_KEY_BYTES, signing_input.encode("ascii"), hashlib.sha256).digest()
+    if not hmac.compare_digest(expected, _b64url_decode(signature)):
+        raise ValueError("Signature verification failed")
+
+    payload = json.loads(_b64url_decode(payload_segment))
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid payload")
+    exp = payload.get("exp")
+    if exp is not None and (not isinstance(exp, (int, float)) or exp <= time.time()):
+        raise ValueError("Token expired")
+    return payload
+
+
 def decode_token(token: str) -> dict:
     """
     Декодирует JWT-токен.
-    
+
+    Проверенные токены кэшируются по хэшу до истечения их `exp`,
+    поэтому повторные запросы с тем же токеном не пересчитывают подпись.
+
     :param token: JWT-токен.
     :return: Декодированные данные из токена.
     """
+    cache_key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(cache_key)
+    if payload is not None:
+        return dict(payload)
+
     try:
-        # token = token.split(" ")[1]
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        return payload
-    except JWTError:
+        payload = _verify_hs256(token)
+    except (ValueError, UnicodeError, binascii.Error):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    except IndexError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+
+    token_cache.set(cache_key, payload, expires_at=payload.get("exp"))
+    return dict(payload)
 
 
 async def get_current_user(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     token: Annotated[HTTPAuthorizationCredentials, Depends(HTTPBearer())] = None,
-) -> UserResponse:
+) -> CurrentUser:
     """
     Зависимость для получения текущего пользователя по токену.
 
+    :param request: Текущий запрос (в request.state.user_id сохраняется ID пользователя).
     :param db: Сессия базы данных.
     :param token: JWT-токен из заголовка Authorization.
     :return: Объект пользователя.
     """
+    batch = get_batch_context(request)
+    if batch is not None:
+        # Операция пакетного запроса: пользователь аутентифицирован один раз на весь пакет
+        return batch.user
+
     if not token:
         raise HTTPException(status_code=401, detail="Authorization header is missing")
 
-    try:
-        token = token.credentials
-        token = token.split(" ")[1]
-    except IndexError:
+    # Поддерживаем как "Bearer <token>", так и продублированный префикс "Bearer Bearer <token>"
+    token = token.credentials.rpartition(" ")[2]
+    if not token:
         raise HTTPException(status_code=401, detail="Invalid token")
 
     payload = decode_token(token)
     user_id: int = payload.get("sub")
-    if user_id is None:
+    # Рефреш-токены (с идентификатором цепочки) не принимаются вместо access-токена
+    if user_id is None or "fam" in payload:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = await get_user_by_id(db, int(user_id))
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    # Данные пользователя кэшируются; изменения инвалидируются через шину (INVALIDATE_PRINCIPAL)
+    user = principal_cache.get(int(user_id))
+    if user is None:
+        user = await get_user_by_id(db, int(user_id))
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal_cache.set(user.id, user, expires_at=lookup_expires_at())
 
     # user_dict = user.__dict__
     # user_dict.pop("_sa_instance_state")
     # user_dict.pop("password")
     
-
-    return UserResponse.model_validate(user)
+    current_user = CurrentUser.model_validate(user, from_attributes=True)
+    current_user.token_issued_at = payload.get("iat")
+    embedded_roles = payload.get("wsr")
+    if isinstance(embedded_roles, dict):
+        current_user.workspace_roles = {
+            int(workspace_id): ROLE_NAMES.get(code, code) for workspace_id, code in embedded_roles.items()
+        }
+    request.state.user_id = current_user.id
+    return current_user
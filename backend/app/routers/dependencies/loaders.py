@@ -0,0 +1,33 @@
+import asyncio
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.core.loaders import DataLoader
+from app.crud.user import get_users_by_ids
+from app.crud.project import get_projects_by_ids
+from app.crud.task import get_tasks_by_ids
+from app.routers.dependencies.batch import get_batch_context
+
+
+class Loaders:
+    """
+    Загрузчики пользователей, проектов и задач одного запроса (одной сессии).
+    """
+
+    def __init__(self, db: AsyncSession):
+        lock = asyncio.Lock()
+        self.users = DataLoader(lambda ids: get_users_by_ids(db, ids), lock)
+        self.projects = DataLoader(lambda ids: get_projects_by_ids(db, ids), lock)
+        self.tasks = DataLoader(lambda ids: get_tasks_by_ids(db, ids), lock)
+
+
+async def get_loaders(request: Request, db: AsyncSession = Depends(get_db)) -> Loaders:
+    """
+    Зависимость: загрузчики запроса. FastAPI кэширует зависимости в пределах запроса,
+    поэтому все обработчики и зависимости одного запроса получают общие загрузчики.
+    Операции пакетного запроса получают загрузчики сессии пакета.
+    """
+    batch = get_batch_context(request)
+    if batch is not None:
+        return batch.loaders
+    return Loaders(db)
@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import HTTPException, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -8,6 +9,23 @@ from app.routers.dependencies.jwt_functions import get_current_user
 from app.crud.project import get_workspace_id_by_project_id
 from app.crud.workspace_user import get_users_in_workspace
 from app.models.workspace_user import WorkspaceUser
+from app.core.cache import roles_changed_since
+
+
+def get_embedded_role(current_user: User, workspace_id: int) -> Optional[str]:
+    """
+    Возвращает уровень доступа пользователя из карты ролей access-токена.
+    :param current_user: Объект текущего авторизованного пользователя.
+    :param workspace_id: ID рабочего пространства.
+    :return: Уровень доступа или None, если карта отсутствует, устарела
+        или не содержит этого рабочего пространства (тогда нужна проверка по базе).
+    """
+    workspace_roles = getattr(current_user, "workspace_roles", None)
+    if not workspace_roles:
+        return None
+    if roles_changed_since(current_user.id, getattr(current_user, "token_issued_at", None)):
+        return None
+    return workspace_roles.get(workspace_id)
 
 
 async def check_workspace_owner(
@@ -18,6 +36,12 @@ async def check_workspace_owner(
     """
     Проверяет, является ли текущий пользователь владельцем рабочего пространства (admin).
     """
+    embedded_role = get_embedded_role(current_user, workspace_id)
+    if embedded_role is not None:
+        if embedded_role != "admin":
+            raise HTTPException(status_code=403, detail="Access denied")
+        return None
+
     # Проверяем, есть ли запись о доступе пользователя к рабочему пространству
     result = await db.execute(
         select(WorkspaceUser)
@@ -50,16 +74,26 @@ async def check_workspace_access(
     :return: True, если доступ есть, иначе False.
     """
     roles = roles or ["admin", "member", "viewer"]  # По умолчанию разрешаем все роли
+    embedded_role = get_embedded_role(current_user, workspace_id)
+    if embedded_role is not None:
+        return embedded_role in roles
+
+    # Роль, проверенная по базе, запоминается до конца запроса (или пакета запросов)
+    resolved_roles = getattr(current_user, "resolved_roles", None)
+    if resolved_roles is not None and workspace_id in resolved_roles:
+        return resolved_roles[workspace_id] in roles
+
     result = await db.execute(
-        select(WorkspaceUser)
+        select(WorkspaceUser.access_level)
         .where(
             WorkspaceUser.workspace_id == workspace_id,
             WorkspaceUser.user_id == current_user.id,
-            WorkspaceUser.access_level.in_(roles),
         )
     )
-    workspace_user = result.scalar_one_or_none()
-    return workspace_user is not None
+    access_level = result.scalar_one_or_none()
+    if resolved_roles is not None:
+        resolved_roles[workspace_id] = access_level
+    return access_level in roles
 
 
 async def check_workspace_editor_or_owner(
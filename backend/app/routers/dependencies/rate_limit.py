@@ -0,0 +1,179 @@
+import asyncio
+import ipaddress
+import math
+import time
+from typing import Optional, Protocol
+from fastapi import HTTPException, Request
+from sqlalchemy import text
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.routers.dependencies.jwt_functions import decode_token
+
+
+class RateLimitBackend(Protocol):
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        """
+        Пытается взять один токен из ведра.
+        :return: 0, если запрос разрешен, иначе время ожидания в секундах.
+        """
+        ...
+
+
+class InMemoryRateLimitBackend:
+    """
+    Token bucket в памяти процесса. Лимиты действуют отдельно в каждом воркере.
+    """
+
+    def __init__(self, maxsize: int = 100000):
+        self._buckets = LRUCache(maxsize=maxsize)
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (float(capacity), now))
+        tokens = min(float(capacity), tokens + (now - updated) * rate)
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            return (1 - tokens) / rate
+        self._buckets.set(key, (tokens - 1, now))
+        return 0.0
+
+
+class PostgresRateLimitBackend:
+    """
+    Общий для всех воркеров token bucket в нежурналируемой таблице rate_limit_buckets.
+    Пополнение и списание выполняются одним атомарным UPSERT.
+    """
+
+    _TAKE_SQL = text(
+        """
+        INSERT INTO rate_limit_buckets (key, tokens, updated_at)
+        VALUES (:key, :capacity - 1, clock_timestamp())
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = LEAST(:capacity, rate_limit_buckets.tokens
+                + EXTRACT(EPOCH FROM clock_timestamp() - rate_limit_buckets.updated_at) * :rate) - 1,
+            updated_at = clock_timestamp()
+        WHERE LEAST(:capacity, rate_limit_buckets.tokens
+            + EXTRACT(EPOCH FROM clock_timestamp() - rate_limit_buckets.updated_at) * :rate) >= 1
+        RETURNING tokens
+        """
+    )
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        async with SessionLocal() as db:
+            result = await db.execute(self._TAKE_SQL, {"key": key, "rate": rate, "capacity": capacity})
+            allowed = result.first() is not None
+            await db.commit()
+        return 0.0 if allowed else 1 / rate
+
+
+def _create_backend() -> RateLimitBackend:
+    if settings.rate_limit_backend == "postgres":
+        return PostgresRateLimitBackend()
+    return InMemoryRateLimitBackend()
+
+
+rate_limit_backend: RateLimitBackend = _create_backend()
+
+
+_trusted_proxies = [
+    ipaddress.ip_network(value.strip(), strict=False)
+    for value in settings.trusted_proxies.split(",")
+    if value.strip()
+]
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_proxies)
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    Возвращает IP клиента. Заголовок X-Real-IP учитывается, только если запрос
+    пришел от доверенного прокси (trusted_proxies): иначе клиент, обращающийся
+    к приложению напрямую, подставлял бы новый адрес и получал новое ведро лимита.
+    """
+    host = request.client.host if request.client else None
+    if host is None:
+        return "unknown"
+    real_ip = request.headers.get("x-real-ip")
+    if real_ip and _is_trusted_proxy(host):
+        return real_ip.strip()
+    return host
+
+
+def _get_user_key(request: Request) -> Optional[str]:
+    authorization = request.headers.get("authorization")
+    if not authorization:
+        return None
+    token = authorization.rpartition(" ")[2]
+    try:
+        subject = decode_token(token).get("sub")
+    except HTTPException:
+        return None
+    return f"user:{subject}" if subject else None
+
+
+class RateLimiter:
+    """
+    Зависимость FastAPI: ограничение частоты запросов (token bucket).
+
+    :param scope: Название лимита (обычно маршрут).
+    :param rate: Скорость пополнения, запросов в секунду.
+    :param burst: Емкость ведра (допустимый всплеск).
+    :param per: "user" — по пользователю из токена (с откатом на IP), "ip" — по IP клиента.
+    """
+
+    def __init__(self, scope: str, rate: float, burst: int, per: str = "user"):
+        self.scope = scope
+        self.rate = rate
+        self.burst = burst
+        self.per = per
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.rate_limit_enabled:
+            return
+        identity = _get_user_key(request) if self.per == "user" else None
+        identity = identity or f"ip:{get_client_ip(request)}"
+
+        retry_after = await rate_limit_backend.take(f"{self.scope}:{identity}", self.rate, self.burst)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+
+class ConcurrencyLimiter:
+    """
+    Зависимость FastAPI: ограничение числа одновременно выполняемых запросов маршрута.
+
+    Если свободный слот не освободился за queue_timeout секунд, запрос сразу
+    получает 503 вместо ожидания в растущей очереди.
+
+    :param limit: Максимум одновременных запросов в воркере.
+    :param queue_timeout: Максимальное время ожидания слота.
+    """
+
+    def __init__(self, limit: int, queue_timeout: float = 0.1):
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def __call__(self):
+        if not settings.rate_limit_enabled:
+            yield
+            return
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Server is busy", headers={"Retry-After": "1"})
+        try:
+            yield
+        finally:
+            self._semaphore.release()
@@ -0,0 +1,30 @@
+from typing import Optional
+from fastapi import Depends, Request
+from app.core.replicas import replica_router, LAST_WRITE_COOKIE
+from app.models.user import User
+from app.routers.dependencies.batch import get_batch_context
+from app.routers.dependencies.jwt_functions import get_current_user
+
+
+def get_cookie_write_time(request: Request) -> Optional[float]:
+    """
+    Момент последней записи клиента из cookie (выставляется после успешных изменяющих запросов).
+    """
+    try:
+        return float(request.cookies.get(LAST_WRITE_COOKIE))
+    except (TypeError, ValueError):
+        return None
+
+
+async def get_read_db(request: Request, current_user: User = Depends(get_current_user)):
+    """
+    Зависимость для маршрутов только на чтение: сессия на реплике, которая уже
+    видит последнюю запись пользователя, или на primary, если такой реплики нет.
+    Операции пакетного запроса читают через сессию, выделенную им пакетом.
+    """
+    batch = get_batch_context(request)
+    if batch is not None:
+        yield batch.db
+        return
+    async with replica_router.session(current_user.id, get_cookie_write_time(request)) as session:
+        yield session
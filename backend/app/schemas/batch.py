@@ -0,0 +1,47 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, List, Literal, Optional
+from app.core.config import settings
+
+
+class BatchOperation(BaseModel):
+    """
+    Одна операция пакетного запроса — запрос к существующему маршруту API.
+    """
+    id: Optional[str] = Field(None, description="Произвольный идентификатор операции (возвращается в результате)")
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = Field("GET", description="HTTP-метод")
+    path: str = Field(..., description="Путь маршрута вместе со строкой запроса, например /tasks/1/comments?limit=20")
+    body: Optional[Any] = Field(None, description="Тело запроса (JSON)")
+
+    @field_validator("path")
+    @classmethod
+    def validate_path(cls, path: str) -> str:
+        if not path.startswith("/"):
+            raise ValueError("Path must start with /")
+        return path
+
+
+class BatchRequest(BaseModel):
+    """
+    Пакет операций. Операции выполняются по порядку; идущие подряд операции GET
+    независимы друг от друга и могут выполняться параллельно.
+    """
+    operations: List[BatchOperation] = Field(
+        ..., min_length=1, max_length=settings.batch_max_operations, description="Операции пакета"
+    )
+
+
+class BatchOperationResult(BaseModel):
+    """
+    Результат одной операции пакета.
+    """
+    id: Optional[str] = Field(None, description="Идентификатор операции из запроса")
+    status: int = Field(..., description="HTTP-статус ответа операции")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Заголовки ответа операции")
+    body: Optional[Any] = Field(None, description="Тело ответа (JSON или текст)")
+
+
+class BatchResponse(BaseModel):
+    """
+    Результаты операций пакета в порядке запроса.
+    """
+    results: List[BatchOperationResult] = Field(..., description="Результаты операций")
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 class CommentBase(BaseModel):
     """
@@ -40,3 +40,4 @@ class CommentsListResponse(BaseModel):
     Список комментариев, связанных с задачей.
     """
     comments: List[CommentResponse] = Field(..., description="Список комментариев")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы (None — страниц больше нет)")
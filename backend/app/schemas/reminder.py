@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 
 
 class ReminderBase(BaseModel):
@@ -36,3 +36,21 @@ class ReminderResponse(ReminderBase):
 
     class Config:
         from_attributes = True
+
+
+class SeriesOccurrenceRef(BaseModel):
+    """
+    Ссылка на вхождение серии повторяющихся задач.
+    """
+    series_id: int = Field(..., description="ID серии")
+    occurrence_date: date = Field(..., description="Дата вхождения")
+
+
+class RemindersSent(BaseModel):
+    """
+    Напоминания, которые клиент показал пользователю (из ответа GET /user/reminders).
+    """
+    reminder_ids: List[int] = Field(default_factory=list, max_length=500, description="ID сохраненных напоминаний")
+    occurrences: List[SeriesOccurrenceRef] = Field(
+        default_factory=list, max_length=500, description="Вхождения серий (напоминания с reminder_id=None)"
+    )
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
+
+# Типы объектов поиска (совпадают с crud.search.SEARCH_TYPES)
+SearchType = Literal["task", "project", "comment"]
+
+
+class SearchResult(BaseModel):
+    """
+    Найденный объект (задача, проект или комментарий).
+    """
+    type: SearchType = Field(..., description="Тип найденного объекта")
+    id: int = Field(..., description="ID найденного объекта")
+    title: str = Field(..., description="Название задачи/проекта или начало текста комментария")
+    workspace_id: int = Field(..., description="ID рабочего пространства")
+    project_id: int = Field(..., description="ID проекта")
+    task_id: Optional[int] = Field(None, description="ID задачи (для задач и комментариев)")
+    rank: float = Field(..., description="Релевантность результата")
+
+
+class SearchResponse(BaseModel):
+    """
+    Страница результатов поиска.
+    """
+    results: List[SearchResult] = Field(..., description="Результаты, отсортированные по релевантности")
+    has_more: bool = Field(..., description="Есть ли следующая страница")
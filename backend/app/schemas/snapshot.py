@@ -0,0 +1,63 @@
+from pydantic import BaseModel, Field, field_validator
+from datetime import datetime
+from typing import Optional, List
+from app.schemas.task import TASK_LIST_FIELDS
+
+
+class SnapshotParams(BaseModel):
+    """
+    Параметры снимка рабочего пространства: глубина и выборка полей.
+    """
+    depth: int = Field(2, ge=0, le=2, description="Глубина: 0 — только пространство, 1 — с проектами, 2 — с задачами")
+    include_members: bool = Field(True, description="Включать участников рабочего пространства")
+    task_fields: Optional[str] = Field(
+        None, description="Возвращаемые поля задач через запятую (например, id,name,due_date)"
+    )
+    tasks_per_project: Optional[int] = Field(
+        None, ge=1, le=1000, description="Максимальное количество задач в каждом проекте"
+    )
+
+    @field_validator("task_fields")
+    @classmethod
+    def validate_task_fields(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return value
+        for item in value.split(","):
+            if item.strip() not in TASK_LIST_FIELDS:
+                raise ValueError(f"Unsupported field: {item.strip()}")
+        return value
+
+
+class SnapshotMember(BaseModel):
+    """
+    Участник рабочего пространства в снимке.
+    """
+    user_id: int = Field(..., description="ID пользователя")
+    name: str = Field(..., description="Имя пользователя")
+    email: str = Field(..., description="Электронная почта пользователя")
+    access_level: str = Field(..., description="Уровень доступа")
+
+
+class SnapshotProject(BaseModel):
+    """
+    Проект в снимке рабочего пространства.
+    """
+    id: int = Field(..., description="Уникальный идентификатор проекта")
+    name: str = Field(..., description="Название проекта")
+    created_by: int = Field(..., description="ID пользователя, создавшего проект")
+    created_at: datetime = Field(..., description="Дата создания проекта")
+    updated_at: datetime = Field(..., description="Дата последнего обновления проекта")
+    tasks: Optional[List[dict]] = Field(None, description="Задачи проекта (при depth=2)")
+
+
+class WorkspaceSnapshot(BaseModel):
+    """
+    Снимок рабочего пространства: проекты, задачи и участники.
+    """
+    id: int = Field(..., description="Уникальный идентификатор рабочего пространства")
+    name: str = Field(..., description="Название рабочего пространства")
+    created_by: int = Field(..., description="ID пользователя, создавшего рабочее пространство")
+    created_at: datetime = Field(..., description="Дата создания рабочего пространства")
+    updated_at: datetime = Field(..., description="Дата последнего обновления рабочего пространства")
+    projects: Optional[List[SnapshotProject]] = Field(None, description="Проекты (при depth>=1)")
+    members: Optional[List[SnapshotMember]] = Field(None, description="Участники рабочего пространства")
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Literal
+
+
+class DeletedItem(BaseModel):
+    """
+    Удаленный объект. Удаление пространства, проекта или задачи означает
+    удаление и всех вложенных в них объектов.
+    """
+    type: Literal["workspace", "project", "task_series", "task", "comment", "reminder"] = Field(
+        ..., description="Тип объекта"
+    )
+    id: int = Field(..., description="ID объекта")
+    deleted_at: datetime = Field(..., description="Дата удаления")
+
+
+class SyncResponse(BaseModel):
+    """
+    Изменения с момента курсора во всех рабочих пространствах пользователя.
+    """
+    cursor: str = Field(..., description="Курсор для следующего запроса синхронизации")
+    full: bool = Field(..., description="Полная выгрузка (запрос без курсора)")
+    projects: List[dict] = Field(..., description="Созданные или измененные проекты")
+    task_series: List[dict] = Field(..., description="Созданные или измененные серии повторяющихся задач")
+    tasks: List[dict] = Field(..., description="Созданные или измененные задачи")
+    comments: List[dict] = Field(..., description="Созданные или измененные комментарии")
+    reminders: List[dict] = Field(..., description="Созданные или измененные напоминания")
+    deleted: List[DeletedItem] = Field(..., description="Удаленные объекты")
@@ -1,7 +1,14 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime, date
 from typing import Optional, List
 
+# Поля задачи, доступные для выборки (fields) и сортировки (sort) в списках задач
+TASK_LIST_FIELDS = (
+    "id", "name", "project_id", "created_by", "assigned_to", "due_date",
+    "is_completed", "priority", "comment_count", "last_comment_at", "created_at", "updated_at",
+)
+TASK_SORT_FIELDS = ("id", "name", "due_date", "priority", "is_completed", "created_at", "updated_at")
+
 
 class TaskBase(BaseModel):
     """
@@ -43,6 +50,8 @@ class TaskResponse(TaskBase):
     created_by: int = Field(..., description="ID пользователя, создавшего задачу")
     assigned_to: Optional[int] = Field(None, description="ID пользователя, которому назначена задача")
     is_completed: bool = Field(..., description="Флаг выполнения задачи")
+    comment_count: int = Field(0, description="Количество комментариев")
+    last_comment_at: Optional[datetime] = Field(None, description="Время последнего комментария")
     created_at: datetime = Field(..., description="Дата создания задачи")
     updated_at: datetime = Field(..., description="Дата последнего обновления задачи")
 
@@ -55,3 +64,41 @@ class TaskWithReminders(TaskResponse):
     Схема для ответа с данными задачи и связанных напоминаний.
     """
     reminders: List[dict] = Field(..., description="Список напоминаний, связанных с задачей")
+
+
+class TaskListParams(BaseModel):
+    """
+    Параметры фильтрации, сортировки и выборки полей для списка задач.
+    """
+    is_completed: Optional[bool] = Field(None, description="Фильтр по флагу выполнения")
+    priority: Optional[List[str]] = Field(None, description="Фильтр по приоритетам (можно несколько)")
+    assigned_to: Optional[int] = Field(None, description="Фильтр по исполнителю (0 — без исполнителя)")
+    due_from: Optional[date] = Field(None, description="Срок выполнения не раньше даты")
+    due_to: Optional[date] = Field(None, description="Срок выполнения не позже даты")
+    sort: Optional[str] = Field(
+        None, description="Сортировка через запятую, '-' — по убыванию (например, -priority,due_date)"
+    )
+    fields: Optional[str] = Field(None, description="Возвращаемые поля через запятую (например, id,name,due_date)")
+    limit: Optional[int] = Field(None, ge=1, le=1000, description="Максимальное количество задач")
+    offset: int = Field(0, ge=0, description="Смещение")
+    include_archived: bool = Field(False, description="Включать задачи, перенесенные в архив")
+
+    @field_validator("sort")
+    @classmethod
+    def validate_sort(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return value
+        for item in value.split(","):
+            if item.strip().lstrip("-") not in TASK_SORT_FIELDS:
+                raise ValueError(f"Unsupported sort field: {item.strip()}")
+        return value
+
+    @field_validator("fields")
+    @classmethod
+    def validate_fields(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return value
+        for item in value.split(","):
+            if item.strip() not in TASK_LIST_FIELDS:
+                raise ValueError(f"Unsupported field: {item.strip()}")
+        return value
@@ -0,0 +1,48 @@
+from pydantic import BaseModel, Field, field_validator
+from datetime import datetime, date, time
+from typing import Optional
+from app.core.recurrence import RecurrenceRule
+
+
+class TaskSeriesBase(BaseModel):
+    """
+    Базовая схема серии повторяющихся задач.
+    """
+    name: str = Field(..., max_length=150, description="Название задач серии")
+    rrule: str = Field(
+        ..., max_length=255, description="Правило повторения, например FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20261231"
+    )
+    start_date: date = Field(..., description="Дата начала серии")
+    priority: Optional[str] = Field(None, description="Приоритет задач серии (None, low, normal, high)")
+    reminder_time: Optional[time] = Field(None, description="Время напоминания в день вхождения (UTC)")
+
+    @field_validator("rrule")
+    @classmethod
+    def validate_rrule(cls, value: str) -> str:
+        RecurrenceRule.parse(value)
+        return value
+
+
+class TaskSeriesCreate(TaskSeriesBase):
+    """
+    Схема для создания серии повторяющихся задач.
+    """
+    project_id: int = Field(..., description="ID проекта, к которому относится серия")
+    assigned_to: Optional[int] = Field(None, description="ID исполнителя задач серии")
+    created_by: int | None = None
+
+
+class TaskSeriesResponse(TaskSeriesBase):
+    """
+    Схема для ответа с данными серии.
+    """
+    id: int = Field(..., description="Уникальный идентификатор серии")
+    project_id: int = Field(..., description="ID проекта, к которому относится серия")
+    created_by: int = Field(..., description="ID пользователя, создавшего серию")
+    assigned_to: Optional[int] = Field(None, description="ID исполнителя задач серии")
+    end_date: Optional[date] = Field(None, description="Дата последнего вхождения (None — бесконечная серия)")
+    created_at: datetime = Field(..., description="Дата создания серии")
+    updated_at: datetime = Field(..., description="Дата последнего обновления серии")
+
+    class Config:
+        from_attributes = True
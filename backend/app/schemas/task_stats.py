@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+
+class AssigneeStats(BaseModel):
+    """
+    Статистика задач одного исполнителя.
+    """
+    assignee_id: Optional[int] = Field(None, description="ID исполнителя (None — задачи без исполнителя)")
+    open: int = Field(..., description="Количество открытых задач")
+    completed: int = Field(..., description="Количество выполненных задач")
+
+
+class ProjectStats(BaseModel):
+    """
+    Статистика задач проекта.
+    """
+    project_id: int = Field(..., description="ID проекта")
+    open: int = Field(..., description="Количество открытых задач")
+    completed: int = Field(..., description="Количество выполненных задач")
+    overdue: int = Field(..., description="Количество просроченных открытых задач")
+    by_assignee: List[AssigneeStats] = Field(..., description="Статистика по исполнителям")
+
+
+class WorkspaceStats(BaseModel):
+    """
+    Статистика задач рабочего пространства.
+    """
+    workspace_id: int = Field(..., description="ID рабочего пространства")
+    open: int = Field(..., description="Количество открытых задач")
+    completed: int = Field(..., description="Количество выполненных задач")
+    overdue: int = Field(..., description="Количество просроченных открытых задач")
+    by_assignee: List[AssigneeStats] = Field(..., description="Статистика по исполнителям")
+    projects: List[ProjectStats] = Field(..., description="Статистика по проектам")
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Literal, Optional
+
+
+class TransferJobResponse(BaseModel):
+    """
+    Состояние задания выгрузки или загрузки рабочего пространства.
+    """
+    id: int = Field(..., description="ID задания")
+    kind: Literal["export", "import"] = Field(..., description="Тип задания")
+    status: Literal["pending", "running", "done", "failed"] = Field(..., description="Состояние задания")
+    workspace_id: Optional[int] = Field(
+        None, description="Выгружаемое пространство или пространство, созданное загрузкой"
+    )
+    total_rows: Optional[int] = Field(None, description="Всего строк (известно после начала обработки)")
+    processed_rows: int = Field(..., description="Обработано строк")
+    error: Optional[str] = Field(None, description="Причина ошибки для failed")
+    created_at: datetime = Field(..., description="Дата создания задания")
+    updated_at: datetime = Field(..., description="Дата последнего изменения прогресса")
+    finished_at: Optional[datetime] = Field(None, description="Дата завершения задания")
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, EmailStr
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 
 class UserBase(BaseModel):
@@ -39,6 +39,22 @@ class UserResponse(UserBase):
         from_attributes = True
         exclude = {"password", "created_projects", "created_workspaces", "created_tasks"}
 
+class CurrentUser(UserResponse):
+    """
+    Текущий авторизованный пользователь вместе с данными из access-токена.
+    Служебные поля не попадают в ответы API.
+    """
+    workspace_roles: Optional[Dict[int, str]] = Field(
+        None, exclude=True, description="Карта ролей из токена: ID рабочего пространства -> уровень доступа"
+    )
+    token_issued_at: Optional[float] = Field(None, exclude=True, description="Время выдачи access-токена")
+    resolved_roles: Dict[int, Optional[str]] = Field(
+        default_factory=dict,
+        exclude=True,
+        description="Роли, уже проверенные по базе в этом запросе (или пакете): ID рабочего пространства -> уровень доступа",
+    )
+
+
 class UserWithWorkspaces(UserResponse):
     """
     Схема для ответа с данными пользователя и рабочими пространствами.
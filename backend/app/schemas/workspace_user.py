@@ -36,3 +36,11 @@ class WorkspaceUserResponse(WorkspaceUserBase):
 
     class Config:
         from_attributes = True
+
+
+class WorkspaceMemberResponse(WorkspaceUserResponse):
+    """
+    Схема участника рабочего пространства вместе с данными пользователя.
+    """
+    name: str = Field(..., description="Имя пользователя")
+    email: str = Field(..., description="Электронная почта пользователя")
@@ -0,0 +1,113 @@
+"""
+Бенчмарк форматов ответов списков: размер на проводе и CPU на кодирование
+для JSON и msgpack без сжатия и со сжатием gzip, br, zstd (те же компрессоры
+и уровни, что в CompressionMiddleware; недоступные кодировки пропускаются).
+
+Данные — страница задач проекта (TaskResponse) и страница комментариев
+(CommentResponse) после jsonable_encoder, как их получает ответ.
+
+База данных не нужна. Запуск из каталога backend:
+    python -m benchmarks.bench_encoding --tasks 500 --comments 200 --iterations 200
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.compression import available_encodings
+from app.core.negotiation import MsgpackResponse
+from app.schemas.comments import CommentResponse
+from app.schemas.task import TaskResponse
+
+WORDS = "design review deploy backend frontend fix update migrate release report test docs".split()
+
+
+def make_tasks(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        TaskResponse(
+            id=1000 + index,
+            name=" ".join(random.choices(WORDS, k=4)),
+            due_date=(now + timedelta(days=random.randint(0, 60))).date() if index % 3 else None,
+            priority=random.choice([None, "low", "normal", "high"]),
+            project_id=42,
+            created_by=7,
+            assigned_to=random.choice([None, 7, 8, 9]),
+            is_completed=index % 4 == 0,
+            comment_count=random.randint(0, 30),
+            last_comment_at=now - timedelta(minutes=random.randint(0, 10000)),
+            created_at=now - timedelta(days=random.randint(1, 300)),
+            updated_at=now - timedelta(hours=random.randint(0, 100)),
+        )
+        for index in range(count)
+    ]
+
+
+def make_comments(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        CommentResponse(
+            id=5000 + index,
+            content=" ".join(random.choices(WORDS, k=random.randint(3, 40))),
+            task_id=1000,
+            user_id=random.choice([7, 8, 9]),
+            created_at=now - timedelta(minutes=count - index),
+            updated_at=now - timedelta(minutes=count - index),
+        )
+        for index in range(count)
+    ]
+
+
+def measure(encode, iterations: int) -> tuple:
+    # CPU процесса (а не время по часам): соседние процессы на хосте не влияют на замер
+    start = time.process_time()
+    for _ in range(iterations):
+        body = encode()
+    return len(body), (time.process_time() - start) * 1000 / iterations
+
+
+def compressed(render, compressor_class):
+    def encode() -> bytes:
+        compressor = compressor_class()
+        return compressor.compress(render()) + compressor.finish()
+    return encode
+
+
+def run(label: str, content, iterations: int) -> None:
+    formats = {
+        "json": lambda: JSONResponse(content).body,
+        "msgpack": lambda: MsgpackResponse(content).body,
+    }
+    print(f"\n{label}")
+    print(f"{'format':<10}{'encoding':<10}{'bytes':>10}{'ratio':>8}{'cpu/resp':>12}")
+    baseline = None
+    for format_name, render in formats.items():
+        variants = {"identity": render}
+        variants.update({name: compressed(render, cls) for name, cls in available_encodings().items()})
+        for encoding, encode in variants.items():
+            size, cpu_ms = measure(encode, iterations)
+            baseline = baseline or size
+            print(f"{format_name:<10}{encoding:<10}{size:>10}{size / baseline:>8.2f}{cpu_ms:>10.3f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=500, help="Задач на странице")
+    parser.add_argument("--comments", type=int, default=200, help="Комментариев на странице")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(1)
+    run(f"/projects/{{id}}/tasks, {args.tasks} tasks", jsonable_encoder(make_tasks(args.tasks)), args.iterations)
+    run(
+        f"/tasks/{{id}}/comments, {args.comments} comments",
+        jsonable_encoder({"comments": make_comments(args.comments), "next_cursor": "MTIzNDU2"}),
+        args.iterations,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Бенчмарк запросов входа для пользователя с большой историей: загрузка полного
+User (с selectin-связями: пространства, проекты, задачи) против выборки только
+id и хэша пароля по lower(email). Хэширование пароля не измеряется — его
+длительность отдает /metrics/password-hash.
+
+Нужна база данных из .env (DATABASE_URL и т.д.). Данные создаются
+под пользователем bench-login@example.com.
+
+Запуск из каталога backend:
+    python -m benchmarks.bench_login --tasks 20000 --iterations 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import select, text
+
+from app.core.database import SessionLocal, engine, Base
+from app.core.migrations import apply_schema
+from app.crud.user import get_login_credentials
+from app.models import user, workspace, workspace_user, project, task, reminder, comments, task_series  # noqa: F401
+from app.models.user import User
+
+EMAIL = "bench-login@example.com"
+
+SEED_SQL = """
+WITH u AS (
+    INSERT INTO users (name, email, password, created_at, updated_at)
+    VALUES ('bench', :email, '-', now(), now())
+    ON CONFLICT DO NOTHING
+    RETURNING id
+), w AS (
+    INSERT INTO workspaces (name, created_by, created_at, updated_at)
+    SELECT 'bench-login #' || g, u.id, now(), now() FROM u, generate_series(1, 20) g
+    RETURNING id, created_by
+), wu AS (
+    INSERT INTO workspace_users (workspace_id, user_id, access_level, created_at, updated_at)
+    SELECT w.id, w.created_by, 'admin', now(), now() FROM w
+), p AS (
+    INSERT INTO projects (name, workspace_id, created_by, created_at, updated_at)
+    SELECT 'bench project #' || g, w.id, w.created_by, now(), now() FROM w, generate_series(1, 10) g
+    RETURNING id, created_by
+)
+INSERT INTO tasks (name, project_id, created_by, is_completed, created_at, updated_at)
+SELECT 'bench task #' || g, p.id, p.created_by, false, now(), now()
+FROM p, generate_series(1, CAST(:tasks_per_project AS integer)) g
+"""
+
+
+async def seed(tasks: int) -> None:
+    async with engine.begin() as conn:
+        await apply_schema(conn, Base.metadata)
+    async with SessionLocal() as db:
+        # 20 пространств по 10 проектов
+        await db.execute(text(SEED_SQL), {"email": EMAIL, "tasks_per_project": max(1, tasks // 200)})
+        await db.commit()
+
+
+async def load_full_user(db, email: str):
+    # Прежний путь входа: полный User со всеми selectin-связями
+    return (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+
+
+async def run(label: str, query, iterations: int) -> None:
+    timings = []
+    async with SessionLocal() as db:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await query(db, EMAIL.upper())
+            timings.append((time.perf_counter() - start) * 1000)
+            # Каждый вход — отдельный запрос со своей сессией
+            await db.rollback()
+            db.expunge_all()
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{label:<32} p50={statistics.median(timings):8.2f}ms p99={p99:8.2f}ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=20000, help="Задач, созданных пользователем")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    await seed(args.tasks)
+    # Прежний запрос сравнивал email с учетом регистра
+    await run("full User (selectin)", lambda db, email: load_full_user(db, email.lower()), args.iterations)
+    await run("id + password by lower(email)", get_login_credentials, args.iterations)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,236 @@
+"""
+Бенчмарк секционирования reminders и comments по месяцам: как меняется стоимость
+запросов, удаления по сроку хранения и VACUUM по мере роста истории.
+
+Для каждой таблицы создается пара временных таблиц с одинаковыми данными:
+обычная (bench_*_plain) и секционированная по месяцам (bench_*_part, секции
+создаются теми же функциями, что и у рабочих таблиц). История наращивается шагами
+(--months), на каждом шаге измеряются:
+  - reminders: выборка наступивших неотправленных напоминаний задач (как в
+    GET /user/reminders) и удаление отправленных напоминаний старше
+    reminder_retention_months (DELETE в обычной таблице, удаление секций в секционированной);
+  - comments: первая страница комментариев свежей задачи и страница по курсору;
+  - VACUUM после изменения 5% строк текущего месяца: вся обычная таблица
+    против секции текущего месяца (autovacuum обрабатывает секции по отдельности).
+
+Нужна база данных из .env (DATABASE_URL и т.д.); рабочие таблицы не затрагиваются,
+временные таблицы удаляются в конце.
+
+Запуск из каталога backend:
+    python -m benchmarks.bench_partitions --months 6,12,24,48 --rows-per-month 50000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.partitions import add_months, create_month_partition, drop_expired_partitions, month_start, partition_name
+
+TASKS_PER_MONTH = 2000
+
+TABLES = {
+    "reminders": {
+        "key": "reminder_time",
+        "columns": "id bigint NOT NULL, task_id integer NOT NULL, reminder_time timestamptz NOT NULL, "
+                   "is_sent boolean NOT NULL, created_at timestamptz NOT NULL, updated_at timestamptz NOT NULL",
+        "index": "(task_id, reminder_time) WHERE NOT is_sent",
+        # Прошедшие напоминания отправлены, будущие — нет
+        "fill": "SELECT id, task_id, at, at < now(), at, at FROM ({rows}) s",
+        "churn": "is_sent = true, updated_at = now()",
+    },
+    "comments": {
+        "key": "created_at",
+        "columns": "id bigint NOT NULL, task_id integer NOT NULL, user_id integer NOT NULL, content text NOT NULL, "
+                   "created_at timestamptz NOT NULL, updated_at timestamptz NOT NULL",
+        "index": "(task_id, created_at, id)",
+        "fill": "SELECT id, task_id, 1, repeat('comment ', 1 + id % 20), at, at FROM ({rows}) s",
+        "churn": "content = content || ' (edited)', updated_at = now()",
+    },
+}
+
+ROWS_SQL = """
+SELECT CAST(:first_id AS bigint) + g AS id, CAST(:first_task AS integer) + g % :tasks AS task_id,
+       CAST(:start AS timestamptz) + (CAST(:end AS timestamptz) - CAST(:start AS timestamptz)) * random() AS at
+FROM generate_series(0, :count - 1) g
+"""
+
+DUE_SQL = "SELECT id FROM {table} WHERE task_id = ANY(:tasks) AND reminder_time <= now() AND NOT is_sent"
+PAGE_SQL = "SELECT id, created_at FROM {table} WHERE task_id = :task ORDER BY created_at, id LIMIT 50"
+CURSOR_SQL = (
+    "SELECT id, created_at FROM {table} WHERE task_id = :task AND created_at >= :at "
+    "AND (created_at, id) > (:at, :id) ORDER BY created_at, id LIMIT 50"
+)
+
+
+def first_task(offset: int) -> int:
+    # У каждого месяца свои задачи: комментарии и напоминания задачи сосредоточены в одном месяце
+    return (offset + 10) * TASKS_PER_MONTH
+
+
+def p50(timings: list) -> str:
+    return f"{statistics.median(timings):.2f}ms"
+
+
+async def elapsed(conn: AsyncConnection, sql: str, params: dict = None) -> float:
+    start = time.perf_counter()
+    await conn.execute(text(sql), params or {})
+    return (time.perf_counter() - start) * 1000
+
+
+class Bench:
+    def __init__(self, conn: AsyncConnection, name: str, rows_per_month: int):
+        self.conn = conn
+        self.name = name
+        self.spec = TABLES[name]
+        self.key = self.spec["key"]
+        self.plain = f"bench_{name}_plain"
+        self.part = f"bench_{name}_part"
+        self.rows_per_month = rows_per_month
+        self.current = month_start(datetime.now(timezone.utc))
+        self.next_id = 1
+        self.filled = set()
+
+    async def create(self) -> None:
+        await self.drop()
+        await self.conn.execute(text(f"CREATE TABLE {self.plain} ({self.spec['columns']})"))
+        await self.conn.execute(
+            text(f"CREATE TABLE {self.part} ({self.spec['columns']}) PARTITION BY RANGE ({self.key})")
+        )
+        await self.conn.execute(text(f"CREATE TABLE {self.part}_default PARTITION OF {self.part} DEFAULT"))
+        for table in (self.plain, self.part):
+            await self.conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {self.key})"))
+            await self.conn.execute(text(f"CREATE INDEX ON {table} {self.spec['index']}"))
+
+    async def drop(self) -> None:
+        for table in (self.plain, self.part):
+            await self.conn.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
+
+    async def fill(self, offsets) -> None:
+        """
+        Заполняет месяцы со сдвигом offset назад от текущего (отрицательный — будущие месяцы).
+        """
+        for offset in offsets:
+            if offset in self.filled:
+                continue
+            month = add_months(self.current, -offset)
+            await create_month_partition(self.conn, self.part, self.key, month)
+            params = {
+                "first_id": self.next_id, "first_task": first_task(offset), "tasks": TASKS_PER_MONTH,
+                "start": month, "end": add_months(month, 1), "count": self.rows_per_month,
+            }
+            for table in (self.plain, self.part):
+                select_sql = self.spec["fill"].format(rows=ROWS_SQL)
+                await self.conn.execute(text(f"INSERT INTO {table} {select_sql}"), params)
+            self.next_id += self.rows_per_month
+            self.filled.add(offset)
+        for table in (self.plain, self.part):
+            await self.conn.execute(text(f"ANALYZE {table}"))
+
+    async def count(self, table: str) -> int:
+        return (await self.conn.execute(text(f"SELECT count(*) FROM {table}"))).scalar_one()
+
+    async def retention(self) -> tuple:
+        before = add_months(self.current, -settings.reminder_retention_months)
+        plain_ms = await elapsed(
+            self.conn, f"DELETE FROM {self.plain} WHERE {self.key} < :before AND is_sent", {"before": before}
+        )
+        start = time.perf_counter()
+        await drop_expired_partitions(self.conn, self.part, self.key, before, "NOT is_sent")
+        return plain_ms, (time.perf_counter() - start) * 1000
+
+    async def queries(self, count: int) -> dict:
+        tasks = list(range(first_task(0), first_task(0) + TASKS_PER_MONTH))
+        timings = {}
+        for table in (self.plain, self.part):
+            if self.name == "reminders":
+                timings[table] = [
+                    await elapsed(self.conn, DUE_SQL.format(table=table), {"tasks": random.sample(tasks, 20)})
+                    for _ in range(count)
+                ]
+                continue
+            first, cursor = [], []
+            for _ in range(count):
+                params = {"task": random.choice(tasks)}
+                start = time.perf_counter()
+                rows = (await self.conn.execute(text(PAGE_SQL.format(table=table)), params)).all()
+                first.append((time.perf_counter() - start) * 1000)
+                if rows:
+                    params.update(id=rows[len(rows) // 2].id, at=rows[len(rows) // 2].created_at)
+                    cursor.append(await elapsed(self.conn, CURSOR_SQL.format(table=table), params))
+            timings[table] = (first, cursor)
+        return timings
+
+    async def vacuum(self) -> tuple:
+        bounds = {"start": self.current, "end": add_months(self.current, 1)}
+        for table in (self.plain, self.part):
+            await self.conn.execute(
+                text(
+                    f"UPDATE {table} SET {self.spec['churn']} "
+                    f"WHERE {self.key} >= :start AND {self.key} < :end AND random() < 0.05"
+                ),
+                bounds,
+            )
+        plain_ms = await elapsed(self.conn, f"VACUUM {self.plain}")
+        hot_ms = await elapsed(self.conn, f"VACUUM {partition_name(self.part, self.current)}")
+        return plain_ms, hot_ms
+
+
+async def run(conn: AsyncConnection, name: str, steps: list, rows_per_month: int, queries: int) -> None:
+    bench = Bench(conn, name, rows_per_month)
+    await bench.create()
+    try:
+        if name == "reminders":
+            print(f"\nreminders (retention {settings.reminder_retention_months} months)")
+            print(f"{'months':>6}{'rows plain':>12}{'rows part':>12}{'retention plain/part':>24}"
+                  f"{'due p50 plain/part':>24}{'vacuum plain/hot':>22}")
+        else:
+            print("\ncomments")
+            print(f"{'months':>6}{'rows plain':>12}{'rows part':>12}{'page p50 plain/part':>24}"
+                  f"{'cursor p50 plain/part':>24}{'vacuum plain/hot':>22}")
+        # Будущие напоминания (следующий месяц) и текущий месяц
+        await bench.fill([-1, 0])
+        for months in steps:
+            await bench.fill(range(1, months + 1))
+            retention = await bench.retention() if name == "reminders" else None
+            timings = await bench.queries(queries)
+            vacuum_plain, vacuum_hot = await bench.vacuum()
+            rows = f"{months:>6}{await bench.count(bench.plain):>12}{await bench.count(bench.part):>12}"
+            vacuum = f"{vacuum_plain:>10.1f}/{vacuum_hot:.1f}ms"
+            if name == "reminders":
+                retention_ms = f"{retention[0]:.1f}/{retention[1]:.1f}ms"
+                due = f"{p50(timings[bench.plain])}/{p50(timings[bench.part])}"
+                print(f"{rows}{retention_ms:>24}{due:>24}{vacuum:>22}")
+            else:
+                page = f"{p50(timings[bench.plain][0])}/{p50(timings[bench.part][0])}"
+                cursor = f"{p50(timings[bench.plain][1])}/{p50(timings[bench.part][1])}"
+                print(f"{rows}{page:>24}{cursor:>24}{vacuum:>22}")
+    finally:
+        await bench.drop()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--months", default="6,12,24,48", help="Глубина истории на каждом шаге, месяцев")
+    parser.add_argument("--rows-per-month", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(1)
+    steps = sorted(int(value) for value in args.months.split(","))
+    async with engine.connect() as conn:
+        # VACUUM нельзя выполнять внутри транзакции
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for name in TABLES:
+            await run(conn, name, steps, args.rows_per_month, args.queries)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+"""
+Бенчмарк повторяющихся задач: вычисляет вхождения N серий на годовом
+диапазоне и сравнивает с числом строк, которые пришлось бы создать заранее.
+
+База данных не нужна. Запуск из каталога backend:
+    python -m benchmarks.bench_recurrence --series 10000 --days 365
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from app.core.recurrence import RecurrenceRule
+
+RULES = [
+    "FREQ=DAILY",
+    "FREQ=DAILY;INTERVAL=2",
+    "FREQ=WEEKLY;BYDAY=MO,WE,FR",
+    "FREQ=WEEKLY;INTERVAL=2;BYDAY=TU",
+    "FREQ=MONTHLY;BYMONTHDAY=1,15,-1",
+    "FREQ=MONTHLY;COUNT=24",
+    "FREQ=YEARLY",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--series", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    today = date.today()
+    range_from, range_to = today, today + timedelta(days=args.days - 1)
+    series = [
+        (RecurrenceRule.parse(random.choice(RULES)), today - timedelta(days=random.randint(0, 3 * 365)))
+        for _ in range(args.series)
+    ]
+
+    timings = []
+    total = 0
+    start = time.perf_counter()
+    for rule, series_start in series:
+        began = time.perf_counter()
+        total += sum(1 for _ in rule.occurrences(series_start, range_from, range_to))
+        timings.append((time.perf_counter() - began) * 1_000_000)
+    elapsed = time.perf_counter() - start
+
+    timings.sort()
+    print(f"series={args.series} days={args.days} occurrences={total} (строк при создании заранее)")
+    print(
+        f"total={elapsed * 1000:.1f}ms per_series p50={statistics.median(timings):.1f}us "
+        f"p99={timings[int(len(timings) * 0.99)]:.1f}us"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Бенчмарк поиска: заполняет отдельное рабочее пространство N задачами
+и измеряет задержку search() (p50/p95/p99).
+
+Нужна база данных из .env (DATABASE_URL и т.д.). Данные создаются
+под пользователем bench-search@example.com и могут быть удалены вместе с ним.
+
+Запуск из каталога backend:
+    python -m benchmarks.bench_search --tasks 1000000 --queries 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal, engine, Base
+from app.core.migrations import apply_schema
+from app.crud.search import search
+from app.models import user, workspace, workspace_user, project, task, reminder, comments, task_series  # noqa: F401
+
+WORDS = [
+    "отчет", "релиз", "дизайн", "встреча", "бюджет", "тест", "деплой", "ревью", "аналитика", "клиент",
+    "report", "release", "design", "meeting", "budget", "backend", "frontend", "invoice", "sprint", "bug",
+]
+
+SEED_SQL = """
+WITH u AS (
+    INSERT INTO users (name, email, password, created_at, updated_at)
+    VALUES ('bench', 'bench-search@example.com', '-', now(), now())
+    ON CONFLICT (email) DO UPDATE SET name = EXCLUDED.name
+    RETURNING id
+), w AS (
+    INSERT INTO workspaces (name, created_by, created_at, updated_at)
+    SELECT 'bench-search', id, now(), now() FROM u RETURNING id, created_by
+), wu AS (
+    INSERT INTO workspace_users (workspace_id, user_id, access_level, created_at, updated_at)
+    SELECT id, created_by, 'admin', now(), now() FROM w
+), p AS (
+    INSERT INTO projects (name, workspace_id, created_by, created_at, updated_at)
+    SELECT 'bench project ' || g, w.id, w.created_by, now(), now() FROM w, generate_series(1, 100) g
+    RETURNING id, created_by
+)
+SELECT (SELECT id FROM u) AS user_id, array_agg(id) AS project_ids FROM p
+"""
+
+TASKS_SQL = """
+WITH params AS (
+    SELECT CAST(:words AS text[]) AS words, CAST(:project_ids AS int[]) AS project_ids
+)
+INSERT INTO tasks (name, project_id, created_by, is_completed, created_at, updated_at)
+SELECT
+    words[1 + floor(random() * array_length(words, 1))::int] || ' '
+        || words[1 + floor(random() * array_length(words, 1))::int] || ' #' || g,
+    project_ids[1 + g % array_length(project_ids, 1)],
+    :user_id, false, now(), now()
+FROM params, generate_series(1, :count) g
+"""
+
+
+async def seed(count: int) -> int:
+    async with engine.begin() as conn:
+        await apply_schema(conn, Base.metadata)
+    async with SessionLocal() as db:
+        row = (await db.execute(text(SEED_SQL))).one()
+        await db.execute(
+            text(TASKS_SQL),
+            {"words": WORDS, "project_ids": row.project_ids, "user_id": row.user_id, "count": count},
+        )
+        await db.commit()
+        await db.execute(text("ANALYZE tasks"))
+        return row.user_id
+
+
+async def measure(user_id: int, queries: int) -> None:
+    timings = []
+    async with SessionLocal() as db:
+        for _ in range(queries):
+            query = random.choice(WORDS)[: random.randint(3, 8)]
+            start = time.perf_counter()
+            await search(db, user_id, query, limit=20)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p = lambda q: timings[min(len(timings) - 1, int(len(timings) * q))]  # noqa: E731
+    print(f"queries={queries} p50={statistics.median(timings):.1f}ms p95={p(0.95):.1f}ms p99={p(0.99):.1f}ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    user_id = await seed(args.tasks)
+    await measure(user_id, args.queries)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
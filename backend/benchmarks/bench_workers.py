@@ -0,0 +1,83 @@
+"""
+Бенчмарк масштабирования по ядрам: запускает gunicorn с разным числом воркеров
+и измеряет пропускную способность /ping под нагрузкой.
+
+Нужна доступная база данных (DATABASE_URL и прочие переменные из .env),
+так как приложение при старте создает таблицы.
+
+Запуск из каталога backend:
+    python -m benchmarks.bench_workers --workers 1 2 4 --requests 20000 --concurrency 256
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+PORT = 8765
+URL = f"http://127.0.0.1:{PORT}/ping"
+
+
+async def wait_ready(timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(URL)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Сервер не запустился")
+
+
+async def load(total: int, concurrency: int) -> float:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(limits=limits) as client:
+        async def worker():
+            while True:
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await client.get(URL)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+
+def run(workers: int, total: int, concurrency: int) -> None:
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{PORT}")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app", "--access-logfile", "/dev/null"],
+        env=env,
+    )
+    try:
+        asyncio.run(wait_ready())
+        elapsed = asyncio.run(load(total, concurrency))
+        print(f"workers={workers:<3} {total / elapsed:10.0f} RPS")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=256)
+    args = parser.parse_args()
+    for workers in args.workers:
+        run(workers, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Бенчмарк отложенной записи: N конкурентных клиентов добавляют комментарии
+к общему набору задач — сначала с коммитом на каждый запрос, затем через
+очередь write_behind. Печатает пропускную способность и задержку (p50/p99).
+
+Нужна база данных из .env (DATABASE_URL и т.д.). Данные создаются
+под пользователем bench-write-behind@example.com.
+
+Запуск из каталога backend:
+    python -m benchmarks.bench_write_behind --clients 200 --requests 20 --durability journal
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, Base
+from app.core.migrations import apply_schema
+from app.core.write_behind import write_behind
+from app.crud.comments import create_comment, queue_comment, apply_comment_batch
+from app.models import user, workspace, workspace_user, project, task, reminder, comments, task_series  # noqa: F401
+from app.schemas.comments import CommentCreate
+
+SEED_SQL = """
+WITH u AS (
+    INSERT INTO users (name, email, password, created_at, updated_at)
+    VALUES ('bench', 'bench-write-behind@example.com', '-', now(), now())
+    ON CONFLICT (email) DO UPDATE SET name = EXCLUDED.name
+    RETURNING id
+), w AS (
+    INSERT INTO workspaces (name, created_by, created_at, updated_at)
+    SELECT 'bench-write-behind', id, now(), now() FROM u RETURNING id, created_by
+), p AS (
+    INSERT INTO projects (name, workspace_id, created_by, created_at, updated_at)
+    SELECT 'bench project', w.id, w.created_by, now(), now() FROM w
+    RETURNING id, created_by
+), t AS (
+    INSERT INTO tasks (name, project_id, created_by, is_completed, created_at, updated_at)
+    SELECT 'bench task #' || g, p.id, p.created_by, false, now(), now() FROM p, generate_series(1, 50) g
+    RETURNING id
+)
+SELECT (SELECT id FROM u) AS user_id, array_agg(id) AS task_ids FROM t
+"""
+
+
+async def seed() -> tuple:
+    async with engine.begin() as conn:
+        await apply_schema(conn, Base.metadata)
+    async with SessionLocal() as db:
+        row = (await db.execute(text(SEED_SQL))).one()
+        await db.commit()
+        return row.user_id, row.task_ids
+
+
+async def run(label: str, write, user_id: int, task_ids: list, clients: int, requests: int) -> None:
+    timings = []
+
+    async def client() -> None:
+        async with SessionLocal() as db:
+            for _ in range(requests):
+                data = CommentCreate(task_id=random.choice(task_ids), content="bench comment")
+                start = time.perf_counter()
+                await write(db, data, user_id)
+                # Сессия запроса не держит транзакцию между запросами
+                await db.rollback()
+                timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(
+        f"{label}: {len(timings) / elapsed:.0f} req/s "
+        f"p50={statistics.median(timings):.1f}ms p99={p99:.1f}ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--durability", choices=["memory", "journal"], default="journal")
+    args = parser.parse_args()
+    settings.write_behind_durability = args.durability
+
+    user_id, task_ids = await seed()
+    await run("commit per request", create_comment, user_id, task_ids, args.clients, args.requests)
+
+    write_behind.register("comment", apply_comment_batch)
+    await write_behind.start()
+    await run(f"write-behind ({args.durability})", queue_comment, user_id, task_ids, args.clients, args.requests)
+    # Время применения хвоста очереди не входит в задержку запросов, но выводится отдельно
+    start = time.perf_counter()
+    await write_behind.stop()
+    print(f"drain: {(time.perf_counter() - start) * 1000:.1f}ms")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
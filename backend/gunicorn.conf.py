@@ -0,0 +1,29 @@
+# gunicorn.conf.py
+import multiprocessing
+import os
+
+# Адрес, на котором слушает приложение
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# Число воркеров: по умолчанию по одному на ядро (воркеры асинхронные)
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "app.core.server.UvicornWorker"
+
+# Воркеры читают WEB_CONCURRENCY, чтобы поделить соединения Postgres между собой
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# Keep-alive держится дольше, чем у nginx к апстриму, чтобы соединения закрывал nginx
+keepalive = 75
+# X-Forwarded-* принимаются только от nginx: иначе клиент мог бы подменить свой адрес
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+
+# Плавная остановка: воркер дообрабатывает текущие запросы и закрывает пул соединений (lifespan)
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+
+# Периодический перезапуск воркеров против утечек памяти
+max_requests = int(os.getenv("MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", 1000))
+
+accesslog = "-"
+errorlog = "-"